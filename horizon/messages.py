@@ -17,11 +17,17 @@ Drop-in replacement for django.contrib.messages which handles Horizon's
 messaging needs (e.g. AJAX communication, etc.).
 """
 
+import threading
+
 from django.contrib import messages as _messages
 from django.contrib.messages import constants
 from django.utils.encoding import force_text
 from django.utils.safestring import SafeData
 
+# The data of a request may be loaded by several threads at once, make sure
+# they do not queue the same message twice.
+_lock = threading.Lock()
+
 
 def horizon_message_already_queued(request, message):
     _message = force_text(message)
@@ -38,7 +44,9 @@ def horizon_message_already_queued(request, message):
 
 def add_message(request, level, message, extra_tags='', fail_silently=False):
     """Attempts to add a message to the request using the 'messages' app."""
-    if not horizon_message_already_queued(request, message):
+    with _lock:
+        if horizon_message_already_queued(request, message):
+            return
         if request.is_ajax():
             tag = constants.DEFAULT_TAGS[level]
             # if message is marked as safe, pass "safe" tag as extra_tags so
@@ -16,14 +16,17 @@ from collections import defaultdict
 
 from django import shortcuts
 
+from horizon import exceptions
 from horizon import views
 
 from horizon.templatetags.horizon import has_permissions
+from horizon.utils import futurist_utils
 
 
 class MultiTableMixin(object):
     """A generic mixin which provides methods for handling DataTables."""
     data_method_pattern = "get_%s_data"
+    parallel_load = False
 
     def __init__(self, *args, **kwargs):
         super(MultiTableMixin, self).__init__(*args, **kwargs)
@@ -35,15 +38,29 @@ class MultiTableMixin(object):
 
     def _get_data_dict(self):
         if not self._data:
-            for table in self.table_classes:
-                data = []
-                name = table._meta.name
-                func_list = self._data_methods.get(name, [])
-                for func in func_list:
-                    data.extend(func())
-                self._data[name] = data
+            calls = [(table._meta.name, func)
+                     for table in self.table_classes
+                     for func in self._data_methods[table._meta.name]]
+            if self.parallel_load:
+                results = futurist_utils.call_functions_parallel(
+                    *[(self._call_data_method, [func])
+                      for name, func in calls])
+            else:
+                results = [func() for name, func in calls]
+            data = dict((table._meta.name, []) for table in self.table_classes)
+            for (name, func), result in zip(calls, results):
+                data[name].extend(result)
+            self._data = data
         return self._data
 
+    def _call_data_method(self, func):
+        try:
+            return func()
+        except Exception:
+            # Leave the table empty rather than failing the other tables.
+            exceptions.handle(self.request)
+            return []
+
     def get_data_methods(self, table_classes, methods):
         for table in table_classes:
             name = table._meta.name
@@ -200,6 +217,13 @@ class MultiTableView(MultiTableMixin, views.HorizonTemplateView):
     define a ``get_{{ table_name }}_data`` method for each table class
     which returns a set of data for that table; and specify a template for
     the ``template_name`` attribute.
+
+    Set the ``parallel_load`` attribute to ``True`` to call the
+    ``get_{{ table_name }}_data`` methods concurrently, in the executor
+    shared by the requests of the process (see the ``PARALLEL_EXECUTOR``
+    setting). The errors of each method are then handled separately with
+    :func:`horizon.exceptions.handle`, and the data of the failing method is
+    left empty.
     """
 
     def construct_tables(self):
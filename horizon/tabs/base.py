@@ -25,6 +25,7 @@ from django.template import TemplateSyntaxError
 from django.utils import module_loading
 
 from horizon import exceptions
+from horizon.utils import futurist_utils
 from horizon.utils import html
 
 LOG = logging.getLogger(__name__)
@@ -63,6 +64,22 @@ class TabGroup(html.HTMLElement):
         Boolean to control whether the tab bar is shown when the tab group
         has only one tab. Default: ``False``
 
+    .. attribute:: preload
+
+        Boolean to control whether the tabs whose
+        :attr:`~horizon.tabs.Tab.preload` is ``True`` are loaded along with
+        the active tab. If ``False``, only the active tab is loaded and the
+        other tabs are loaded through AJAX when they are selected.
+        Default: ``True``
+
+    .. attribute:: parallel_load
+
+        Boolean to control whether the data of the tabs to be loaded is
+        retrieved concurrently, in the executor shared by the requests of
+        the process (see the ``PARALLEL_EXECUTOR`` setting). The tabs are
+        loaded with the language of the request, and their errors are still
+        handled tab by tab. Default: ``False``
+
     .. attribute:: param_name
 
         The name of the GET request parameter which will be used when
@@ -93,6 +110,8 @@ class TabGroup(html.HTMLElement):
     param_name = 'tab'
     sticky = False
     show_single_tab = False
+    preload = True
+    parallel_load = False
     _selected = None
     _active = None
 
@@ -169,13 +188,24 @@ class TabGroup(html.HTMLElement):
 
     def load_tab_data(self):
         """Preload all data that for the tabs that will be displayed."""
-        for tab in self._tabs.values():
-            if tab.load and not tab.data_loaded:
-                try:
-                    tab._data = tab.get_context_data(self.request)
-                except Exception:
-                    tab._data = False
-                    exceptions.handle(self.request)
+        tabs = self._tabs.values()
+        if self.request.is_ajax() and self.selected:
+            # Only the selected tab is rendered in response to AJAX requests.
+            tabs = [self.selected]
+        tabs = [tab for tab in tabs if tab.load and not tab.data_loaded]
+        if self.parallel_load:
+            futurist_utils.call_functions_parallel(
+                *[(self._load_tab_data, [tab]) for tab in tabs])
+        else:
+            for tab in tabs:
+                self._load_tab_data(tab)
+
+    def _load_tab_data(self, tab):
+        try:
+            tab._data = tab.get_context_data(self.request)
+        except Exception:
+            tab._data = False
+            exceptions.handle(self.request)
 
     def get_id(self):
         """Returns the id for this tab group.
@@ -341,7 +371,8 @@ class Tab(html.HTMLElement):
 
     @property
     def load(self):
-        load_preloaded = self.preload or self.is_active()
+        load_preloaded = ((self.preload and self.tab_group.preload) or
+                          self.is_active())
         return load_preloaded and self._allowed and self._enabled
 
     @property
@@ -474,8 +505,17 @@ class TableTab(Tab):
         :class:`~horizon.tables.MultiTableView`. For each table class you
         need to define a corresponding ``get_{{ table_name }}_data`` method
         as with :class:`~horizon.tables.MultiTableView`.
+
+    .. attribute:: parallel_load
+
+        Boolean to control whether the ``get_{{ table_name }}_data`` methods
+        are called concurrently, in the executor shared by the requests of
+        the process (see the ``PARALLEL_EXECUTOR`` setting). When the tab
+        group itself loads its tabs concurrently, they are called one after
+        the other in the worker loading the tab. Default: ``False``
     """
     table_classes = None
+    parallel_load = False
 
     def __init__(self, tab_group, request):
         super(TableTab, self).__init__(tab_group, request)
@@ -497,7 +537,8 @@ class TableTab(Tab):
         """
         # We only want the data to be loaded once, so we track if we have...
         if not self._table_data_loaded:
-            for table_name, table in self._tables.items():
+            data_funcs = []
+            for table_name in self._tables:
                 # Fetch the data function.
                 func_name = "get_%s_data" % table_name
                 data_func = getattr(self, func_name, None)
@@ -507,9 +548,16 @@ class TableTab(Tab):
                         "You must define a %(func_name)s method on"
                         " %(cls_name)s."
                         % {'func_name': func_name, 'cls_name': cls_name})
+                data_funcs.append(data_func)
 
-                # Load the data.
-                table.data = data_func()
+            # Load the data.
+            if self.parallel_load:
+                table_data = futurist_utils.call_functions_parallel(
+                    *data_funcs)
+            else:
+                table_data = [func() for func in data_funcs]
+            for table, data in zip(self._tables.values(), table_data):
+                table.data = data
                 table._meta.has_prev_data = self.has_prev_data(table)
                 table._meta.has_more_data = self.has_more_data(table)
             # Mark our data as loaded so we don't run the loaders again.
@@ -26,6 +26,11 @@ from django.utils.translation import ugettext_lazy as _
 from horizon.base import Horizon
 from horizon import conf
 from horizon.contrib import bootstrap_datepicker
+from horizon import themes
+from horizon.utils import memoized
+
+# Number of seconds the navigation tree of a user is cached, 0 disables it.
+NAV_TREE_CACHE_TTL = getattr(settings, 'NAV_TREE_CACHE_TTL', 3600)
 
 
 register = template.Library()
@@ -53,6 +58,76 @@ def has_permissions_on_list(components, user):
             in components if has_permissions(user, component)]
 
 
+def _is_allowed(component, context):
+    # Components which are never shown in the navigation are not checked.
+    return bool((callable(component.nav) or component.nav) and
+                component.can_access(context))
+
+
+def _is_shown(component, context):
+    # Unlike the access, nav() may depend on the current page.
+    return not callable(component.nav) or component.nav(context)
+
+
+def _get_nav_tree_key(context):
+    # What the user is allowed to see depends on the token, region, project
+    # and theme. Anonymous users are not cached.
+    request = context['request']
+    token = getattr(getattr(request.user, 'token', None), 'id', None)
+    if not token:
+        return None
+    theme = request.COOKIES.get(themes.get_theme_cookie_name(),
+                                themes.get_default_theme())
+    return (token, getattr(request.user, 'services_region', None),
+            getattr(request.user, 'project_id', None), theme)
+
+
+@memoized.shared_memoized(ttl=NAV_TREE_CACHE_TTL, key=_get_nav_tree_key)
+def _build_nav_tree(context):
+    """Returns the slugs of the dashboards, panel groups and panels allowed.
+
+    The tree is a tuple of ``(dashboard_slug, dashboard_allowed, groups)``
+    where ``groups`` is a tuple of ``(group_slug, panel_slugs)`` of the
+    non-empty panel groups, so that it can be kept in any cache.
+    """
+    tree = []
+    for dash in Horizon.get_dashboards():
+        groups = []
+        for group in dash.get_panel_groups().values():
+            panels = tuple(panel.slug for panel in group
+                           if _is_allowed(panel, context))
+            if panels:
+                groups.append((group.slug, panels))
+        tree.append((dash.slug, _is_allowed(dash, context), tuple(groups)))
+    return tuple(tree)
+
+
+def get_nav_tree(context):
+    """Returns the navigation tree of the user of the request.
+
+    Checking the access runs the policy checks and ``allowed`` methods of
+    every dashboard and panel, so the allowed components are cached per
+    token, region, project and theme, outside of the session. It is a list
+    of ``(dashboard, visible, groups)`` where ``groups`` is an OrderedDict
+    of the panels to show by panel group.
+    """
+    nav_tree = []
+    for dash_slug, allowed, groups in _build_nav_tree(context):
+        dash = Horizon.get_dashboard(dash_slug)
+        panel_groups = dash.get_panel_groups()
+        shown_groups = OrderedDict()
+        for group_slug, panel_slugs in groups:
+            group = panel_groups[group_slug]
+            panels = dict((panel.slug, panel) for panel in group)
+            shown_panels = [panels[panel_slug] for panel_slug in panel_slugs
+                            if _is_shown(panels[panel_slug], context)]
+            if shown_panels:
+                shown_groups[group] = shown_panels
+        nav_tree.append((dash, allowed and _is_shown(dash, context),
+                         shown_groups))
+    return nav_tree
+
+
 @register.inclusion_tag('horizon/_sidebar.html', takes_context=True)
 def horizon_nav(context):
     if 'request' not in context:
@@ -60,29 +135,13 @@ def horizon_nav(context):
     current_dashboard = context['request'].horizon.get('dashboard', None)
     current_panel_group = None
     current_panel = context['request'].horizon.get('panel', None)
-    dashboards = []
-    for dash in Horizon.get_dashboards():
-        panel_groups = dash.get_panel_groups()
-        non_empty_groups = []
-        for group in panel_groups.values():
-            allowed_panels = []
-            for panel in group:
-                if (callable(panel.nav) and panel.nav(context) and
-                        panel.can_access(context)):
-                    allowed_panels.append(panel)
-                elif (not callable(panel.nav) and panel.nav and
-                        panel.can_access(context)):
-                    allowed_panels.append(panel)
-                if panel == current_panel:
-                    current_panel_group = group.slug
-            if allowed_panels:
-                non_empty_groups.append((group, allowed_panels))
-        if (callable(dash.nav) and dash.nav(context) and
-                dash.can_access(context)):
-            dashboards.append((dash, OrderedDict(non_empty_groups)))
-        elif (not callable(dash.nav) and dash.nav and
-                dash.can_access(context)):
-            dashboards.append((dash, OrderedDict(non_empty_groups)))
+    if current_dashboard and current_panel:
+        for group in current_dashboard.get_panel_groups().values():
+            if current_panel in group:
+                current_panel_group = group.slug
+    dashboards = [(dash, groups)
+                  for dash, visible, groups in get_nav_tree(context)
+                  if visible]
     return {'components': dashboards,
             'user': context['request'].user,
             'current': current_dashboard,
@@ -97,13 +156,8 @@ def horizon_main_nav(context):
     if 'request' not in context:
         return {}
     current_dashboard = context['request'].horizon.get('dashboard', None)
-    dashboards = []
-    for dash in Horizon.get_dashboards():
-        if dash.can_access(context):
-            if callable(dash.nav) and dash.nav(context):
-                dashboards.append(dash)
-            elif dash.nav:
-                dashboards.append(dash)
+    dashboards = [dash for dash, visible, groups in get_nav_tree(context)
+                  if visible]
     return {'components': dashboards,
             'user': context['request'].user,
             'current': current_dashboard,
@@ -116,23 +170,14 @@ def horizon_dashboard_nav(context):
     if 'request' not in context:
         return {}
     dashboard = context['request'].horizon['dashboard']
-    panel_groups = dashboard.get_panel_groups()
     non_empty_groups = []
-
-    for group in panel_groups.values():
-        allowed_panels = []
-        for panel in group:
-            if (callable(panel.nav) and panel.nav(context) and
-                    panel.can_access(context)):
-                allowed_panels.append(panel)
-            elif (not callable(panel.nav) and panel.nav and
-                    panel.can_access(context)):
-                allowed_panels.append(panel)
-        if allowed_panels:
-            if group.name is None:
-                non_empty_groups.append((dashboard.name, allowed_panels))
-            else:
-                non_empty_groups.append((group.name, allowed_panels))
+    for dash, visible, groups in get_nav_tree(context):
+        if dash == dashboard:
+            for group, allowed_panels in groups.items():
+                if group.name is None:
+                    non_empty_groups.append((dashboard.name, allowed_panels))
+                else:
+                    non_empty_groups.append((group.name, allowed_panels))
 
     return {'components': OrderedDict(non_empty_groups),
             'user': context['request'].user,
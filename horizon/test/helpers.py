@@ -69,6 +69,7 @@ except ImportError:
     pass
 
 from horizon import middleware
+from horizon.utils import memoized
 
 
 # Makes output of failing mox tests much easier to read.
@@ -141,6 +142,8 @@ class TestCase(django_test.TestCase):
         super(TestCase, self).setUp()
         if self.use_mox:
             self.mox = mox.Mox()
+        # Values memoized across requests must not leak between tests.
+        memoized.clear_shared_caches()
         self._setup_test_data()
         self._setup_factory()
         self._setup_user()
@@ -35,6 +35,7 @@ from horizon.tables import actions
 from horizon.tables import formset as table_formset
 from horizon.tables import views as table_views
 from horizon.test import helpers as test
+from horizon.utils import futurist_utils
 
 
 class FakeObject(object):
@@ -1478,6 +1479,15 @@ class MultiTableView(tables.MultiTableView):
         return TEST_DATA
 
 
+class ParallelMultiTableView(MultiTableView):
+    parallel_load = True
+
+    def get_table_with_permissions_data(self):
+        exc = exceptions.AlreadyExists("Recoverable!", tables.DataTable)
+        exc.silence_logging = True
+        raise exc
+
+
 class DataTableViewTests(test.TestCase):
     def _prepare_view(self, cls, *args, **kwargs):
         req = self.factory.get('/my_url/')
@@ -1521,6 +1531,25 @@ class DataTableViewTests(test.TestCase):
         self.assertEqual(TableWithPermissions,
                          context['table_with_permissions_table'].__class__)
 
+    def test_multi_table_view_data(self):
+        view = self._prepare_view(MultiTableView)
+        data = view._get_data_dict()
+        self.assertEqual({'table_with_permissions': list(TEST_DATA),
+                          'my_table': list(TEST_DATA)}, data)
+
+    @mock.patch.object(futurist_utils, 'call_functions_parallel',
+                       wraps=futurist_utils.call_functions_parallel)
+    def test_multi_table_view_parallel_load(self, mock_parallel):
+        view = self._prepare_view(ParallelMultiTableView)
+        data = view._get_data_dict()
+
+        self.assertEqual(1, mock_parallel.call_count)
+        self.assertEqual(2, len(mock_parallel.call_args[0]))
+        # The error of a table does not prevent loading the other one.
+        self.assertEqual({'table_with_permissions': [],
+                          'my_table': list(TEST_DATA)}, data)
+        self.assertEqual(1, len(list(view.request._messages)))
+
     fil_value_param = "my_table__filter__q"
     fil_field_param = '%s_field' % fil_value_param
 
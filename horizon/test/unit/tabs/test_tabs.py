@@ -18,6 +18,8 @@ import copy
 
 from django.conf import settings
 from django import http
+from django.utils import translation
+import mock
 
 import six
 
@@ -25,6 +27,7 @@ from horizon import exceptions
 from horizon import middleware
 from horizon import tabs as horizon_tabs
 from horizon.test import helpers as test
+from horizon.utils import futurist_utils
 
 from horizon.test.unit.tables.test_tables import MyTable
 from horizon.test.unit.tables.test_tables import TEST_DATA
@@ -75,6 +78,18 @@ class Group(horizon_tabs.TabGroup):
         self._assert_tabs_not_available = True
 
 
+class TabTwo(BaseTestTab):
+    slug = "tab_two"
+    name = "Tab Two"
+    template_name = "_tab.html"
+
+
+class GroupWithoutPreload(horizon_tabs.TabGroup):
+    slug = "tab_group"
+    tabs = (TabOne, TabTwo, TabDelayed)
+    preload = False
+
+
 class GroupWithConfig(horizon_tabs.TabGroup):
     slug = "tab_group"
     tabs = (TabOne, TabDisallowed)
@@ -116,11 +131,21 @@ class RedirectExceptionTab(horizon_tabs.Tab):
         raise exc
 
 
+class ParallelTabWithTable(TabWithTable):
+    parallel_load = True
+
+
 class TableTabGroup(horizon_tabs.TabGroup):
     slug = "tab_group"
     tabs = [TabWithTable]
 
 
+class ParallelTabGroup(horizon_tabs.TabGroup):
+    slug = "tab_group"
+    tabs = (TabOne, RecoverableErrorTab, TabTwo)
+    parallel_load = True
+
+
 class TabWithTableView(horizon_tabs.TabbedTableView):
     tab_group_class = TableTabGroup
     template_name = "tab_group.html"
@@ -243,6 +268,71 @@ class TabTests(test.TestCase):
         self.assertFalse(tab_one.is_active())
         self.assertTrue(tab_delayed.is_active())
 
+    def test_tab_group_without_preload(self):
+        tg = GroupWithoutPreload(self.request)
+        self.assertTrue(tg.get_tab("tab_one").load)
+        self.assertFalse(tg.get_tab("tab_two").load)
+        self.assertFalse(tg.get_tab("tab_delayed").load)
+
+        self.request.GET['tab'] = "tab_group__tab_two"
+        tg = GroupWithoutPreload(self.request)
+        self.assertFalse(tg.get_tab("tab_one").load)
+        self.assertTrue(tg.get_tab("tab_two").load)
+
+    def test_load_tab_data(self):
+        tg = Group(self.request)
+        tg.load_tab_data()
+        self.assertTrue(tg.get_tab("tab_one").data_loaded)
+        self.assertFalse(tg.get_tab("tab_delayed").data_loaded)
+
+    def test_load_tab_data_parallel_language(self):
+        languages = []
+
+        class LanguageTab(BaseTestTab):
+            name = "Language Tab"
+            slug = "language_tab"
+            template_name = "_tab.html"
+
+            def get_context_data(self, request):
+                languages.append(translation.get_language())
+                return super(LanguageTab, self).get_context_data(request)
+
+        class LanguageTabGroup(horizon_tabs.TabGroup):
+            slug = "tab_group"
+            tabs = (LanguageTab, TabOne)
+            parallel_load = True
+
+        tg = LanguageTabGroup(self.factory.get('/'))
+        with translation.override('fr'):
+            tg.load_tab_data()
+        # The tabs are loaded in the language of the request.
+        self.assertEqual(['fr'], languages)
+
+    def test_load_tab_data_ajax(self):
+        req = self.factory.get('/', {'tab': "tab_group__tab_delayed"},
+                               HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        tg = Group(req)
+        tg.load_tab_data()
+        # Only the requested tab is loaded.
+        self.assertFalse(tg.get_tab("tab_one").data_loaded)
+        self.assertTrue(tg.get_tab("tab_delayed").data_loaded)
+
+    @mock.patch.object(futurist_utils, 'call_functions_parallel',
+                       wraps=futurist_utils.call_functions_parallel)
+    def test_load_tab_data_parallel(self, mock_parallel):
+        req = self.factory.get('/')
+        tg = ParallelTabGroup(req)
+        tg.load_tab_data()
+
+        self.assertEqual(1, mock_parallel.call_count)
+        self.assertEqual(3, len(mock_parallel.call_args[0]))
+        # The error of a tab is handled without affecting the other tabs.
+        self.assertTrue(tg.get_tab("tab_one").data_loaded)
+        self.assertTrue(tg.get_tab("tab_two").data_loaded)
+        self.assertFalse(tg.get_tab("recoverable_error_tab")._data)
+        self.assertEqual(1, len([m for m in req._messages
+                                 if m.level_tag == 'error']))
+
     def test_rendering(self):
         tg = Group(self.request)
         tab_one = tg.get_tab("tab_one")
@@ -305,6 +395,16 @@ class TabTests(test.TestCase):
         # Since we only had one table we should get the shortcut name too.
         self.assertEqual(table, context['table'])
 
+    @mock.patch.object(futurist_utils, 'call_functions_parallel',
+                       wraps=futurist_utils.call_functions_parallel)
+    def test_table_tabs_parallel_load(self, mock_parallel):
+        tab = ParallelTabWithTable(TableTabGroup(self.request), self.request)
+        tab.load_table_data()
+
+        mock_parallel.assert_called_once_with(tab.get_my_table_data)
+        self.assertTrue(tab._table_data_loaded)
+        self.assertEqual(TEST_DATA, tab._tables[MyTable.Meta.name].data)
+
     def test_tabbed_table_view(self):
         view = TabWithTableView.as_view()
 
@@ -22,7 +22,9 @@ from django.conf import settings
 from django.template import Context
 from django.template import Template
 from django.utils.text import normalize_newlines
+import mock
 
+from horizon import base
 from horizon.test import helpers as test
 # The following imports are required to register the dashboards.
 from horizon.test.test_dashboards.cats.dashboard import Cats  # noqa: F401
@@ -150,3 +152,28 @@ class TemplateTagTests(test.TestCase):
                                             template_text=text,
                                             context={'request': self.request})
         self.assertEqual(single_line(rendered_str), single_line(expected))
+
+    @test.update_settings(MEMOIZED_CACHE={'enabled': True})
+    def test_horizon_nav_cached(self):
+        self.request.user.token = mock.Mock(id='token')
+        self.request.user.services_region = 'RegionOne'
+        self.request.user.project_id = 'project'
+        context = {'request': self.request}
+        cats = base.Horizon.get_dashboard('cats')
+        with mock.patch.object(cats, 'can_access',
+                               return_value=False) as mock_can_access:
+            sidebar = self.render_template(tag_require='horizon',
+                                           template_text="{% horizon_nav %}",
+                                           context=context)
+            self.render_template(tag_require='horizon',
+                                 template_text="{% horizon_main_nav %}",
+                                 context=context)
+            self.assertEqual(1, mock_can_access.call_count)
+            self.assertNotIn('href="/cats/"', sidebar)
+
+            # The access is checked again for another project.
+            self.request.user.project_id = 'other_project'
+            self.render_template(tag_require='horizon',
+                                 template_text="{% horizon_main_nav %}",
+                                 context=context)
+            self.assertEqual(2, mock_can_access.call_count)
@@ -0,0 +1,166 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import time
+import unittest
+
+from django.utils import translation
+import futurist
+import mock
+
+from horizon.utils import futurist_utils
+
+
+class FuturistUtilsTests(unittest.TestCase):
+
+    def test_call_functions_parallel(self):
+        def func1():
+            return 10
+
+        def func2():
+            return 20
+
+        ret = futurist_utils.call_functions_parallel(func1, func2)
+        self.assertEqual(ret, (10, 20))
+
+    def test_call_functions_parallel_with_args(self):
+        def func1(a):
+            return a
+
+        def func2(a, b):
+            return a + b
+
+        def func3():
+            return 3
+
+        ret = futurist_utils.call_functions_parallel(
+            (func1, [5]),
+            (func2, [10, 20]),
+            func3)
+        self.assertEqual(ret, (5, 30, 3))
+
+    def test_call_functions_parallel_with_kwargs(self):
+        def func1(a):
+            return a
+
+        def func2(a, b):
+            return a + b
+
+        def func3():
+            return 3
+
+        ret = futurist_utils.call_functions_parallel(
+            (func1, [], {'a': 5}),
+            (func2, [], {'a': 10, 'b': 20}),
+            func3)
+        self.assertEqual(ret, (5, 30, 3))
+
+    def test_call_functions_parallel_shared_executor(self):
+        def func1():
+            return threading.current_thread()
+
+        ret = futurist_utils.call_functions_parallel(func1, func1)
+        self.assertNotIn(threading.current_thread(), ret)
+        executor = futurist_utils.get_executor()
+        futurist_utils.call_functions_parallel(func1, func1)
+        self.assertIs(executor, futurist_utils.get_executor())
+        stats = futurist_utils.get_executor_stats()
+        self.assertGreaterEqual(stats['executed'], 4)
+        self.assertEqual(0, stats['queue_depth'])
+        self.assertEqual(futurist_utils.EXECUTOR_DEFAULTS['max_workers'],
+                         stats['max_workers'])
+
+    def test_get_executor_stats_queue_depth(self):
+        queue_depths = []
+
+        def submit(*args):
+            queue_depths.append(
+                futurist_utils.get_executor_stats()['queue_depth'])
+            # The submission never starts.
+            return futurist.Future()
+
+        queue_depth = futurist_utils.get_executor_stats()['queue_depth']
+        with mock.patch.object(futurist_utils.get_executor(), 'submit',
+                               side_effect=submit):
+            self.assertRaises(futurist_utils.DeadlineExceeded,
+                              futurist_utils.call_functions_parallel,
+                              int, int, timeout=0.05)
+        self.assertEqual([queue_depth + 1, queue_depth + 2], queue_depths)
+        # The cancelled submissions left the queue.
+        self.assertEqual(queue_depth,
+                         futurist_utils.get_executor_stats()['queue_depth'])
+
+    def test_call_functions_parallel_max_workers_per_call(self):
+        lock = threading.Lock()
+        running = []
+        max_running = []
+
+        def func1():
+            with lock:
+                running.append(1)
+                max_running.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.pop()
+            return True
+
+        with mock.patch.dict(futurist_utils.EXECUTOR_DEFAULTS,
+                             max_workers_per_call=2):
+            ret = futurist_utils.call_functions_parallel(
+                *[func1 for x in range(6)])
+        self.assertEqual((True,) * 6, ret)
+        self.assertLessEqual(max(max_running), 2)
+
+    def test_call_functions_parallel_nested(self):
+        def func1():
+            return futurist_utils.call_functions_parallel(
+                threading.current_thread, threading.current_thread)
+
+        ret = futurist_utils.call_functions_parallel(func1, func1)
+        # Nested calls run sequentially in the worker thread.
+        for threads in ret:
+            self.assertIs(threads[0], threads[1])
+
+    def test_call_functions_parallel_timeout(self):
+        event = threading.Event()
+
+        def func1():
+            event.wait(1)
+            return 1
+
+        def func2():
+            return 2
+
+        with mock.patch.dict(futurist_utils.EXECUTOR_DEFAULTS,
+                             max_workers_per_call=1):
+            self.assertRaises(futurist_utils.DeadlineExceeded,
+                              futurist_utils.call_functions_parallel,
+                              func1, func2, timeout=0.05)
+        event.set()
+
+    def test_call_functions_parallel_exception(self):
+        def func1():
+            raise ValueError()
+
+        def func2():
+            return 2
+
+        self.assertRaises(ValueError,
+                          futurist_utils.call_functions_parallel,
+                          func1, func2)
+
+    def test_call_functions_parallel_language(self):
+        with translation.override('fr'):
+            ret = futurist_utils.call_functions_parallel(
+                translation.get_language, translation.get_language)
+        self.assertEqual(('fr', 'fr'), ret)
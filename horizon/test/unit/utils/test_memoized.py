@@ -10,6 +10,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
+
 from horizon.test import helpers as test
 from horizon.utils import memoized
 
@@ -81,3 +83,198 @@ class MemoizedTests(test.TestCase):
             self.assertEqual(output2[position], leader)
             # check that some_other_func returned a memoized list.
             self.assertIs(output1, output2)
+
+
+@test.update_settings(MEMOIZED_CACHE={'enabled': True})
+class SharedMemoizedTests(test.TestCase):
+    def test_shared_memoized_cache_across_calls(self):
+        values_list = []
+
+        @memoized.shared_memoized(ttl=60)
+        def cache_calls(endpoint):
+            values_list.append(endpoint)
+            return [endpoint]
+
+        for x in range(0, 5):
+            cache_calls('http://nova')
+        cache_calls('http://cinder')
+        self.assertEqual(['http://nova', 'http://cinder'], values_list)
+        self.assertEqual({'hits': 4, 'misses': 2,
+                          'evictions': 0, 'expirations': 0},
+                         cache_calls.cache_stats.to_dict())
+
+    @mock.patch.object(memoized.time, 'time')
+    def test_shared_memoized_ttl(self, mock_time):
+        values_list = []
+
+        @memoized.shared_memoized(ttl=60)
+        def cache_calls(endpoint):
+            values_list.append(endpoint)
+            return endpoint
+
+        mock_time.return_value = 1000
+        cache_calls('http://nova')
+        mock_time.return_value = 1059
+        cache_calls('http://nova')
+        self.assertEqual(1, len(values_list))
+        mock_time.return_value = 1061
+        cache_calls('http://nova')
+        self.assertEqual(2, len(values_list))
+        self.assertEqual(1, cache_calls.cache_stats.expirations)
+
+    def _test_shared_memoized_zero_ttl(self):
+        values_list = []
+
+        @memoized.shared_memoized(ttl=0)
+        def cache_calls(endpoint):
+            values_list.append(endpoint)
+            return endpoint
+
+        cache_calls('http://nova')
+        cache_calls('http://nova')
+        self.assertEqual(2, len(values_list))
+
+    def test_shared_memoized_zero_ttl(self):
+        self._test_shared_memoized_zero_ttl()
+
+    @test.update_settings(MEMOIZED_CACHE={'enabled': True,
+                                          'backend': 'django'})
+    def test_shared_memoized_zero_ttl_django_backend(self):
+        self._test_shared_memoized_zero_ttl()
+
+    def test_local_store_zero_ttl(self):
+        store = memoized.LocalLRUStore()
+        store.set('a', 1, ttl=None)
+        self.assertEqual(1, store.get('a'))
+        # Like with the Django cache backends, the value expires at once.
+        store.set('a', 2, ttl=0)
+        self.assertRaises(KeyError, store.get, 'a')
+
+    def test_shared_memoized_max_size(self):
+        values_list = []
+
+        @memoized.shared_memoized(max_size=2)
+        def cache_calls(endpoint):
+            values_list.append(endpoint)
+            return endpoint
+
+        cache_calls('a')
+        cache_calls('b')
+        # Mark 'a' as recently used, so 'b' is evicted by 'c'.
+        cache_calls('a')
+        cache_calls('c')
+        cache_calls('a')
+        self.assertEqual(['a', 'b', 'c'], values_list)
+        cache_calls('b')
+        self.assertEqual(['a', 'b', 'c', 'b'], values_list)
+        self.assertEqual(2, cache_calls.cache_stats.evictions)
+
+    def test_shared_memoized_invalidate(self):
+        values_list = []
+
+        @memoized.shared_memoized()
+        def cache_calls(endpoint, detailed=False):
+            values_list.append(endpoint)
+            return endpoint
+
+        cache_calls('a', detailed=True)
+        cache_calls('b')
+        cache_calls.invalidate('a', detailed=True)
+        cache_calls('a', detailed=True)
+        cache_calls('b')
+        self.assertEqual(['a', 'b', 'a'], values_list)
+        cache_calls.cache_clear()
+        cache_calls('b')
+        self.assertEqual(['a', 'b', 'a', 'b'], values_list)
+
+    @test.update_settings(MEMOIZED_CACHE={'enabled': True,
+                                          'backend': 'django'})
+    def test_shared_memoized_django_backend(self):
+        values_list = []
+
+        @memoized.shared_memoized(ttl=60)
+        def cache_calls(endpoint):
+            values_list.append(endpoint)
+            return None
+
+        cache_calls('a')
+        self.assertIsNone(cache_calls('a'))
+        self.assertEqual(['a'], values_list)
+        cache_calls.cache_clear()
+        cache_calls('a')
+        self.assertEqual(['a', 'a'], values_list)
+        cache_calls.invalidate('a')
+        cache_calls('a')
+        self.assertEqual(['a', 'a', 'a'], values_list)
+
+    @test.update_settings(MEMOIZED_CACHE={'enabled': False})
+    def test_shared_memoized_disabled(self):
+        values_list = []
+
+        @memoized.shared_memoized()
+        def cache_calls(endpoint):
+            values_list.append(endpoint)
+            return endpoint
+
+        cache_calls('a')
+        cache_calls('a')
+        self.assertEqual(1, len(values_list))
+        self.assertEqual(0, cache_calls.cache_stats.misses)
+
+    def test_shared_memoized_key(self):
+        values_list = []
+
+        def get_key(endpoint, load=None):
+            return (endpoint,) if endpoint else None
+
+        @memoized.shared_memoized(ttl=60, key=get_key)
+        def cache_calls(endpoint, load):
+            values_list.append(endpoint)
+            return load()
+
+        load = mock.Mock(return_value='x')
+        self.assertEqual('x', cache_calls('http://nova', load))
+        # The loader is not part of the key.
+        self.assertEqual('x', cache_calls('http://nova', mock.Mock()))
+        self.assertEqual(['http://nova'], values_list)
+        cache_calls.invalidate('http://nova')
+        cache_calls('http://nova', load)
+        self.assertEqual(2, len(values_list))
+        # A call without key is not cached.
+        cache_calls(None, load)
+        cache_calls(None, load)
+        self.assertEqual(4, len(values_list))
+        self.assertEqual(2, cache_calls.cache_stats.misses)
+
+    @test.update_settings(MEMOIZED_CACHE={'enabled': False})
+    def test_shared_memoized_key_disabled(self):
+        load = mock.Mock(return_value='x')
+
+        @memoized.shared_memoized(key=lambda endpoint, load: (endpoint,))
+        def cache_calls(endpoint, load):
+            return load()
+
+        cache_calls('http://nova', load)
+        cache_calls('http://nova', load)
+        self.assertEqual(2, load.call_count)
+
+    def test_shared_memoized_with_request(self):
+        values_list = []
+
+        def get_auth_params(request):
+            return request.user_id, request.url
+
+        @memoized.shared_memoized_with_request(get_auth_params, 1)
+        def cache_calls(name, auth_params):
+            values_list.append(auth_params)
+            return name
+
+        request = mock.Mock(user_id='user', url='http://nova')
+        cache_calls('a', request)
+        cache_calls('a', mock.Mock(user_id='user', url='http://nova'))
+        self.assertEqual([('user', 'http://nova')], values_list)
+        cache_calls.invalidate('a', request)
+        cache_calls('a', request)
+        self.assertEqual(2, len(values_list))
+        self.assertIn('horizon.test.unit.utils.test_memoized.cache_calls',
+                      memoized.get_shared_cache_stats())
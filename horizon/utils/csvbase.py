@@ -124,7 +124,8 @@ class BaseCsvStreamingResponse(CsvDataMixin, StreamingHttpResponse):
 
     def buffer(self):
         buf = self.out.getvalue()
-        self.out.truncate(0)
+        self.out.seek(0)
+        self.out.truncate()
         return buf
 
     def get_content(self):
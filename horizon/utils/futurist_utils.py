@@ -0,0 +1,203 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import functools
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.utils import translation
+import futurist
+from futurist import waiters
+
+LOG = logging.getLogger(__name__)
+
+# Default configuration of the shared executor. It can be overridden by
+# the PARALLEL_EXECUTOR setting.
+EXECUTOR_DEFAULTS = {
+    'max_workers': 10,
+    'max_workers_per_call': 5,
+    'timeout': None,
+}
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_local = threading.local()
+
+
+class DeadlineExceeded(Exception):
+    """Raised when parallel calls do not complete before their deadline."""
+
+
+class _LatencyStats(object):
+    """Time spent by the submissions waiting in the queue of the executor."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.started = 0
+        self.expired = 0
+        self.latency = 0.0
+
+    def submitted(self, count=1):
+        with self._lock:
+            self.queued += count
+
+    def add(self, latency, expired=False):
+        with self._lock:
+            self.queued -= 1
+            self.started += 1
+            self.latency += latency
+            if expired:
+                self.expired += 1
+
+
+_latency_stats = _LatencyStats()
+
+
+def _get_config():
+    config = dict(EXECUTOR_DEFAULTS)
+    config.update(getattr(settings, 'PARALLEL_EXECUTOR', {}))
+    return config
+
+
+def get_executor():
+    """Returns the executor shared by all the requests of this process.
+
+    The executor is created on first use, and created again in a forked
+    child process, since worker threads do not survive a fork.
+    """
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = futurist.ThreadPoolExecutor(
+                    max_workers=_get_config()['max_workers'])
+                _executor_pid = pid
+    return _executor
+
+
+def get_executor_stats():
+    """Returns the queue depth and task statistics of the shared executor."""
+    statistics = get_executor().statistics
+    started = _latency_stats.started
+    return {
+        'max_workers': _get_config()['max_workers'],
+        'queue_depth': _latency_stats.queued,
+        'executed': statistics.executed,
+        'failures': statistics.failures,
+        'cancelled': statistics.cancelled,
+        'expired': _latency_stats.expired,
+        'runtime': statistics.runtime,
+        'average_runtime': statistics.average_runtime,
+        'average_latency': (_latency_stats.latency / started
+                            if started else 0.0),
+    }
+
+
+def _run(func, submitted, deadline, language):
+    started = time.time()
+    expired = deadline is not None and started > deadline
+    _latency_stats.add(started - submitted, expired)
+    if expired:
+        # The caller has already given up, don't hold a worker for nothing.
+        raise DeadlineExceeded()
+    _local.in_worker = True
+    try:
+        # The messages and errors are translated in the caller's language.
+        with translation.override(language):
+            return func()
+    finally:
+        _local.in_worker = False
+
+
+def call_functions_parallel(*worker_defs, **kwargs):
+    """Call specified functions in parallel.
+
+    The functions run in an executor shared by all the requests of the
+    process (see ``PARALLEL_EXECUTOR`` setting), and at most
+    ``max_workers_per_call`` of them run at the same time for one call.
+    When called from a function already running in the executor, the
+    functions are called sequentially to avoid exhausting the workers.
+    The functions run with the language active in the calling thread.
+
+    :param *worker_defs: Each positional argument can be either of
+        a function to be called or a tuple which consists of a function,
+        a list of positional arguments) and keyword arguments (optional).
+        If you need to pass arguments, you need to pass a tuple.
+        Example usages are like:
+           call_functions_parallel(func1, func2, func3)
+           call_functions_parallel(func1, (func2, [1, 2]))
+           call_functions_parallel((func1, [], {'a': 1}),
+                                   (func2, [], {'a': 2, 'b': 10}))
+    :param timeout: (keyword only) number of seconds after which
+        DeadlineExceeded is raised if some functions have not returned.
+        Functions which have not started yet by then are not called.
+        Defaults to the ``timeout`` of the ``PARALLEL_EXECUTOR`` setting.
+    :returns: a tuple of values returned from individual functions.
+        None is returned if a corresponding function does not return.
+        It is better to return values other than None from individual
+        functions.
+    """
+    config = _get_config()
+    timeout = kwargs.pop('timeout', config['timeout'])
+    if kwargs:
+        raise TypeError("Unexpected keyword arguments: %s" % ', '.join(kwargs))
+
+    funcs = []
+    for func_def in worker_defs:
+        if callable(func_def):
+            func_def = [func_def]
+        args = func_def[1] if len(func_def) > 1 else []
+        func_kwargs = func_def[2] if len(func_def) > 2 else {}
+        funcs.append(functools.partial(func_def[0], *args, **func_kwargs))
+
+    if len(funcs) < 2 or getattr(_local, 'in_worker', False):
+        return tuple(func() for func in funcs)
+
+    executor = get_executor()
+    language = translation.get_language()
+    max_running = max(1, config['max_workers_per_call'])
+    deadline = time.time() + timeout if timeout is not None else None
+    futures = [None] * len(funcs)
+    pending = list(range(len(funcs)))
+    running = set()
+    while pending or running:
+        while pending and len(running) < max_running:
+            index = pending.pop(0)
+            _latency_stats.submitted()
+            try:
+                futures[index] = executor.submit(
+                    _run, funcs[index], time.time(), deadline, language)
+            except Exception:
+                _latency_stats.submitted(-1)
+                raise
+            running.add(futures[index])
+        remaining = None
+        if deadline is not None:
+            remaining = max(0, deadline - time.time())
+        done, running = waiters.wait_for_any(running, timeout=remaining)
+        if not done:
+            for future in running:
+                if future.cancel():
+                    # Cancelled before it started, it leaves the queue.
+                    _latency_stats.submitted(-1)
+            LOG.warning("%d parallel call(s) did not complete within "
+                        "%s seconds.", len(running) + len(pending), timeout)
+            raise DeadlineExceeded()
+        running = set(running)
+
+    return tuple(f.result() for f in futures)
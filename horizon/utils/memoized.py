@@ -14,10 +14,18 @@
 
 import collections
 import functools
+import hashlib
 import threading
+import time
 import warnings
 import weakref
 
+from django.conf import settings
+from django.core.cache import caches
+import six
+
+from horizon.utils import settings as utils_settings
+
 
 class UnhashableKeyWarning(RuntimeWarning):
     """Raised when trying to memoize a function with an unhashable argument."""
@@ -178,3 +186,329 @@ def memoized_with_request(request_func, request_index=0):
 
         return wrapped
     return wrapper
+
+
+# Default configuration of the shared memoization cache. It can be
+# overridden by the MEMOIZED_CACHE setting.
+SHARED_CACHE_DEFAULTS = {
+    'enabled': False,
+    'backend': 'local',
+    'cache_alias': 'default',
+    'ttl': 300,
+    'max_size': 1000,
+}
+
+# Registries of the statistics and of the functions decorated with
+# shared_memoized, indexed by the qualified name of the function.
+_shared_stats = {}
+_shared_functions = {}
+
+
+def _get_shared_cache_config():
+    config = dict(SHARED_CACHE_DEFAULTS)
+    config.update(getattr(settings, 'MEMOIZED_CACHE', {}))
+    return config
+
+
+class CacheStats(object):
+    """Hit, miss and eviction counters of a shared memoization cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+
+    def incr(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def to_dict(self):
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'expirations': self.expirations}
+
+
+class LocalLRUStore(object):
+    """In-process store which keeps at most max_size entries.
+
+    The least recently used entry is evicted when the store is full, and
+    entries older than their time to live are dropped on access.
+    """
+
+    def __init__(self, max_size=None, stats=None, **kwargs):
+        self.max_size = max_size
+        self.stats = stats or CacheStats()
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            expires, value = self._data.pop(key)
+            if expires is not None and expires < time.time():
+                self.stats.incr('expirations')
+                raise KeyError(key)
+            # Re-insert the entry to mark it as the most recently used.
+            self._data[key] = (expires, value)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data.pop(key, None)
+            if ttl == 0:
+                # Like the Django cache backends, expire the value at once.
+                return
+            expires = time.time() + ttl if ttl is not None else None
+            self._data[key] = (expires, value)
+            while self.max_size and len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.stats.incr('evictions')
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DjangoCacheStore(object):
+    """Store backed by one of the configured Django cache backends.
+
+    It allows to share memoized values between all the processes using
+    the same cache backend, e.g. memcached. The keys are hashed, so the
+    arguments of the memoized function must have a stable ``repr``.
+    """
+
+    def __init__(self, name, cache_alias='default', stats=None, **kwargs):
+        self.name = name
+        self.cache_alias = cache_alias
+        self.stats = stats or CacheStats()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _generation_key(self):
+        return 'horizon:memoized:%s:generation' % self.name
+
+    def _make_key(self, key):
+        generation = self.cache.get(self._generation_key(), 0)
+        digest = hashlib.sha1(
+            six.text_type(repr(key)).encode('utf-8')).hexdigest()
+        return 'horizon:memoized:%s:%s:%s' % (self.name, generation, digest)
+
+    def get(self, key):
+        # A unique sentinel lets us cache None values too.
+        missing = object()
+        value = self.cache.get(self._make_key(key), missing)
+        if value is missing:
+            raise KeyError(key)
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.cache.set(self._make_key(key), value, ttl)
+
+    def delete(self, key):
+        self.cache.delete(self._make_key(key))
+
+    def clear(self):
+        # Django cache backends cannot delete keys by prefix, so instead
+        # we switch all the keys of this function to a new generation and
+        # let the old entries expire.
+        generation_key = self._generation_key()
+        self.cache.add(generation_key, 0, None)
+        try:
+            self.cache.incr(generation_key)
+        except ValueError:
+            self.cache.set(generation_key, 1, None)
+
+
+SHARED_CACHE_BACKENDS = {
+    'local': LocalLRUStore,
+    'django': DjangoCacheStore,
+}
+
+
+def _get_shared_key(args, kwargs, key_func=None):
+    """Calculate the cache key of a call of a shared memoized function.
+
+    Unlike _get_key(), no weak references are used, because the entries
+    must outlive the arguments. Only pass hashable values with a stable
+    representation, such as the tuples returned by the
+    ``get_auth_params_from_request`` functions of the API modules, or
+    compute such values from the arguments with ``key_func``.
+    """
+    if key_func is None:
+        key = (tuple(args), tuple(sorted(kwargs.items())))
+    else:
+        key = key_func(*args, **kwargs)
+    if key is not None:
+        # Raises TypeError for unhashable keys.
+        hash(key)
+    return key
+
+
+def get_shared_cache_stats():
+    """Return the counters of all shared memoized functions by name."""
+    return dict((name, stats.to_dict())
+                for name, stats in _shared_stats.items())
+
+
+def clear_shared_caches():
+    """Remove the entries of all the shared memoized functions."""
+    for func in _shared_functions.values():
+        func.cache_clear()
+
+
+def shared_memoized(ttl=None, max_size=None, backend=None, key=None):
+    """Decorator that caches function calls across requests.
+
+    Unlike :func:`memoized`, the cached values are not tied to the lifetime
+    of the arguments. They are kept in a shared store until their time to
+    live expires, so the arguments must identify the result on their own
+    (e.g. an endpoint URL rather than a request object).
+
+    The store is configured by the ``MEMOIZED_CACHE`` setting and can be
+    the in-process LRU store (``'local'``), a Django cache backend
+    (``'django'``) or the dotted path of a custom store class. ``ttl``,
+    ``max_size`` and ``backend`` override the setting for the decorated
+    function, and the values of the setting are used when they are
+    ``None``. A ``ttl`` of ``0`` disables the cache of the function, while
+    the values are kept until they are evicted when the ``ttl`` of the
+    setting is ``None``. When the shared cache is disabled, the function
+    falls back to the behavior of :func:`memoized`.
+
+    By default the calls are cached by all their arguments. ``key`` is a
+    function called with the arguments of each call which returns the
+    hashable values identifying its result instead, or ``None`` when the
+    call must not be cached. Only these values are kept by the cache, so
+    the other arguments can be a request, a client or a function loading
+    the result. Since such arguments are usually different for every call,
+    a function with a ``key`` is simply called when the shared cache is
+    disabled.
+
+    The decorated function gets a few extra attributes:
+
+    * ``invalidate(*args, **kwargs)`` removes the entry of the given call,
+      the arguments are passed to ``key`` if any,
+    * ``cache_clear()`` removes all the entries of the function,
+    * ``cache_stats`` holds the hit, miss and eviction counters.
+    """
+    def decorator(func):
+        name = '%s.%s' % (func.__module__, func.__name__)
+        stats = _shared_stats[name] = CacheStats()
+        fallback = memoized(func) if key is None else func
+        locks = collections.defaultdict(threading.Lock)
+        state = {}
+
+        def get_store():
+            try:
+                return state['store']
+            except KeyError:
+                config = _get_shared_cache_config()
+                store_class = backend or config['backend']
+                store_class = utils_settings.import_object(
+                    SHARED_CACHE_BACKENDS.get(store_class, store_class))
+                state['ttl'] = config['ttl'] if ttl is None else ttl
+                state['store'] = store_class(
+                    name=name,
+                    max_size=config['max_size'] if max_size is None
+                    else max_size,
+                    cache_alias=config['cache_alias'],
+                    stats=stats)
+                return state['store']
+
+        @functools.wraps(func)
+        def wrapped(*args, **kwargs):
+            if not _get_shared_cache_config()['enabled']:
+                return fallback(*args, **kwargs)
+            store = get_store()
+            if state['ttl'] == 0:
+                return func(*args, **kwargs)
+            try:
+                cache_key = _get_shared_key(args, kwargs, key)
+            except TypeError:
+                warnings.warn(
+                    "The key of %s %s is not hashable and cannot be "
+                    "memoized: %r\n" % (func.__module__, func.__name__,
+                                        (args, kwargs)),
+                    UnhashableKeyWarning, 2)
+                return func(*args, **kwargs)
+            if cache_key is None:
+                return func(*args, **kwargs)
+            try:
+                value = store.get(cache_key)
+            except KeyError:
+                with locks[cache_key]:
+                    # Another thread may have computed the value while we
+                    # were waiting for the lock.
+                    try:
+                        value = store.get(cache_key)
+                    except KeyError:
+                        stats.incr('misses')
+                        try:
+                            value = func(*args, **kwargs)
+                            store.set(cache_key, value, state['ttl'])
+                        finally:
+                            locks.pop(cache_key, None)
+                        return value
+            stats.incr('hits')
+            return value
+
+        def invalidate(*args, **kwargs):
+            try:
+                cache_key = _get_shared_key(args, kwargs, key)
+            except TypeError:
+                return
+            if cache_key is not None:
+                get_store().delete(cache_key)
+
+        def cache_clear():
+            get_store().clear()
+
+        wrapped.invalidate = invalidate
+        wrapped.cache_clear = cache_clear
+        wrapped.cache_stats = stats
+        _shared_functions[name] = wrapped
+        return wrapped
+    return decorator
+
+
+def shared_memoized_with_request(request_func, request_index=0, **options):
+    """Shared counterpart of :func:`memoized_with_request`.
+
+    The request argument is replaced by the result of ``request_func`` and
+    the call is cached by :func:`shared_memoized` with the given options.
+    ``invalidate`` accepts the same arguments as the decorated function,
+    including the request.
+    """
+    def wrapper(func):
+        memoized_func = shared_memoized(**options)(func)
+
+        def replace_request(args):
+            args = list(args)
+            request = args.pop(request_index)
+            args.insert(request_index, request_func(request))
+            return args
+
+        @functools.wraps(func)
+        def wrapped(*args, **kwargs):
+            return memoized_func(*replace_request(args), **kwargs)
+
+        def invalidate(*args, **kwargs):
+            memoized_func.invalidate(*replace_request(args), **kwargs)
+
+        wrapped.invalidate = invalidate
+        wrapped.cache_clear = memoized_func.cache_clear
+        wrapped.cache_stats = memoized_func.cache_stats
+        return wrapped
+    return wrapper
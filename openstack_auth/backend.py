@@ -250,17 +250,9 @@ class KeystoneBackend(object):
         role_perms = {utils.get_role_permission(role['name'])
                       for role in user.roles}
 
-        services = []
-        for service in user.service_catalog:
-            try:
-                service_type = service['type']
-            except KeyError:
-                continue
-            service_regions = [utils.get_endpoint_region(endpoint) for endpoint
-                               in service.get('endpoints', [])]
-            if user.services_region in service_regions:
-                services.append(service_type.lower())
-        service_perms = {"openstack.services.%s" % service
+        services = user.service_catalog_index.get_services_in_region(
+            user.services_region)
+        service_perms = {"openstack.services.%s" % service.lower()
                          for service in services}
         return role_perms | service_perms
 
@@ -13,13 +13,18 @@
 
 """Policy engine for openstack_auth"""
 
+import collections
 import logging
 import os.path
+import threading
+import time
 
 from django.conf import settings
 from oslo_config import cfg
+from oslo_policy import _checks
 from oslo_policy import opts as policy_opts
 from oslo_policy import policy
+import six
 
 from openstack_auth import user as auth_user
 from openstack_auth import utils as auth_utils
@@ -29,6 +34,53 @@ LOG = logging.getLogger(__name__)
 _ENFORCER = None
 _BASE_PATH = getattr(settings, 'POLICY_FILES_PATH', '')
 
+# Default configuration of the policy decision cache. It can be overridden
+# by the POLICY_DECISION_CACHE setting.
+DECISION_CACHE_DEFAULTS = {
+    'enabled': True,
+    'ttl': 300,
+    'max_size': 10000,
+    'preload': False,
+}
+
+# Cached in place of a decision when the rule of an action depends on the
+# target, so that the decisions are looked up by target.
+_TARGET_DEPENDENT = 'target-dependent'
+
+
+class _DecisionCache(object):
+    """Bounded LRU cache of the decisions shared by all the requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = collections.OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value, expires = self._data[key]
+            except KeyError:
+                return None
+            if expires < time.time():
+                del self._data[key]
+                return None
+            self._data[key] = self._data.pop(key)
+            return value
+
+    def set(self, key, value, ttl, max_size):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, time.time() + ttl)
+            while len(self._data) > max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_DECISIONS = _DecisionCache()
+
 
 def _get_policy_conf(policy_file, policy_dirs=None):
     conf = cfg.ConfigOpts()
@@ -73,6 +125,13 @@ def _get_enforcer():
 def reset():
     global _ENFORCER
     _ENFORCER = None
+    _DECISIONS.clear()
+
+
+def _get_cache_config():
+    config = dict(DECISION_CACHE_DEFAULTS)
+    config.update(getattr(settings, 'POLICY_DECISION_CACHE', {}))
+    return config
 
 
 def check(actions, request, target=None):
@@ -146,30 +205,15 @@ def check(actions, request, target=None):
         if target.get(key) is None:
             target[key] = user.user_domain_id
 
-    credentials = _user_to_credentials(user)
-    domain_credentials = _domain_to_credentials(request, user)
-    # if there is a domain token use the domain_id instead of the user's domain
-    if domain_credentials:
-        credentials['domain_id'] = domain_credentials.get('domain_id')
+    credentials, domain_credentials = _get_credentials(request, user)
 
     enforcer = _get_enforcer()
 
     for action in actions:
         scope, action = action[0], action[1]
         if scope in enforcer:
-            # this is for handling the v3 policy file and will only be
-            # needed when a domain scoped token is present
-            if scope == 'identity' and domain_credentials:
-                # use domain credentials
-                if not _check_credentials(enforcer[scope],
-                                          action,
-                                          target,
-                                          domain_credentials):
-                    return False
-
-            # use project credentials
-            if not _check_credentials(enforcer[scope],
-                                      action, target, credentials):
+            if not _cached_check(user, enforcer[scope], scope, action,
+                                 target, credentials, domain_credentials):
                 return False
 
         # if no policy for scope, allow action, underlying API will
@@ -178,6 +222,155 @@ def check(actions, request, target=None):
     return True
 
 
+def preload(request):
+    """Evaluate the rules which don't depend on the target of the action.
+
+    The decisions are cached, so that the policy checks of the following
+    requests of the user are looked up without running the rules. It does
+    nothing unless ``preload`` is enabled in ``POLICY_DECISION_CACHE``.
+    """
+    config = _get_cache_config()
+    if not (config['enabled'] and config['preload']):
+        return
+    user = auth_utils.get_user(request)
+    credentials, domain_credentials = _get_credentials(request, user)
+    for scope, enforcer in _get_enforcer().items():
+        for action in list(enforcer.rules):
+            if _is_target_independent(enforcer, action):
+                _cached_check(user, enforcer, scope, action, {},
+                              credentials, domain_credentials)
+
+
+def _get_credentials(request, user):
+    credentials = _user_to_credentials(user)
+    domain_credentials = _domain_to_credentials(request, user)
+    # if there is a domain token use the domain_id instead of the user's domain
+    if domain_credentials:
+        credentials['domain_id'] = domain_credentials.get('domain_id')
+    return credentials, domain_credentials
+
+
+def _check_action(enforcer_scope, scope, action, target, credentials,
+                  domain_credentials):
+    # this is for handling the v3 policy file and will only be
+    # needed when a domain scoped token is present
+    if scope == 'identity' and domain_credentials:
+        # use domain credentials
+        if not _check_credentials(enforcer_scope, action, target,
+                                  domain_credentials):
+            return False
+
+    # use project credentials
+    return _check_credentials(enforcer_scope, action, target, credentials)
+
+
+def _cached_check(user, enforcer_scope, scope, action, target, credentials,
+                  domain_credentials):
+    """Check an action, reusing the decisions of the same credentials.
+
+    The decisions are cached for the request on the user object, and for
+    all the requests in a process wide cache. The key contains the roles,
+    project and domain of the credentials, so a token for another project
+    or with other roles never reuses a decision. The target is only part of
+    the key when the rule of the action depends on it.
+    """
+    config = _get_cache_config()
+    if not hasattr(user, '_policy_decisions'):
+        user._policy_decisions = {}
+    decisions = user._policy_decisions
+
+    def lookup(key):
+        value = decisions.get(key)
+        if value is None and config['enabled']:
+            value = _DECISIONS.get(key)
+            if value is not None:
+                decisions[key] = value
+        return value
+
+    def store(key, value):
+        decisions[key] = value
+        if config['enabled']:
+            _DECISIONS.set(key, value, config['ttl'], config['max_size'])
+
+    if scope == 'identity' and domain_credentials:
+        domain_key = _credentials_key(domain_credentials)
+    else:
+        domain_key = None
+    key = (_credentials_key(credentials), domain_key, scope, action)
+    decision = lookup(key)
+    if decision is _TARGET_DEPENDENT or (
+            decision is None and
+            not _is_target_independent(enforcer_scope, action)):
+        if decision is None:
+            store(key, _TARGET_DEPENDENT)
+        target_key = _target_key(target)
+        if target_key is None:
+            return _check_action(enforcer_scope, scope, action, target,
+                                 credentials, domain_credentials)
+        key += (target_key,)
+        decision = lookup(key)
+
+    if decision is None:
+        decision = _check_action(enforcer_scope, scope, action, target,
+                                 credentials, domain_credentials)
+        store(key, decision)
+    return decision
+
+
+def _credentials_key(credentials):
+    # The token is left out: it changes with every login while the
+    # decisions only depend on the other credentials.
+    return tuple(sorted(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in credentials.items() if name != 'token'))
+
+
+def _target_key(target):
+    key = tuple(sorted(target.items()))
+    try:
+        hash(key)
+    except TypeError:
+        # Decisions on targets with unhashable values are not cached.
+        return None
+    return key
+
+
+def _is_target_independent(enforcer_scope, action):
+    """Returns whether the decision on an action ignores the target."""
+    rules = enforcer_scope.rules
+    if action in rules:
+        checks = [rules[action]]
+    else:
+        # The default rule of the enforcer and then the 'default' rule
+        # of the service are used, see _check_credentials().
+        default_rule = rules.default_rule
+        if isinstance(default_rule, six.string_types):
+            default_rule = rules.get(default_rule)
+        checks = [default_rule, rules.get('default')]
+    return all(_is_check_target_independent(rules, check, ())
+               for check in checks)
+
+
+def _is_check_target_independent(rules, check, seen):
+    if check is None or isinstance(check, (_checks.TrueCheck,
+                                           _checks.FalseCheck)):
+        return True
+    if isinstance(check, _checks.RuleCheck):
+        if check.match in seen:
+            return False
+        return _is_check_target_independent(rules, rules.get(check.match),
+                                            seen + (check.match,))
+    if isinstance(check, (_checks.AndCheck, _checks.OrCheck)):
+        return all(_is_check_target_independent(rules, rule, seen)
+                   for rule in check.rules)
+    if isinstance(check, _checks.NotCheck):
+        return _is_check_target_independent(rules, check.rule, seen)
+    if isinstance(check, (_checks.RoleCheck, _checks.GenericCheck)):
+        return '%(' not in check.match
+    # Other checks, e.g. HTTP checks, may use the target in any way.
+    return False
+
+
 def _check_credentials(enforcer_scope, action, target, credentials):
     is_valid = True
     if not enforcer_scope.enforce(action, target, credentials):
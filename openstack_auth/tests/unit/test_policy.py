@@ -213,3 +213,91 @@ class PolicyTestCaseV3Admin(PolicyTestCase):
         value = policy.check((("identity", "admin_or_cloud_admin"),),
                              request=self.request)
         self.assertTrue(value)
+
+
+class PolicyDecisionCacheTestCase(PolicyTestCase):
+    _roles = [{'id': '1', 'name': 'admin'}]
+
+    def setUp(self):
+        super(PolicyDecisionCacheTestCase, self).setUp()
+        override = self.settings(POLICY_FILES={
+            'identity': 'policy.v3cloudsample.json',
+            'compute': 'nova_policy.json'})
+        override.enable()
+        self.addCleanup(override.disable)
+        self._set_user()
+        policy.reset()
+        patcher = mock.patch.object(policy, '_check_action',
+                                    wraps=policy._check_action)
+        self.mock_check_action = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _set_user(self, roles=None, project_id=None):
+        mock_user = user.User(id=1, roles=roles or self._roles,
+                              project_id=project_id,
+                              user_domain_id='admin_domain_id')
+        self.MockClass.return_value = mock_user
+
+    def test_decision_cached_across_requests(self):
+        actions = (("identity", "admin_required"),)
+        self.assertTrue(policy.check(actions, request=self.request))
+        self.assertTrue(policy.check(actions, request=self.request))
+        self.assertEqual(1, self.mock_check_action.call_count)
+
+        # Another request of a user with the same credentials.
+        self._set_user()
+        self.assertTrue(policy.check(actions, request=self.request))
+        self.assertEqual(1, self.mock_check_action.call_count)
+
+        # Other roles or another project never reuse the decision.
+        self._set_user(roles=[{'id': '2', 'name': 'member'}])
+        self.assertFalse(policy.check(actions, request=self.request))
+        self._set_user(project_id='other_project')
+        self.assertTrue(policy.check(actions, request=self.request))
+        self.assertEqual(3, self.mock_check_action.call_count)
+
+    def test_target_dependent_decision(self):
+        actions = (("identity", "admin_and_matching_domain_id"),)
+        self.assertTrue(policy.check(actions, request=self.request))
+        self.assertFalse(policy.check(actions, request=self.request,
+                                      target={'domain_id': 'other'}))
+        self.assertFalse(policy.check(actions, request=self.request,
+                                      target={'domain_id': 'other'}))
+        self.assertEqual(2, self.mock_check_action.call_count)
+
+    def test_cache_disabled(self):
+        actions = (("identity", "admin_required"),)
+        with self.settings(POLICY_DECISION_CACHE={'enabled': False}):
+            policy.check(actions, request=self.request)
+            self._set_user()
+            policy.check(actions, request=self.request)
+        self.assertEqual(2, self.mock_check_action.call_count)
+
+    def test_reset_clears_decisions(self):
+        actions = (("identity", "admin_required"),)
+        policy.check(actions, request=self.request)
+        policy.reset()
+        self._set_user()
+        policy.check(actions, request=self.request)
+        self.assertEqual(2, self.mock_check_action.call_count)
+
+    def test_preload(self):
+        with self.settings(POLICY_DECISION_CACHE={'preload': True}):
+            policy.preload(self.request)
+        preloaded = self.mock_check_action.call_count
+        self.assertGreater(preloaded, 0)
+        # Only the rules which don't depend on the target are evaluated.
+        actions = [call[0][2] for call in
+                   self.mock_check_action.call_args_list]
+        self.assertIn('admin_required', actions)
+        self.assertNotIn('admin_and_matching_domain_id', actions)
+
+        self._set_user()
+        self.assertTrue(policy.check((("identity", "admin_required"),
+                                      ("compute", "context_is_admin")),
+                                     request=self.request))
+        self.assertEqual(preloaded, self.mock_check_action.call_count)
+
+    def test_preload_disabled(self):
+        policy.preload(self.request)
+        self.assertFalse(self.mock_check_action.called)
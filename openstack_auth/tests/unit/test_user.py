@@ -51,3 +51,22 @@ class UserTestCase(test.TestCase):
         self.assertTrue(created_token._is_pki_token(
                         self.data.domain_scoped_access_info.auth_token))
         self.assertFalse(created_token._is_pki_token(None))
+
+    def test_service_catalog_index(self):
+        catalog = [{'type': 'compute', 'endpoints': [
+            {'region_id': 'One', 'interface': 'public', 'url': 'http://n1'}]}]
+        testuser = user.User(id=1, service_catalog=catalog)
+        index = testuser.service_catalog_index
+        self.assertIs(index, testuser.service_catalog_index)
+        self.assertEqual('http://n1',
+                         index.get_url('compute', 'One', 'publicURL'))
+
+        # Switching the region rebuilds the index.
+        testuser.services_region = 'Two'
+        self.assertIsNot(index, testuser.service_catalog_index)
+
+        # So does replacing the catalog.
+        index = testuser.service_catalog_index
+        testuser.service_catalog = []
+        self.assertIsNone(
+            testuser.service_catalog_index.get_service('compute'))
@@ -76,6 +76,100 @@ class UtilsTestCase(test.TestCase):
             self.assertEqual(expected, utils.fix_auth_url_version_prefix(src))
 
 
+class ConnectionPoolTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ConnectionPoolTestCase, self).setUp()
+        utils._requests_sessions.clear()
+
+    def test_requests_session_shared_by_tls_settings(self):
+        session = utils.get_requests_session(True)
+        self.assertIs(session, utils.get_requests_session(True))
+        self.assertIsNot(session, utils.get_requests_session(False))
+        self.assertIsNot(session, utils.get_requests_session('/ca.pem'))
+        self.assertIsNot(session,
+                         utils.get_requests_session(True, pool_name='swift'))
+
+    @override_settings(OPENSTACK_CONNECTION_POOL={'pool_maxsize': 42,
+                                                  'tcp_keepalive': False})
+    def test_requests_session_pool_settings(self):
+        adapter = utils.get_requests_session(True).get_adapter('https://a')
+        self.assertEqual(42, adapter._pool_maxsize)
+        self.assertNotIsInstance(adapter, utils.session.TCPKeepAliveAdapter)
+
+    def test_requests_session_blocks_cookies(self):
+        session = utils.get_requests_session(True)
+        self.assertFalse(session.cookies._policy.allowed_domains())
+
+    @override_settings(OPENSTACK_SSL_NO_VERIFY=False,
+                       OPENSTACK_SSL_CACERT='/ca.pem')
+    def test_get_session_uses_shared_pool(self):
+        session = utils.get_session()
+        self.assertEqual('/ca.pem', session.verify)
+        self.assertIs(utils.get_requests_session('/ca.pem'), session.session)
+        self.assertIs(session.session, utils.get_session().session)
+
+
+class ServiceCatalogIndexTestCase(test.TestCase):
+
+    catalog_v3 = [
+        {'type': 'compute', 'endpoints': [
+            {'region_id': 'One', 'interface': 'public', 'url': 'http://n1'},
+            {'region_id': 'One', 'interface': 'admin', 'url': 'http://a1'},
+            {'region_id': 'Two', 'interface': 'public', 'url': 'http://n2'},
+        ]},
+        {'type': 'compute', 'endpoints': [
+            {'region_id': 'Three', 'interface': 'public', 'url': 'http://x'},
+        ]},
+        {'type': 'identity', 'endpoints': [
+            {'region_id': 'One', 'interface': 'public', 'url': 'http://k1'},
+        ]},
+        {'name': 'no type', 'endpoints': []},
+    ]
+
+    catalog_v2 = [
+        {'type': 'image', 'endpoints': [
+            {'region': 'One', 'publicURL': 'http://g1',
+             'internalURL': 'http://i1'},
+        ]},
+    ]
+
+    def test_get_url_v3(self):
+        index = utils.ServiceCatalogIndex(self.catalog_v3)
+        self.assertEqual('http://n1',
+                         index.get_url('compute', 'One', 'publicURL'))
+        self.assertEqual('http://a1',
+                         index.get_url('compute', 'One', 'adminURL'))
+        self.assertEqual('http://n2',
+                         index.get_url('compute', 'Two', 'publicURL'))
+        self.assertIsNone(index.get_url('compute', 'Two', 'adminURL'))
+        # Only the first service of a type is used.
+        self.assertIsNone(index.get_url('compute', 'Three', 'publicURL'))
+        self.assertIsNone(index.get_url('image', 'One', 'publicURL'))
+        # Identity endpoints are global.
+        self.assertEqual('http://k1',
+                         index.get_url('identity', 'Two', 'publicURL'))
+
+    def test_get_url_v2(self):
+        index = utils.ServiceCatalogIndex(self.catalog_v2)
+        self.assertEqual('http://g1',
+                         index.get_url('image', 'One', 'publicURL'))
+        self.assertEqual('http://i1',
+                         index.get_url('image', 'One', 'internalURL'))
+        self.assertIsNone(index.get_url('image', 'One', 'adminURL'))
+
+    def test_services(self):
+        index = utils.ServiceCatalogIndex(self.catalog_v3)
+        self.assertIs(self.catalog_v3[0], index.get_service('compute'))
+        self.assertIsNone(index.get_service('image'))
+        self.assertTrue(index.is_service_enabled('compute', 'Two'))
+        self.assertFalse(index.is_service_enabled('compute', 'Three'))
+        self.assertTrue(index.is_service_enabled('identity', 'Two'))
+        self.assertEqual(['compute', 'identity'],
+                         sorted(index.get_services_in_region('One')))
+        self.assertEqual(['compute'], index.get_services_in_region('Two'))
+
+
 class BehindProxyTestCase(test.TestCase):
 
     def setUp(self):
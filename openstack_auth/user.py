@@ -179,6 +179,11 @@ class User(models.AbstractBaseUser, models.AnonymousUser):
         A list of non-identity service endpoint regions extracted from the
         service catalog.
 
+    .. attribute:: service_catalog_index
+
+        The ``service_catalog`` indexed by service type, region and
+        interface, used by the service and endpoint lookups.
+
     .. attribute:: user_domain_id
 
         The domain id of the current user.
@@ -228,6 +233,7 @@ class User(models.AbstractBaseUser, models.AnonymousUser):
         self.project_id = project_id or tenant_id
         self.project_name = project_name or tenant_name
         self.service_catalog = service_catalog
+        self._service_catalog_index = None
         self._services_region = (
             services_region
             or utils.default_services_region(service_catalog)
@@ -332,6 +338,20 @@ class User(models.AbstractBaseUser, models.AnonymousUser):
     @services_region.setter
     def services_region(self, region):
         self._services_region = region
+        self._service_catalog_index = None
+
+    @property
+    def service_catalog_index(self):
+        """Returns the service catalog indexed for lookups.
+
+        The index is compiled on first use, and again when the region is
+        switched or the catalog is replaced.
+        """
+        index = getattr(self, '_service_catalog_index', None)
+        if index is None or index.catalog is not self.service_catalog:
+            index = utils.ServiceCatalogIndex(self.service_catalog)
+            self._service_catalog_index = index
+        return index
 
     @property
     def available_services_regions(self):
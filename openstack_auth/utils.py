@@ -14,6 +14,7 @@
 import datetime
 import logging
 import re
+import threading
 
 from django.conf import settings
 from django.contrib import auth
@@ -25,6 +26,9 @@ from keystoneauth1 import session
 from keystoneauth1 import token_endpoint
 from keystoneclient.v2_0 import client as client_v2
 from keystoneclient.v3 import client as client_v3
+import requests
+from requests import adapters
+from six.moves import http_cookiejar
 from six.moves.urllib import parse as urlparse
 
 
@@ -122,14 +126,74 @@ def get_keystone_version():
     return getattr(settings, 'OPENSTACK_API_VERSIONS', {}).get('identity', 3)
 
 
-def get_session():
-    insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
-    verify = getattr(settings, 'OPENSTACK_SSL_CACERT', True)
+# Default configuration of the HTTP connection pools shared by all the
+# OpenStack service clients. It can be overridden by the
+# OPENSTACK_CONNECTION_POOL setting.
+CONNECTION_POOL_DEFAULTS = {
+    'pool_connections': 10,
+    'pool_maxsize': 10,
+    'pool_block': False,
+    'max_retries': 0,
+    'tcp_keepalive': True,
+}
 
-    if insecure:
-        verify = False
+_requests_sessions = {}
+_requests_sessions_lock = threading.Lock()
 
-    return session.Session(verify=verify)
+
+def get_ssl_verify():
+    """Returns the ``verify`` argument matching the SSL settings."""
+    if getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False):
+        return False
+    return getattr(settings, 'OPENSTACK_SSL_CACERT', None) or True
+
+
+def get_requests_session(verify=True, cert=None, pool_name='default'):
+    """Returns a process-wide ``requests`` session with pooled connections.
+
+    The sessions are shared by all the users and requests and are indexed
+    by their TLS settings, so connections to an endpoint are kept alive and
+    reused instead of paying a TCP and TLS handshake on every API call.
+    ``requests`` already keeps a separate pool for every endpoint host.
+
+    Cookies are never stored, because the session is shared by all users.
+    """
+    key = (verify, cert, pool_name)
+    try:
+        return _requests_sessions[key]
+    except KeyError:
+        pass
+    with _requests_sessions_lock:
+        if key not in _requests_sessions:
+            config = dict(CONNECTION_POOL_DEFAULTS)
+            config.update(getattr(settings, 'OPENSTACK_CONNECTION_POOL', {}))
+            adapter_class = (session.TCPKeepAliveAdapter
+                             if config['tcp_keepalive']
+                             else adapters.HTTPAdapter)
+            requests_session = requests.Session()
+            requests_session.verify = verify
+            requests_session.cert = cert
+            requests_session.cookies.set_policy(
+                http_cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+            for scheme in ('http://', 'https://'):
+                requests_session.mount(scheme, adapter_class(
+                    pool_connections=config['pool_connections'],
+                    pool_maxsize=config['pool_maxsize'],
+                    pool_block=config['pool_block'],
+                    max_retries=config['max_retries']))
+            _requests_sessions[key] = requests_session
+        return _requests_sessions[key]
+
+
+def get_session(**kwargs):
+    """Returns a keystoneauth session using the shared connection pools.
+
+    The keyword arguments, e.g. ``auth``, are passed to the session.
+    """
+    verify = get_ssl_verify()
+    return session.Session(verify=verify,
+                           session=get_requests_session(verify),
+                           **kwargs)
 
 
 def get_keystone_client():
@@ -401,6 +465,90 @@ def get_endpoint_region(endpoint):
     return endpoint.get('region_id') or endpoint.get('region')
 
 
+# Mapping of V2 Catalog Endpoint_type to V3 Catalog Interfaces
+ENDPOINT_TYPE_TO_INTERFACE = {
+    'publicURL': 'public',
+    'internalURL': 'internal',
+    'adminURL': 'admin',
+}
+
+
+class ServiceCatalogIndex(object):
+    """Service catalog indexed by service type, region and interface.
+
+    Looking up a service or an endpoint in the raw catalog means scanning
+    every service and every endpoint, and it happens many times for each
+    page. The index is compiled in one pass and works for both Keystone V2
+    and V3 catalogs; V2 endpoint types (``publicURL``...) are indexed by the
+    matching V3 interface.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._services = {}
+        self._regions = {}
+        self._urls = {}
+        for service in catalog or []:
+            service_type = service.get('type')
+            if service_type is None or service_type in self._services:
+                # The first service of a type wins, as in a linear scan.
+                continue
+            self._services[service_type] = service
+            regions = self._regions[service_type] = set()
+            endpoints = service.get('endpoints', [])
+            is_v3 = bool(endpoints) and 'interface' in endpoints[0]
+            for endpoint in endpoints:
+                region = get_endpoint_region(endpoint)
+                regions.add(region)
+                if is_v3:
+                    urls = {endpoint.get('interface'): endpoint.get('url')}
+                else:
+                    urls = dict((interface, endpoint.get(endpoint_type))
+                                for endpoint_type, interface
+                                in ENDPOINT_TYPE_TO_INTERFACE.items()
+                                if endpoint_type in endpoint)
+                for interface, url in urls.items():
+                    # Identity endpoints are global when the region has no
+                    # identity endpoint, so also index them by region None.
+                    for key_region in (region, None):
+                        self._urls.setdefault(
+                            (service_type, key_region, interface), url)
+
+    def get_service(self, service_type):
+        """Returns the service of the given type, or None."""
+        return self._services.get(service_type)
+
+    def get_regions(self, service_type):
+        """Returns the set of regions with an endpoint of a service."""
+        return self._regions.get(service_type, set())
+
+    def get_services_in_region(self, region):
+        """Returns the types of the services with an endpoint in a region."""
+        return [service_type for service_type, regions
+                in self._regions.items() if region in regions]
+
+    def get_url(self, service_type, region, endpoint_type):
+        """Returns the URL of an endpoint, or None.
+
+        ``endpoint_type`` is a V2 endpoint type, e.g. ``publicURL``.
+        """
+        interface = ENDPOINT_TYPE_TO_INTERFACE.get(endpoint_type)
+        if (service_type == 'identity' and
+                region not in self.get_regions(service_type)):
+            region = None
+        return self._urls.get((service_type, region, interface))
+
+    def is_service_enabled(self, service_type, region):
+        """Whether a service has an endpoint in the region.
+
+        Identity is enabled in every region as soon as it has an endpoint.
+        """
+        regions = self.get_regions(service_type)
+        if service_type == 'identity':
+            return bool(regions)
+        return region in regions
+
+
 def using_cookie_backed_sessions():
     engine = getattr(settings, 'SESSION_ENGINE', '')
     return "signed_cookies" in engine
@@ -32,6 +32,7 @@ import six
 from openstack_auth import exceptions
 from openstack_auth import forms
 from openstack_auth import plugin
+from openstack_auth import policy
 
 # This is historic and is added back in to not break older versions of
 # Horizon, fix to Horizon to remove this requirement was committed in
@@ -116,6 +117,7 @@ def login(request, template_name=None, extra_context=None, **kwargs):
     # will erase it if we set it earlier.
     if request.user.is_authenticated:
         auth_user.set_session_from_user(request, request.user)
+        policy.preload(request)
         regions = dict(forms.Login.get_region_choices())
         region = request.user.endpoint
         login_region = request.POST.get('region')
@@ -219,6 +221,7 @@ def switch(request, tenant_id, redirect_field_name=auth.REDIRECT_FIELD_NAME):
             auth_user.Token(auth_ref, unscoped_token=unscoped_token),
             endpoint)
         auth_user.set_session_from_user(request, user)
+        policy.preload(request)
         message = (
             _('Switch to project "%(project_name)s" successful.') %
             {'project_name': request.user.project_name})
@@ -18,12 +18,22 @@
 
 from collections import Sequence
 import functools
+import uuid
 
 from django.conf import settings
 import semantic_version
 import six
 
+from openstack_auth import utils as auth_utils
+
 from horizon import exceptions
+from horizon.utils import memoized
+
+# Number of seconds the extensions of an endpoint are cached.
+EXTENSION_CACHE_TTL = getattr(settings, 'EXTENSION_CACHE_TTL', 3600)
+
+# Number of seconds the quota usages of a project are cached.
+QUOTA_USAGES_CACHE_TTL = getattr(settings, 'QUOTA_USAGES_CACHE_TTL', 30)
 
 
 __all__ = ('APIResourceWrapper', 'APIDictWrapper',
@@ -279,43 +289,23 @@ def get_version_from_service(service):
 
 
 # Mapping of V2 Catalog Endpoint_type to V3 Catalog Interfaces
-ENDPOINT_TYPE_TO_INTERFACE = {
-    'publicURL': 'public',
-    'internalURL': 'internal',
-    'adminURL': 'admin',
-}
+ENDPOINT_TYPE_TO_INTERFACE = auth_utils.ENDPOINT_TYPE_TO_INTERFACE
 
 
 def get_url_for_service(service, region, endpoint_type):
     if 'type' not in service:
         return None
+    index = auth_utils.ServiceCatalogIndex([service])
+    return index.get_url(service['type'], region, endpoint_type)
 
-    identity_version = get_version_from_service(service)
-    service_endpoints = service.get('endpoints', [])
-    available_endpoints = [endpoint for endpoint in service_endpoints
-                           if region == _get_endpoint_region(endpoint)]
-    """if we are dealing with the identity service and there is no endpoint
-    in the current region, it is okay to use the first endpoint for any
-    identity service endpoints and we can assume that it is global
-    """
-    if service['type'] == 'identity' and not available_endpoints:
-        available_endpoints = [endpoint for endpoint in service_endpoints]
 
-    for endpoint in available_endpoints:
-        try:
-            if identity_version < 3:
-                return endpoint.get(endpoint_type)
-            else:
-                interface = \
-                    ENDPOINT_TYPE_TO_INTERFACE.get(endpoint_type, '')
-                if endpoint.get('interface') == interface:
-                    return endpoint.get('url')
-        except (IndexError, KeyError):
-            """it could be that the current endpoint just doesn't match the
-            type, continue trying the next one
-            """
-            pass
-    return None
+def get_service_catalog_index(request):
+    """Returns the indexed service catalog of the user of the request."""
+    index = getattr(request.user, 'service_catalog_index', None)
+    if not isinstance(index, auth_utils.ServiceCatalogIndex):
+        # Users which are not openstack_auth users don't keep an index.
+        index = auth_utils.ServiceCatalogIndex(request.user.service_catalog)
+    return index
 
 
 def url_for(request, service_type, endpoint_type=None, region=None):
@@ -324,36 +314,22 @@ def url_for(request, service_type, endpoint_type=None, region=None):
                                              'publicURL')
     fallback_endpoint_type = getattr(settings, 'SECONDARY_ENDPOINT_TYPE', None)
 
-    catalog = request.user.service_catalog
-    service = get_service_from_catalog(catalog, service_type)
-    if service:
+    index = get_service_catalog_index(request)
+    if index.get_service(service_type):
         if not region:
             region = request.user.services_region
-        url = get_url_for_service(service,
-                                  region,
-                                  endpoint_type)
+        url = index.get_url(service_type, region, endpoint_type)
         if not url and fallback_endpoint_type:
-            url = get_url_for_service(service,
-                                      region,
-                                      fallback_endpoint_type)
+            url = index.get_url(service_type, region, fallback_endpoint_type)
         if url:
             return url
     raise exceptions.ServiceCatalogException(service_type)
 
 
 def is_service_enabled(request, service_type):
-    service = get_service_from_catalog(request.user.service_catalog,
-                                       service_type)
-    if service:
-        region = request.user.services_region
-        for endpoint in service.get('endpoints', []):
-            if 'type' not in service:
-                continue
-            # ignore region for identity
-            if service['type'] == 'identity' or \
-               _get_endpoint_region(endpoint) == region:
-                return True
-    return False
+    index = get_service_catalog_index(request)
+    return index.is_service_enabled(service_type,
+                                    request.user.services_region)
 
 
 def _get_endpoint_region(endpoint):
@@ -365,4 +341,85 @@ def _get_endpoint_region(endpoint):
     This method provides a way to get region that works for
     both Keystone V2 and V3.
     """
-    return endpoint.get('region_id') or endpoint.get('region')
+    return auth_utils.get_endpoint_region(endpoint)
+
+
+@memoized.shared_memoized(
+    ttl=EXTENSION_CACHE_TTL,
+    key=lambda service, url, *args: (service, url))
+def get_extensions(service, url, discover, *args):
+    """Returns the extensions of the endpoint of a service.
+
+    ``discover`` is called with ``args`` and must return a dict of the
+    extensions keyed by the identifier used to look them up, e.g. their name
+    or alias. The result is shared by all users and requests of the endpoint
+    until it expires or is invalidated.
+    """
+    return discover(*args)
+
+
+def invalidate_extension_cache(service=None, url=None):
+    """Forgets the cached extensions so they are discovered again.
+
+    This is meant to be called when extensions are enabled or disabled on
+    a deployment, e.g. through the ``clear_extension_cache`` management
+    command. When ``service`` and ``url`` are given, only the extensions of
+    this endpoint are forgotten, otherwise the extensions of all the
+    endpoints are. With the ``'local'`` backend of ``MEMOIZED_CACHE``, only
+    the cache of the calling process is cleared.
+    """
+    if service and url:
+        get_extensions.invalidate(service, url)
+    else:
+        get_extensions.cache_clear()
+
+
+@memoized.shared_memoized(
+    ttl=QUOTA_USAGES_CACHE_TTL,
+    key=lambda tenant_id, region, pending=False: (tenant_id, region))
+def get_quota_usages_generation(tenant_id, region, pending=False):
+    """Returns the current generation of the quota usages of a project.
+
+    It is a ``(token, pending)`` tuple. The quota usages are cached under
+    the token, which changes when :func:`invalidate_quota_usages` is called
+    for the project, so that the usages cached for all the sets of quotas
+    are forgotten at once. ``pending`` is ``True`` while the changes which
+    invalidated the usages may still be in progress, and the usages must
+    not be cached then.
+    """
+    return uuid.uuid4().hex, pending
+
+
+def invalidate_quota_usages(tenant_id=None, region=None):
+    """Forgets the cached quota usages so they are retrieved again.
+
+    When ``tenant_id`` is given, only the usages of this project in
+    ``region`` are forgotten, otherwise the usages of all the projects are.
+    Most services create and delete resources asynchronously, so the usages
+    of the project are then not cached again for ``QUOTA_USAGES_CACHE_TTL``
+    seconds: the usages retrieved meanwhile may still count a resource
+    being deleted.
+    """
+    if tenant_id:
+        get_quota_usages_generation.invalidate(tenant_id, region)
+        # The pending generation expires with the cached usages.
+        get_quota_usages_generation(tenant_id, region, pending=True)
+    else:
+        get_quota_usages_generation.cache_clear()
+
+
+def invalidates_quota_usages(func):
+    """Decorator for the API calls creating or deleting resources.
+
+    The quota usages of the project of the request are forgotten once the
+    call returns or fails, since the resource may have been created or
+    deleted in both cases.
+    """
+    @functools.wraps(func)
+    def wrapped(request, *args, **kwargs):
+        try:
+            return func(request, *args, **kwargs)
+        finally:
+            invalidate_quota_usages(request.user.project_id,
+                                    request.user.services_region)
+    return wrapped
@@ -20,6 +20,7 @@
 
 from __future__ import absolute_import
 
+import collections
 import logging
 
 from django.conf import settings
@@ -30,16 +31,21 @@ from cinderclient import api_versions
 from cinderclient import client as cinder_client
 from cinderclient import exceptions as cinder_exception
 from cinderclient.v2.contrib import list_extensions as cinder_list_extensions
+from keystoneauth1 import token_endpoint
+
+from openstack_auth import utils as auth_utils
 
 from horizon import exceptions
 from horizon.utils import functions as utils
 from horizon.utils.memoized import memoized
 from horizon.utils.memoized import memoized_with_request
+from horizon.utils.memoized import shared_memoized
 
 from openstack_dashboard.api import base
 from openstack_dashboard.api import microversions
 from openstack_dashboard.api import nova
 from openstack_dashboard.contrib.developer.profiler import api as profiler
+from openstack_dashboard.utils import futurist_utils
 
 LOG = logging.getLogger(__name__)
 
@@ -48,6 +54,9 @@ LOG = logging.getLogger(__name__)
 VOLUME_STATE_AVAILABLE = "available"
 DEFAULT_QUOTA_NAME = 'default'
 
+QOS_ASSOCIATIONS_CACHE_TTL = getattr(settings, 'QOS_ASSOCIATIONS_CACHE_TTL',
+                                     300)
+
 # Available consumer choices associated with QOS Specs
 CONSUMER_CHOICES = (
     ('back-end', _('back-end')),
@@ -199,8 +208,6 @@ def cinderclient(request_auth_params, version=None):
     if version is None:
         api_version = VERSIONS.get_active_version()
         version = api_version['version']
-    insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
-    cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
 
     username, token_id, tenant_id, cinder_urls, auth_url = request_auth_params
     version = base.Version(version)
@@ -219,31 +226,34 @@ def cinderclient(request_auth_params, version=None):
             "type available in Keystone catalog.".format(version=version,
                                                          service=service_names)
         )
+    # The session shares its HTTP connection pool with all the other clients.
+    auth = token_endpoint.Token(cinder_url, token_id)
     c = cinder_client.Client(
         version,
-        username,
-        token_id,
         project_id=tenant_id,
-        auth_url=auth_url,
-        insecure=insecure,
-        cacert=cacert,
+        session=auth_utils.get_session(auth=auth),
+        endpoint_override=cinder_url,
         http_log_debug=settings.DEBUG,
     )
-    c.client.auth_token = token_id
-    c.client.management_url = cinder_url
     return c
 
 
-def get_microversion(request, features):
+def _get_cinder_url(request):
     for service_name in ('volume', 'volumev2', 'volumev3'):
         try:
-            cinder_url = base.url_for(request, service_name)
-            break
+            return base.url_for(request, service_name)
         except exceptions.ServiceCatalogException:
             continue
-    else:
+    raise exceptions.ServiceCatalogException("no volume service configured")
+
+
+def get_microversion(request, features):
+    try:
+        cinder_url = _get_cinder_url(request)
+    except exceptions.ServiceCatalogException:
         return None
-    min_ver, max_ver = cinder_client.get_server_version(cinder_url)
+    min_ver, max_ver = microversions.get_server_version_range(
+        'cinder', cinder_url, cinder_client.get_server_version, cinder_url)
     return (microversions.get_microversion_for_features(
         'cinder', features, api_versions.APIVersion, min_ver, max_ver))
 
@@ -353,6 +363,7 @@ def volume_get(request, volume_id):
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def volume_create(request, size, name, description, volume_type,
                   snapshot_id=None, metadata=None, image_id=None,
                   availability_zone=None, source_volid=None):
@@ -371,11 +382,13 @@ def volume_create(request, size, name, description, volume_type,
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def volume_extend(request, volume_id, new_size):
     return cinderclient(request).volumes.extend(volume_id, new_size)
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def volume_delete(request, volume_id):
     return cinderclient(request).volumes.delete(volume_id)
 
@@ -448,16 +461,17 @@ def volume_snapshot_get(request, snapshot_id):
 
 
 @profiler.trace
-def volume_snapshot_list(request, search_opts=None):
+def volume_snapshot_list(request, search_opts=None, limit=None):
     snapshots, _, __ = volume_snapshot_list_paged(request,
                                                   search_opts=search_opts,
-                                                  paginate=False)
+                                                  paginate=False,
+                                                  limit=limit)
     return snapshots
 
 
 @profiler.trace
 def volume_snapshot_list_paged(request, search_opts=None, marker=None,
-                               paginate=False, sort_dir="desc"):
+                               paginate=False, sort_dir="desc", limit=None):
     has_more_data = False
     has_prev_data = False
     snapshots = []
@@ -480,13 +494,18 @@ def volume_snapshot_list_paged(request, search_opts=None, marker=None,
         snapshots, has_more_data, has_prev_data = update_pagination(
             snapshots, page_size, marker, sort_dir)
     else:
-        for s in c_client.volume_snapshots.list(search_opts=search_opts):
+        # The limit is only honored by the unpaginated listing, e.g. to
+        # check whether a volume has any snapshot.
+        kwargs = {'limit': limit} if limit else {}
+        for s in c_client.volume_snapshots.list(search_opts=search_opts,
+                                                **kwargs):
             snapshots.append(VolumeSnapshot(s))
 
     return snapshots, has_more_data, has_prev_data
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def volume_snapshot_create(request, volume_id, name,
                            description=None, force=False):
     data = {'name': name,
@@ -499,6 +518,7 @@ def volume_snapshot_create(request, volume_id, name,
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def volume_snapshot_delete(request, snapshot_id):
     return cinderclient(request).volume_snapshots.delete(snapshot_id)
 
@@ -586,6 +606,7 @@ def volume_cgroup_create(request, volume_types, name,
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def volume_cgroup_create_from_source(request, name, cg_snapshot_id=None,
                                      source_cgroup_id=None,
                                      description=None,
@@ -601,6 +622,7 @@ def volume_cgroup_create_from_source(request, name, cg_snapshot_id=None,
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def volume_cgroup_delete(request, cgroup_id, force=False):
     return cinderclient(request).consistencygroups.delete(cgroup_id, force)
 
@@ -621,6 +643,7 @@ def volume_cgroup_update(request, cgroup_id, name=None, description=None,
                                                           **cgroup_data)
 
 
+@base.invalidates_quota_usages
 def volume_cg_snapshot_create(request, cgroup_id, name,
                               description=None):
     return VolumeCGSnapshot(
@@ -643,6 +666,7 @@ def volume_cg_snapshot_list(request, search_opts=None):
         search_opts=search_opts)]
 
 
+@base.invalidates_quota_usages
 def volume_cg_snapshot_delete(request, cg_snapshot_id):
     return cinderclient(request).cgsnapshots.delete(cg_snapshot_id)
 
@@ -725,12 +749,14 @@ def volume_backup_delete(request, backup_id):
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def volume_backup_restore(request, backup_id, volume_id):
     return cinderclient(request).restores.restore(backup_id=backup_id,
                                                   volume_id=volume_id)
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def volume_manage(request,
                   host,
                   identifier,
@@ -754,6 +780,7 @@ def volume_manage(request,
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def volume_unmanage(request, volume_id):
     return cinderclient(request).volumes.unmanage(volume=volume_id)
 
@@ -768,7 +795,10 @@ def tenant_quota_get(request, tenant_id):
 
 @profiler.trace
 def tenant_quota_update(request, tenant_id, **kwargs):
-    return cinderclient(request).quotas.update(tenant_id, **kwargs)
+    try:
+        return cinderclient(request).quotas.update(tenant_id, **kwargs)
+    finally:
+        base.invalidate_quota_usages(tenant_id, request.user.services_region)
 
 
 @profiler.trace
@@ -776,49 +806,44 @@ def default_quota_get(request, tenant_id):
     return base.QuotaSet(cinderclient(request).quotas.defaults(tenant_id))
 
 
-def volume_type_list_with_qos_associations(request):
-    vol_types = volume_type_list(request)
-    vol_types_dict = {}
-
-    # initialize and build a dictionary for lookup access below
-    for vol_type in vol_types:
-        vol_type.associated_qos_spec = ""
-        vol_types_dict[vol_type.id] = vol_type
-
-    # get all currently defined qos specs
+@shared_memoized(ttl=QOS_ASSOCIATIONS_CACHE_TTL,
+                 key=lambda request: (_get_cinder_url(request),))
+def _get_qos_associations(request):
+    """Returns the name of the QoS spec associated with each volume type."""
     qos_specs = qos_spec_list(request)
-    for qos_spec in qos_specs:
-        # get all volume types this qos spec is associated with
-        assoc_vol_types = qos_spec_get_associations(request, qos_spec.id)
+    # get all volume types each qos spec is associated with
+    associations = futurist_utils.call_functions_parallel(
+        *[(qos_spec_get_associations, [request, qos_spec.id])
+          for qos_spec in qos_specs])
+    qos_spec_names = {}
+    for qos_spec, assoc_vol_types in zip(qos_specs, associations):
         for assoc_vol_type in assoc_vol_types:
-            # update volume type to hold this association info
-            vol_type = vol_types_dict[assoc_vol_type.id]
-            vol_type.associated_qos_spec = qos_spec.name
+            qos_spec_names[assoc_vol_type.id] = qos_spec.name
+    return qos_spec_names
+
 
+def volume_type_list_with_qos_associations(request):
+    vol_types = volume_type_list(request)
+    qos_spec_names = _get_qos_associations(request)
+    for vol_type in vol_types:
+        vol_type.associated_qos_spec = qos_spec_names.get(vol_type.id, "")
     return vol_types
 
 
 def volume_type_get_with_qos_association(request, volume_type_id):
     vol_type = volume_type_get(request, volume_type_id)
-    vol_type.associated_qos_spec = ""
-
-    # get all currently defined qos specs
-    qos_specs = qos_spec_list(request)
-    for qos_spec in qos_specs:
-        # get all volume types this qos spec is associated with
-        assoc_vol_types = qos_spec_get_associations(request, qos_spec.id)
-        for assoc_vol_type in assoc_vol_types:
-            if vol_type.id == assoc_vol_type.id:
-                # update volume type to hold this association info
-                vol_type.associated_qos_spec = qos_spec.name
-                return vol_type
-
+    vol_type.associated_qos_spec = _get_qos_associations(request).get(
+        vol_type.id, "")
     return vol_type
 
 
 @profiler.trace
 def default_quota_update(request, **kwargs):
-    cinderclient(request).quota_classes.update(DEFAULT_QUOTA_NAME, **kwargs)
+    try:
+        cinderclient(request).quota_classes.update(DEFAULT_QUOTA_NAME,
+                                                   **kwargs)
+    finally:
+        base.invalidate_quota_usages()
 
 
 @profiler.trace
@@ -922,7 +947,11 @@ def qos_spec_get(request, qos_spec_id):
 
 @profiler.trace
 def qos_spec_delete(request, qos_spec_id):
-    return cinderclient(request).qos_specs.delete(qos_spec_id, force=True)
+    try:
+        return cinderclient(request).qos_specs.delete(qos_spec_id,
+                                                      force=True)
+    finally:
+        _get_qos_associations.invalidate(request)
 
 
 @profiler.trace
@@ -951,12 +980,20 @@ def qos_spec_unset_keys(request, qos_spec_id, specs):
 
 @profiler.trace
 def qos_spec_associate(request, qos_specs, vol_type_id):
-    return cinderclient(request).qos_specs.associate(qos_specs, vol_type_id)
+    try:
+        return cinderclient(request).qos_specs.associate(qos_specs,
+                                                         vol_type_id)
+    finally:
+        _get_qos_associations.invalidate(request)
 
 
 @profiler.trace
 def qos_spec_disassociate(request, qos_specs, vol_type_id):
-    return cinderclient(request).qos_specs.disassociate(qos_specs, vol_type_id)
+    try:
+        return cinderclient(request).qos_specs.disassociate(qos_specs,
+                                                            vol_type_id)
+    finally:
+        _get_qos_associations.invalidate(request)
 
 
 @profiler.trace
@@ -999,19 +1036,31 @@ def availability_zone_list(request, detailed=False):
     return cinderclient(request).availability_zones.list(detailed=detailed)
 
 
+def _discover_extensions(cinder_api):
+    # The extensions are shared by all users, so they are detached from
+    # the manager and client of the user who discovered them.
+    return collections.OrderedDict(
+        (extension.name, extension.__class__(None, extension.to_dict(),
+                                             loaded=True))
+        for extension in
+        cinder_list_extensions.ListExtManager(cinder_api).show_all()
+    )
+
+
+@memoized
+def _get_extensions(request):
+    return base.get_extensions('cinder', _get_cinder_url(request),
+                               _discover_extensions, cinderclient(request))
+
+
 @profiler.trace
-@memoized_with_request(cinderclient)
-def list_extensions(cinder_api):
-    return tuple(cinder_list_extensions.ListExtManager(cinder_api).show_all())
+def list_extensions(request):
+    return tuple(_get_extensions(request).values())
 
 
-@memoized_with_request(list_extensions)
-def extension_supported(extensions, extension_name):
+def extension_supported(request, extension_name):
     """This method will determine if Cinder supports a given extension name."""
-    for extension in extensions:
-        if extension.name == extension_name:
-            return True
-    return False
+    return extension_name in _get_extensions(request)
 
 
 @profiler.trace
@@ -1043,6 +1092,7 @@ def transfer_create(request, transfer_id, name):
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def transfer_accept(request, transfer_id, auth_key):
     return cinderclient(request).transfers.accept(transfer_id, auth_key)
 
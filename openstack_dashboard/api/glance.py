@@ -30,18 +30,25 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.files.uploadedfile import TemporaryUploadedFile
 
 import glanceclient as glance_client
+from keystoneauth1 import token_endpoint
 import six
 from six.moves import _thread as thread
 
+from openstack_auth import utils as auth_utils
+
 from horizon.utils import functions as utils
 from horizon.utils.memoized import memoized
+from horizon.utils.memoized import shared_memoized
 from openstack_dashboard.api import base
 from openstack_dashboard.contrib.developer.profiler import api as profiler
+from openstack_dashboard.utils import futurist_utils
 
 
 LOG = logging.getLogger(__name__)
 VERSIONS = base.APIVersionManager("image", preferred_version=2)
 
+METADEFS_CACHE_TTL = getattr(settings, 'METADEFS_CACHE_TTL', 3600)
+
 try:
     from glanceclient.v2 import client as glance_client_v2
     VERSIONS.load_supported_version(2, {"client": glance_client_v2,
@@ -135,18 +142,17 @@ def glanceclient(request, version=None):
     api_version = VERSIONS.get_active_version()
 
     url = base.url_for(request, 'image')
-    insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
-    cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
+    # The session shares its HTTP connection pool with all the other clients.
+    auth = token_endpoint.Token(url, request.user.token.id)
+    session = auth_utils.get_session(auth=auth)
 
     # TODO(jpichon): Temporarily keep both till we update the API calls
     # to stop hardcoding a version in this file. Once that's done we
     # can get rid of the deprecated 'version' parameter.
     if version is None:
-        return api_version['client'].Client(url, token=request.user.token.id,
-                                            insecure=insecure, cacert=cacert)
+        return api_version['client'].Client(url, session=session)
     else:
-        return glance_client.Client(version, url, token=request.user.token.id,
-                                    insecure=insecure, cacert=cacert)
+        return glance_client.Client(version, url, session=session)
 
 
 # Note: Glance is adding more than just public and private in Newton or later
@@ -647,35 +653,86 @@ def metadefs_namespace_list(request,
     return namespaces, has_more_data, has_prev_data
 
 
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _get_namespace_names_key(request, *args, **kwargs):
+    # The namespaces visible to a user depend on their project and roles,
+    # and the page size on their settings.
+    return (base.url_for(request, 'image'), request.user.project_id,
+            tuple(sorted(role['name'] for role in request.user.roles)),
+            utils.get_page_size(request), _freeze(args), _freeze(kwargs))
+
+
+@shared_memoized(ttl=METADEFS_CACHE_TTL, key=_get_namespace_names_key)
+def _get_namespace_names(request, *args, **kwargs):
+    namespaces, has_more_data, has_prev_data = metadefs_namespace_list(
+        request, *args, **kwargs)
+    return [x.namespace for x in namespaces], has_more_data, has_prev_data
+
+
+# The body of a namespace is the same for all the users who can list it.
+@shared_memoized(
+    ttl=METADEFS_CACHE_TTL,
+    key=lambda request, namespace, resource_type: (
+        base.url_for(request, 'image'), namespace, resource_type))
+def _get_namespace(request, namespace, resource_type):
+    # Plain dicts are cached, the models of glanceclient do not pickle.
+    return dict(metadefs_namespace_get(request, namespace, resource_type))
+
+
+def _invalidate_metadefs_cache():
+    # Namespaces are rarely changed, and a change can affect the listings
+    # and the bodies of any resource type.
+    _get_namespace_names.cache_clear()
+    _get_namespace.cache_clear()
+
+
 @profiler.trace
 def metadefs_namespace_full_list(request, resource_type, filters=None,
                                  *args, **kwargs):
     filters = filters or {}
     filters['resource_types'] = [resource_type]
-    namespaces, has_more_data, has_prev_data = metadefs_namespace_list(
+    names, has_more_data, has_prev_data = _get_namespace_names(
         request, filters, *args, **kwargs
     )
-    return [
-        metadefs_namespace_get(request, x.namespace, resource_type)
-        for x in namespaces
-    ], has_more_data, has_prev_data
+    namespaces = futurist_utils.call_functions_parallel(
+        *[(_get_namespace, [request, name, resource_type]) for name in names]
+    )
+    return list(namespaces), has_more_data, has_prev_data
 
 
 @profiler.trace
 def metadefs_namespace_create(request, namespace):
-    return glanceclient(request, '2').metadefs_namespace.create(**namespace)
+    try:
+        return glanceclient(request, '2').metadefs_namespace.create(
+            **namespace)
+    finally:
+        _invalidate_metadefs_cache()
 
 
 @profiler.trace
 def metadefs_namespace_update(request, namespace_name, **properties):
-    return glanceclient(request, '2').metadefs_namespace.update(
-        namespace_name,
-        **properties)
+    try:
+        return glanceclient(request, '2').metadefs_namespace.update(
+            namespace_name,
+            **properties)
+    finally:
+        _invalidate_metadefs_cache()
 
 
 @profiler.trace
 def metadefs_namespace_delete(request, namespace_name):
-    return glanceclient(request, '2').metadefs_namespace.delete(namespace_name)
+    try:
+        return glanceclient(request, '2').metadefs_namespace.delete(
+            namespace_name)
+    finally:
+        _invalidate_metadefs_cache()
 
 
 @profiler.trace
@@ -701,16 +758,22 @@ def metadefs_namespace_resource_types(request, namespace_name):
 def metadefs_namespace_add_resource_type(request,
                                          namespace_name,
                                          resource_type):
-    return glanceclient(request, '2').metadefs_resource_type.associate(
-        namespace_name, **resource_type)
+    try:
+        return glanceclient(request, '2').metadefs_resource_type.associate(
+            namespace_name, **resource_type)
+    finally:
+        _invalidate_metadefs_cache()
 
 
 @profiler.trace
 def metadefs_namespace_remove_resource_type(request,
                                             namespace_name,
                                             resource_type_name):
-    glanceclient(request, '2').metadefs_resource_type.deassociate(
-        namespace_name, resource_type_name)
+    try:
+        glanceclient(request, '2').metadefs_resource_type.deassociate(
+            namespace_name, resource_type_name)
+    finally:
+        _invalidate_metadefs_cache()
 
 
 def get_version():
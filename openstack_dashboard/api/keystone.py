@@ -25,6 +25,7 @@ from django.utils.translation import ugettext_lazy as _
 import six
 import six.moves.urllib.parse as urlparse
 
+from keystoneauth1 import token_endpoint
 from keystoneclient import exceptions as keystone_exceptions
 
 from openstack_auth import backend
@@ -184,16 +185,16 @@ def keystoneclient(request, admin=False):
         conn = getattr(request, cache_attr)
     else:
         endpoint = _get_endpoint_url(request, endpoint_type)
-        insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
-        cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
         LOG.debug("Creating a new keystoneclient connection to %s.", endpoint)
         remote_addr = request.environ.get('REMOTE_ADDR', '')
+        # The session shares its HTTP connection pool with all the other
+        # clients.
+        session = auth_utils.get_session(
+            auth=token_endpoint.Token(endpoint, token_id),
+            original_ip=remote_addr)
         conn = api_version['client'].Client(token=token_id,
-                                            endpoint=endpoint,
-                                            original_ip=remote_addr,
-                                            insecure=insecure,
-                                            cacert=cacert,
-                                            auth_url=endpoint,
+                                            session=session,
+                                            endpoint_override=endpoint,
                                             debug=settings.DEBUG)
         setattr(request, cache_attr, conn)
     return conn
@@ -641,6 +642,22 @@ def remove_group_user(request, group_id, user_id):
     return manager.remove_from_group(group=group_id, user=user_id)
 
 
+def _get_project_actors_roles(role_assignments, project):
+    users_roles = collections.defaultdict(list)
+    groups_roles = collections.defaultdict(list)
+    for role_assignment in role_assignments:
+        # filter by project_id
+        if ('project' not in role_assignment.scope or
+                role_assignment.scope['project']['id'] != project):
+            continue
+        role_id = role_assignment.role['id']
+        if hasattr(role_assignment, 'user'):
+            users_roles[role_assignment.user['id']].append(role_id)
+        elif hasattr(role_assignment, 'group'):
+            groups_roles[role_assignment.group['id']].append(role_id)
+    return users_roles, groups_roles
+
+
 def get_project_groups_roles(request, project):
     """Gets the groups roles in a given project.
 
@@ -652,21 +669,28 @@ def get_project_groups_roles(request, project):
                           given project
 
     """
-    groups_roles = collections.defaultdict(list)
     project_role_assignments = role_assignments_list(request,
                                                      project=project)
+    return _get_project_actors_roles(project_role_assignments, project)[1]
 
-    for role_assignment in project_role_assignments:
-        if not hasattr(role_assignment, 'group'):
-            continue
-        group_id = role_assignment.group['id']
-        role_id = role_assignment.role['id']
 
-        # filter by project_id
-        if ('project' in role_assignment.scope and
-                role_assignment.scope['project']['id'] == project):
-            groups_roles[group_id].append(role_id)
-    return groups_roles
+def get_project_users_groups_roles(request, project):
+    """Gets the users roles and the groups roles in a given project.
+
+    Both are retrieved with a single listing of the role assignments of
+    the project. With Keystone v2, the groups roles are always empty.
+
+    :param request: the request entity containing the login user information
+    :param project: the ID of the project to filter the roles
+
+    :returns: a tuple of two dictionaries mapping the users and the groups
+              to their roles in given project
+    """
+    if VERSIONS.active < 3:
+        return get_project_users_roles(request, project), {}
+    project_role_assignments = role_assignments_list(request,
+                                                     project=project)
+    return _get_project_actors_roles(project_role_assignments, project)
 
 
 @profiler.trace
@@ -787,16 +811,8 @@ def get_project_users_roles(request, project):
     else:
         project_role_assignments = role_assignments_list(request,
                                                          project=project)
-        for role_assignment in project_role_assignments:
-            if not hasattr(role_assignment, 'user'):
-                continue
-            user_id = role_assignment.user['id']
-            role_id = role_assignment.role['id']
-
-            # filter by project_id
-            if ('project' in role_assignment.scope and
-                    role_assignment.scope['project']['id'] == project):
-                    users_roles[user_id].append(role_id)
+        users_roles = _get_project_actors_roles(project_role_assignments,
+                                                project)[0]
     return users_roles
 
 
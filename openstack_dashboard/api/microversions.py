@@ -14,8 +14,15 @@
 
 import logging
 
+from django.conf import settings
+
+from horizon.utils import memoized
+
 LOG = logging.getLogger(__name__)
 
+# Number of seconds the version range of an endpoint is cached.
+VERSION_CACHE_TTL = getattr(settings, 'API_VERSION_CACHE_TTL', 3600)
+
 # A list of features and their supported microversions. Note that these are
 # explicit functioning versions, not a range.
 # There should be a minimum of two versions per feature. The first entry in
@@ -73,3 +80,16 @@ def get_microversion_for_features(service, features, wrapper_class,
         if microversion.matches(min_ver, max_ver):
             return microversion
     return None
+
+
+@memoized.shared_memoized(
+    ttl=VERSION_CACHE_TTL,
+    key=lambda service, url, discover, *args: (service, url))
+def get_server_version_range(service, url, discover, *args):
+    """Returns the supported version range of the endpoint of a service.
+
+    ``discover`` is called with ``args`` to retrieve the
+    ``(min_version, max_version)`` tuple from the server. The result is
+    shared by all users and requests of the endpoint until it expires.
+    """
+    return discover(*args)
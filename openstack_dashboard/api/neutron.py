@@ -21,25 +21,33 @@ from __future__ import absolute_import
 
 import collections
 import copy
+import datetime
 import logging
+import time
 
 import netaddr
 
 from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
+from keystoneauth1 import token_endpoint
 from neutronclient.common import exceptions as neutron_exc
 from neutronclient.v2_0 import client as neutron_client
 from novaclient import exceptions as nova_exc
 import six
 
+from openstack_auth import utils as auth_utils
+
 from horizon import exceptions
 from horizon import messages
+from horizon.utils.memoized import LocalLRUStore
 from horizon.utils.memoized import memoized
 from horizon.utils.memoized import memoized_with_request
+from horizon.utils.memoized import shared_memoized
 from openstack_dashboard.api import base
 from openstack_dashboard.api import nova
 from openstack_dashboard.contrib.developer.profiler import api as profiler
 from openstack_dashboard import policy
+from openstack_dashboard.utils import futurist_utils
 
 
 LOG = logging.getLogger(__name__)
@@ -49,6 +57,18 @@ IP_VERSION_DICT = {4: 'IPv4', 6: 'IPv6'}
 OFF_STATE = 'OFF'
 ON_STATE = 'ON'
 
+# Default configuration of the cache of the server addresses. It can be
+# overridden by the SERVER_ADDRESS_CACHE setting.
+SERVER_ADDRESS_CACHE_DEFAULTS = {
+    'enabled': True,
+    'ttl': 300,
+    'max_size': 10000,
+    'clock_skew': 60,
+}
+
+# Number of seconds the networks hosted by the DHCP agents are cached.
+DHCP_AGENTS_CACHE_TTL = getattr(settings, 'DHCP_AGENTS_CACHE_TTL', 30)
+
 ROUTER_INTERFACE_OWNERS = (
     'network:router_interface',
     'network:router_interface_distributed',
@@ -772,12 +792,10 @@ def get_auth_params_from_request(request):
 @memoized_with_request(get_auth_params_from_request)
 def neutronclient(request_auth_params):
     token_id, neutron_url, auth_url = request_auth_params
-    insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
-    cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
-    c = neutron_client.Client(token=token_id,
-                              auth_url=auth_url,
-                              endpoint_url=neutron_url,
-                              insecure=insecure, ca_cert=cacert)
+    # The session shares its HTTP connection pool with all the other clients.
+    auth = token_endpoint.Token(neutron_url, token_id)
+    c = neutron_client.Client(session=auth_utils.get_session(auth=auth),
+                              endpoint_override=neutron_url)
     return c
 
 
@@ -975,8 +993,15 @@ def network_list(request, **params):
     LOG.debug("network_list(): params=%s", params)
     networks = neutronclient(request).list_networks(**params).get('networks')
     # Get subnet list to expand subnet info in network list.
-    subnets = subnet_list(request)
-    subnet_dict = dict([(s['id'], s) for s in subnets])
+    # Only the subnets of the listed networks are retrieved, an admin
+    # would otherwise retrieve all the subnets of the cloud.
+    subnet_ids = collections.OrderedDict.fromkeys(
+        s for n in networks for s in n.get('subnets', []))
+    subnet_dict = {}
+    if subnet_ids:
+        subnets = list_resources_with_long_filters(
+            subnet_list, 'id', tuple(subnet_ids), request=request)
+        subnet_dict = dict([(s['id'], s) for s in subnets])
     # Expand subnet list from subnet_id to values.
     for n in networks:
         # Due to potential timing issues, we can't assume the subnet_dict data
@@ -997,36 +1022,41 @@ def network_list_for_tenant(request, tenant_id, include_external=False,
     LOG.debug("network_list_for_tenant(): tenant_id=%(tenant_id)s, "
               "params=%(params)s", {'tenant_id': tenant_id, 'params': params})
 
-    networks = []
     shared = params.get('shared')
     if shared is not None:
         del params['shared']
 
+    # In the current Neutron API, there is no way to retrieve both owner
+    # networks and public networks in a single API call, so the queries
+    # are run concurrently.
+    queries = []
     if shared in (None, False):
         # If a user has admin role, network list returned by Neutron API
         # contains networks that do not belong to that tenant.
         # So we need to specify tenant_id when calling network_list().
-        networks += network_list(request, tenant_id=tenant_id,
-                                 shared=False, **params)
+        queries.append((network_list, [request],
+                        dict(params, tenant_id=tenant_id, shared=False)))
 
     if shared in (None, True):
-        # In the current Neutron API, there is no way to retrieve
-        # both owner networks and public networks in a single API call.
-        networks += network_list(request, shared=True, **params)
+        queries.append((network_list, [request],
+                        dict(params, shared=True)))
+
     params['router:external'] = params.get('router:external', True)
     if params['router:external'] and include_external:
         if shared is not None:
             params['shared'] = shared
-        fetched_net_ids = [n.id for n in networks]
         # Retrieves external networks when router:external is not specified
         # in (filtering) params or router:external=True filter is specified.
         # When router:external=False is specified there is no need to query
         # networking API because apparently nothing will match the filter.
-        ext_nets = network_list(request, **params)
-        networks += [n for n in ext_nets if
-                     n.id not in fetched_net_ids]
+        queries.append((network_list, [request], params))
 
-    return networks
+    # External networks may also be owned by the tenant or shared.
+    networks = collections.OrderedDict()
+    for result in futurist_utils.call_functions_parallel(*queries):
+        for network in result:
+            networks.setdefault(network.id, network)
+    return list(networks.values())
 
 
 @profiler.trace
@@ -1057,6 +1087,7 @@ def network_get(request, network_id, expand_subnet=True, **params):
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def network_create(request, **kwargs):
     """Create a  network object.
 
@@ -1084,6 +1115,7 @@ def network_update(request, network_id, **kwargs):
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def network_delete(request, network_id):
     LOG.debug("network_delete(): netid=%s", network_id)
     neutronclient(request).delete_network(network_id)
@@ -1107,6 +1139,7 @@ def subnet_get(request, subnet_id, **params):
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def subnet_create(request, network_id, **kwargs):
     """Create a subnet on a specified network.
 
@@ -1146,6 +1179,7 @@ def subnet_update(request, subnet_id, **kwargs):
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def subnet_delete(request, subnet_id):
     LOG.debug("subnet_delete(): subnetid=%s", subnet_id)
     neutronclient(request).delete_subnet(subnet_id)
@@ -1295,6 +1329,7 @@ def unescape_port_kwargs(**kwargs):
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def port_create(request, network_id, **kwargs):
     """Create a port on a specified network.
 
@@ -1317,6 +1352,7 @@ def port_create(request, network_id, **kwargs):
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def port_delete(request, port_id):
     LOG.debug("port_delete(): portid=%s", port_id)
     neutronclient(request).delete_port(port_id)
@@ -1333,6 +1369,7 @@ def port_update(request, port_id, **kwargs):
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def router_create(request, **kwargs):
     LOG.debug("router_create():, kwargs=%s", kwargs)
     body = {'router': {}}
@@ -1375,6 +1412,7 @@ def router_list_on_l3_agent(request, l3_agent_id, **params):
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def router_delete(request, router_id):
     neutronclient(request).delete_router(router_id)
 
@@ -1458,7 +1496,10 @@ def tenant_quota_get(request, tenant_id):
 @profiler.trace
 def tenant_quota_update(request, tenant_id, **kwargs):
     quotas = {'quota': kwargs}
-    return neutronclient(request).update_quota(tenant_id, quotas)
+    try:
+        return neutronclient(request).update_quota(tenant_id, quotas)
+    finally:
+        base.invalidate_quota_usages(tenant_id, request.user.services_region)
 
 
 @profiler.trace
@@ -1468,6 +1509,36 @@ def tenant_quota_detail_get(request, tenant_id=None):
     return response['quota']
 
 
+# Method of the neutron client listing the resources counted against
+# a quota, and key of the resources in its response, by quota name.
+_QUOTA_RESOURCE_LISTERS = {
+    'network': ('list_networks', 'networks'),
+    'subnet': ('list_subnets', 'subnets'),
+    'port': ('list_ports', 'ports'),
+    'router': ('list_routers', 'routers'),
+    'floatingip': ('list_floatingips', 'floatingips'),
+    'security_group': ('list_security_groups', 'security_groups'),
+}
+
+
+@profiler.trace
+def tenant_resource_count(request, quota_name, tenant_id=None):
+    """Count the resources of a project counted against a quota.
+
+    This is meant for the deployments without the quota_details extension.
+    Only the IDs of the resources are retrieved.
+
+    :param request: django request object
+    :param quota_name: neutron quota name, e.g. ``'port'``
+    :param tenant_id: project ID, the project of the request by default
+    """
+    tenant_id = tenant_id or request.user.tenant_id
+    method, collection = _QUOTA_RESOURCE_LISTERS[quota_name]
+    lister = getattr(neutronclient(request), method)
+    resources = lister(tenant_id=tenant_id, fields='id')
+    return len(resources[collection])
+
+
 @profiler.trace
 def default_quota_get(request, tenant_id=None):
     tenant_id = tenant_id or request.user.tenant_id
@@ -1488,6 +1559,41 @@ def list_dhcp_agent_hosting_networks(request, network, **params):
     return [Agent(a) for a in agents['agents']]
 
 
+def _list_networks_on_dhcp_agent(request, agent_id):
+    networks = neutronclient(request).list_networks_on_dhcp_agent(
+        agent_id, fields='id')
+    return [network['id'] for network in networks['networks']]
+
+
+@shared_memoized(ttl=DHCP_AGENTS_CACHE_TTL,
+                 key=lambda request: (base.url_for(request, 'network'),))
+def _get_dhcp_agents_by_network(request):
+    agents = agent_list(request, agent_type='DHCP agent')
+    hosted_networks = futurist_utils.call_functions_parallel(
+        *[(_list_networks_on_dhcp_agent, [request, agent.id])
+          for agent in agents])
+    agents_by_network = {}
+    for agent, network_ids in zip(agents, hosted_networks):
+        for network_id in network_ids:
+            agents_by_network.setdefault(network_id, []).append(agent.id)
+    return agents_by_network
+
+
+@profiler.trace
+def dhcp_agents_by_network(request):
+    """Returns the IDs of the DHCP agents hosting each network.
+
+    The mapping is built from one listing of the DHCP agents and of the
+    networks each of them hosts, instead of one call per network, and is
+    cached for ``DHCP_AGENTS_CACHE_TTL`` seconds.
+
+    :param request: django request object
+    :returns: a dict of the lists of agent IDs keyed by network ID; the
+        networks not hosted by any agent are missing
+    """
+    return _get_dhcp_agents_by_network(request)
+
+
 @profiler.trace
 def list_l3_agent_hosting_router(request, router, **params):
     agents = neutronclient(request).list_l3_agent_hosting_routers(router,
@@ -1505,13 +1611,20 @@ def show_network_ip_availability(request, network_id):
 @profiler.trace
 def add_network_to_dhcp_agent(request, dhcp_agent, network_id):
     body = {'network_id': network_id}
-    return neutronclient(request).add_network_to_dhcp_agent(dhcp_agent, body)
+    try:
+        return neutronclient(request).add_network_to_dhcp_agent(dhcp_agent,
+                                                                body)
+    finally:
+        _get_dhcp_agents_by_network.invalidate(request)
 
 
 @profiler.trace
 def remove_network_from_dhcp_agent(request, dhcp_agent, network_id):
-    return neutronclient(request).remove_network_from_dhcp_agent(dhcp_agent,
-                                                                 network_id)
+    try:
+        return neutronclient(request).remove_network_from_dhcp_agent(
+            dhcp_agent, network_id)
+    finally:
+        _get_dhcp_agents_by_network.invalidate(request)
 
 
 @profiler.trace
@@ -1533,10 +1646,12 @@ def tenant_floating_ip_get(request, floating_ip_id):
     return FloatingIpManager(request).get(floating_ip_id)
 
 
+@base.invalidates_quota_usages
 def tenant_floating_ip_allocate(request, pool=None, tenant_id=None, **params):
     return FloatingIpManager(request).allocate(pool, tenant_id, **params)
 
 
+@base.invalidates_quota_usages
 def tenant_floating_ip_release(request, floating_ip_id):
     return FloatingIpManager(request).release(floating_ip_id)
 
@@ -1575,10 +1690,12 @@ def security_group_get(request, sg_id):
     return SecurityGroupManager(request).get(sg_id)
 
 
+@base.invalidates_quota_usages
 def security_group_create(request, name, desc):
     return SecurityGroupManager(request).create(name, desc)
 
 
+@base.invalidates_quota_usages
 def security_group_delete(request, sg_id):
     return SecurityGroupManager(request).delete(sg_id)
 
@@ -1587,6 +1704,7 @@ def security_group_update(request, sg_id, name, desc):
     return SecurityGroupManager(request).update(sg_id, name, desc)
 
 
+@base.invalidates_quota_usages
 def security_group_rule_create(request, parent_group_id,
                                direction, ethertype,
                                ip_protocol, from_port, to_port,
@@ -1596,6 +1714,7 @@ def security_group_rule_create(request, parent_group_id,
         from_port, to_port, cidr, group_id)
 
 
+@base.invalidates_quota_usages
 def security_group_rule_delete(request, sgr_id):
     return SecurityGroupManager(request).rule_delete(sgr_id)
 
@@ -1610,6 +1729,100 @@ def server_update_security_groups(request, instance_id,
         instance_id, new_security_group_ids)
 
 
+def _get_address_cache_config():
+    config = dict(SERVER_ADDRESS_CACHE_DEFAULTS)
+    config.update(getattr(settings, 'SERVER_ADDRESS_CACHE', {}))
+    return config
+
+
+_server_address_cache = None
+
+
+def _get_server_address_cache():
+    global _server_address_cache
+    if _server_address_cache is None:
+        _server_address_cache = LocalLRUStore(
+            max_size=_get_address_cache_config()['max_size'])
+    return _server_address_cache
+
+
+def _format_changed_since(timestamp):
+    return datetime.datetime.utcfromtimestamp(timestamp).strftime(
+        '%Y-%m-%dT%H:%M:%SZ')
+
+
+def _servers_update_cached_addresses(request, servers, all_tenants, config):
+    """Set the cached addresses of the servers which did not change.
+
+    The ports and floating IPs changed since the oldest refresh of the
+    servers are listed with the ``changed_since`` filter, and the servers
+    they belong to are considered as changed, as well as the servers
+    updated in Nova. The ports are looked up both by server and by the
+    cached port IDs, so that the ports attached to a server as well as
+    those detached from it are seen. Entries expire after the configured
+    TTL, so that the changes not reported by ``changed_since``, i.e.
+    deleted ports, are eventually seen.
+
+    :returns: the list of servers whose addresses must be retrieved
+    """
+    cache = _get_server_address_cache()
+    entries = {}
+    for server in servers:
+        try:
+            entry = cache.get((server.id, all_tenants))
+        except KeyError:
+            continue
+        if entry['updated'] == getattr(server, 'updated', None):
+            entries[server.id] = entry
+    if not entries:
+        return servers
+
+    # Neutron and Horizon clocks may differ, changes slightly older than
+    # the last refresh are retrieved again rather than missed.
+    changed_since = _format_changed_since(
+        min(entry['refreshed_at'] for entry in entries.values()) -
+        config['clock_skew'])
+    try:
+        ports = list_resources_with_long_filters(
+            port_list, 'device_id', tuple(entries),
+            request=request, changed_since=changed_since)
+        changed = set(port.device_id for port in ports)
+        # The device_id of a detached port has been cleared, it is only
+        # found by its ID.
+        port_servers = dict((port_id, server_id)
+                            for server_id, entry in entries.items()
+                            for port_id in entry['port_ids'])
+        if port_servers:
+            ports = list_resources_with_long_filters(
+                port_list, 'id', tuple(sorted(port_servers)),
+                request=request, changed_since=changed_since)
+            changed.update(port_servers[port.id] for port in ports
+                           if port.id in port_servers)
+        if FloatingIpManager(request).is_supported():
+            search_opts = {'changed_since': changed_since}
+            if not all_tenants:
+                search_opts['tenant_id'] = request.user.tenant_id
+            fips = neutronclient(request).list_floatingips(
+                **search_opts).get('floatingips', [])
+            for server_id, entry in entries.items():
+                if any(fip['id'] in entry['fip_ids'] or
+                       fip['port_id'] in entry['port_ids'] for fip in fips):
+                    changed.add(server_id)
+    except Exception as e:
+        LOG.warning('Unable to retrieve the ports and floating IPs changed '
+                    'since %(since)s, refreshing all the servers: %(exc)s',
+                    {'since': changed_since, 'exc': e})
+        return servers
+
+    stale_servers = []
+    for server in servers:
+        if server.id in entries and server.id not in changed:
+            server.addresses = copy.deepcopy(entries[server.id]['addresses'])
+        else:
+            stale_servers.append(server)
+    return stale_servers
+
+
 # TODO(pkarikh) need to uncomment when osprofiler will have no
 # issues with unicode in:
 # openstack_dashboard/test/test_data/nova_data.py#L470 data
@@ -1619,12 +1832,27 @@ def servers_update_addresses(request, servers, all_tenants=False):
 
        Should be used when up to date networking information is required,
        and Nova's networking info caching mechanism is not fast enough.
+
+       The addresses are cached per server, and when Neutron supports the
+       ``changed_since`` filter, only the servers whose ports or floating
+       IPs changed since their last refresh are retrieved again (see the
+       ``SERVER_ADDRESS_CACHE`` setting).
     """
 
     # NOTE(e0ne): we don't need to call neutron if we have no instances
     if not servers:
         return
 
+    config = _get_address_cache_config()
+    incremental = (config['enabled'] and
+                   is_extension_supported(request, 'standard-attr-timestamp'))
+    if incremental:
+        servers = _servers_update_cached_addresses(request, servers,
+                                                   all_tenants, config)
+        if not servers:
+            return
+    refreshed_at = time.time()
+
     # Get all (filtered for relevant servers) information from Neutron
     try:
         # NOTE(e0ne): we need tuple here to work with @memoized decorator.
@@ -1676,6 +1904,18 @@ def servers_update_addresses(request, servers, all_tenants=False):
             LOG.error(six.text_type(e))
         else:
             server.addresses = addresses
+            if incremental:
+                server_ports = instances_ports.get(server.id, [])
+                _get_server_address_cache().set(
+                    (server.id, all_tenants),
+                    {'addresses': copy.deepcopy(addresses),
+                     'updated': getattr(server, 'updated', None),
+                     'refreshed_at': refreshed_at,
+                     'port_ids': frozenset(port.id for port in server_ports),
+                     'fip_ids': frozenset(
+                         fip.id for port in server_ports
+                         for fip in ports_floating_ips.get(port.id, []))},
+                    config['ttl'])
 
 
 def _server_get_addresses(request, server, ports, floating_ips, network_names):
@@ -1713,21 +1953,29 @@ def _server_get_addresses(request, server, ports, floating_ips, network_names):
     return dict(addresses)
 
 
+def _discover_extensions(neutron_api):
+    try:
+        extensions_list = neutron_api.list_extensions()
+    except exceptions.ServiceCatalogException:
+        return {}
+    return collections.OrderedDict(
+        (extension['alias'], extension)
+        for extension in extensions_list.get('extensions', []))
+
+
+@memoized
+def _get_extensions(request):
+    return base.get_extensions('neutron', base.url_for(request, 'network'),
+                               _discover_extensions, neutronclient(request))
+
+
 @profiler.trace
-@memoized_with_request(neutronclient)
-def list_extensions(neutron_api):
+def list_extensions(request):
     """List neutron extensions.
 
     :param request: django request object
     """
-    try:
-        extensions_list = neutron_api.list_extensions()
-    except exceptions.ServiceCatalogException:
-        return {}
-    if 'extensions' in extensions_list:
-        return tuple(extensions_list['extensions'])
-    else:
-        return ()
+    return tuple(_get_extensions(request).values())
 
 
 @profiler.trace
@@ -1737,12 +1985,7 @@ def is_extension_supported(request, extension_alias):
     :param request: django request object
     :param extension_alias: neutron extension alias
     """
-    extensions = list_extensions(request)
-    for extension in extensions:
-        if extension['alias'] == extension_alias:
-            return True
-    else:
-        return False
+    return extension_alias in _get_extensions(request)
 
 
 def is_enabled_by_config(name, default=True):
@@ -26,6 +26,7 @@ import logging
 from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
 
+from keystoneauth1 import token_endpoint
 from novaclient import api_versions
 from novaclient import client as nova_client
 from novaclient import exceptions as nova_exceptions
@@ -33,14 +34,18 @@ from novaclient.v2 import instance_action as nova_instance_action
 from novaclient.v2 import list_extensions as nova_list_extensions
 from novaclient.v2 import servers as nova_servers
 
+from openstack_auth import utils as auth_utils
+
 from horizon import exceptions as horizon_exceptions
 from horizon.utils import functions as utils
 from horizon.utils.memoized import memoized
 from horizon.utils.memoized import memoized_with_request
+from horizon.utils.memoized import shared_memoized
 
 from openstack_dashboard.api import base
 from openstack_dashboard.api import microversions
 from openstack_dashboard.contrib.developer.profiler import api as profiler
+from openstack_dashboard.utils import futurist_utils
 
 LOG = logging.getLogger(__name__)
 
@@ -53,14 +58,21 @@ VERSIONS.load_supported_version(2, {"client": nova_client, "version": 2})
 INSTANCE_ACTIVE_STATE = 'ACTIVE'
 VOLUME_STATE_AVAILABLE = "available"
 DEFAULT_QUOTA_NAME = 'default'
-INSECURE = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
-CACERT = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
+
+FLAVOR_EXTRA_SPECS_CACHE_TTL = getattr(settings,
+                                       'FLAVOR_EXTRA_SPECS_CACHE_TTL', 300)
+
+
+def _get_server_version_range(request, client):
+    return microversions.get_server_version_range(
+        'nova', base.url_for(request, 'compute'),
+        api_versions._get_server_version_range, client)
 
 
 @memoized
 def get_microversion(request, features):
     client = novaclient(request)
-    min_ver, max_ver = api_versions._get_server_version_range(client)
+    min_ver, max_ver = _get_server_version_range(request, client)
     return (microversions.get_microversion_for_features(
         'nova', features, api_versions.APIVersion, min_ver, max_ver))
 
@@ -280,16 +292,13 @@ def novaclient(request_auth_params, version=None):
     ) = request_auth_params
     if version is None:
         version = VERSIONS.get_active_version()['version']
+    # The session shares its HTTP connection pool with all the other clients.
+    auth = token_endpoint.Token(nova_url, token_id)
     c = nova_client.Client(version,
-                           username,
-                           token_id,
                            project_id=project_id,
                            project_domain_id=project_domain_id,
-                           auth_url=auth_url,
-                           insecure=INSECURE,
-                           cacert=CACERT,
+                           session=auth_utils.get_session(auth=auth),
                            http_log_debug=settings.DEBUG,
-                           auth_token=token_id,
                            endpoint_override=nova_url)
     return c
 
@@ -297,7 +306,7 @@ def novaclient(request_auth_params, version=None):
 def upgrade_api(request, client, version):
     """Ugrade the nova API to the specified version if possible."""
 
-    min_ver, max_ver = api_versions._get_server_version_range(client)
+    min_ver, max_ver = _get_server_version_range(request, client)
     if min_ver <= api_versions.APIVersion(version) <= max_ver:
         client = novaclient(request, version)
     return client
@@ -351,6 +360,8 @@ def flavor_create(request, name, memory, vcpu, disk, flavorid='auto',
 @profiler.trace
 def flavor_delete(request, flavor_id):
     novaclient(request).flavors.delete(flavor_id)
+    # The id of a deleted flavor can be given to a new flavor.
+    _get_flavor_keys.invalidate(request, flavor_id)
 
 
 @profiler.trace
@@ -361,14 +372,21 @@ def flavor_get(request, flavor_id, get_extras=False):
     return flavor
 
 
+def _set_flavors_extras(request, flavors):
+    extras = futurist_utils.call_functions_parallel(
+        *[(flavor_get_extras, [request, flavor.id, True, flavor])
+          for flavor in flavors])
+    for flavor, flavor_extras in zip(flavors, extras):
+        flavor.extras = flavor_extras
+
+
 @profiler.trace
 @memoized
 def flavor_list(request, is_public=True, get_extras=False):
     """Get the list of available instance sizes (flavors)."""
     flavors = novaclient(request).flavors.list(is_public=is_public)
     if get_extras:
-        for flavor in flavors:
-            flavor.extras = flavor_get_extras(request, flavor.id, True, flavor)
+        _set_flavors_extras(request, flavors)
     return flavors
 
 
@@ -421,8 +439,7 @@ def flavor_list_paged(request, is_public=True, get_extras=False, marker=None,
         flavors = novaclient(request).flavors.list(is_public=is_public)
 
     if get_extras:
-        for flavor in flavors:
-            flavor.extras = flavor_get_extras(request, flavor.id, True, flavor)
+        _set_flavors_extras(request, flavors)
 
     return (flavors, has_more_data, has_prev_data)
 
@@ -448,12 +465,23 @@ def remove_tenant_from_flavor(request, flavor, tenant):
         flavor=flavor, tenant=tenant)
 
 
+# The extra specs of a flavor are the same for all the users who can access
+# it, so they are cached per endpoint and flavor.
+@shared_memoized(
+    ttl=FLAVOR_EXTRA_SPECS_CACHE_TTL,
+    key=lambda request, flavor_id, *args: (base.url_for(request, 'compute'),
+                                           flavor_id))
+def _get_flavor_keys(request, flavor_id, flavor):
+    return flavor.get_keys()
+
+
 @profiler.trace
 def flavor_get_extras(request, flavor_id, raw=False, flavor=None):
     """Get flavor extra specs."""
     if flavor is None:
         flavor = novaclient(request).flavors.get(flavor_id)
-    extras = flavor.get_keys()
+    # The cached dict is shared, callers get their own copy.
+    extras = dict(_get_flavor_keys(request, flavor.id, flavor))
     if raw:
         return extras
     return [FlavorExtraSpec(flavor_id, key, value) for
@@ -464,7 +492,10 @@ def flavor_get_extras(request, flavor_id, raw=False, flavor=None):
 def flavor_extra_delete(request, flavor_id, keys):
     """Unset the flavor extra spec keys."""
     flavor = novaclient(request).flavors.get(flavor_id)
-    return flavor.unset_keys(keys)
+    try:
+        return flavor.unset_keys(keys)
+    finally:
+        _get_flavor_keys.invalidate(request, flavor.id)
 
 
 @profiler.trace
@@ -473,7 +504,10 @@ def flavor_extra_set(request, flavor_id, metadata):
     flavor = novaclient(request).flavors.get(flavor_id)
     if (not metadata):  # not a way to delete keys
         return None
-    return flavor.set_keys(metadata)
+    try:
+        return flavor.set_keys(metadata)
+    finally:
+        _get_flavor_keys.invalidate(request, flavor.id)
 
 
 @profiler.trace
@@ -507,6 +541,7 @@ def keypair_get(request, name):
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def server_create(request, name, image, flavor, key_name, user_data,
                   security_groups, block_device_mapping=None,
                   block_device_mapping_v2=None, nics=None,
@@ -528,6 +563,7 @@ def server_create(request, name, image, flavor, key_name, user_data,
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def server_delete(request, instance_id):
     novaclient(request).servers.delete(instance_id)
 
@@ -654,17 +690,20 @@ def server_live_migrate(request, instance_id, host, block_migration=False,
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def server_resize(request, instance_id, flavor, disk_config=None, **kwargs):
     novaclient(request).servers.resize(instance_id, flavor,
                                        disk_config, **kwargs)
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def server_confirm_resize(request, instance_id):
     novaclient(request).servers.confirm_resize(instance_id)
 
 
 @profiler.trace
+@base.invalidates_quota_usages
 def server_revert_resize(request, instance_id):
     novaclient(request).servers.revert_resize(instance_id)
 
@@ -709,7 +748,11 @@ def tenant_quota_get(request, tenant_id):
 @profiler.trace
 def tenant_quota_update(request, tenant_id, **kwargs):
     if kwargs:
-        novaclient(request).quotas.update(tenant_id, **kwargs)
+        try:
+            novaclient(request).quotas.update(tenant_id, **kwargs)
+        finally:
+            base.invalidate_quota_usages(tenant_id,
+                                         request.user.services_region)
 
 
 @profiler.trace
@@ -719,7 +762,10 @@ def default_quota_get(request, tenant_id):
 
 @profiler.trace
 def default_quota_update(request, **kwargs):
-    novaclient(request).quota_classes.update(DEFAULT_QUOTA_NAME, **kwargs)
+    try:
+        novaclient(request).quota_classes.update(DEFAULT_QUOTA_NAME, **kwargs)
+    finally:
+        base.invalidate_quota_usages()
 
 
 def _get_usage_marker(usage):
@@ -769,25 +815,40 @@ def usage_get(request, tenant_id, start, end):
     return NovaUsage(usage)
 
 
-@profiler.trace
-def usage_list(request, start, end):
+def _iter_usage_list_pages(request, start, end):
     client = upgrade_api(request, novaclient(request), '2.40')
     usage_list = client.usage.list(start, end, True)
+    yield usage_list
     if client.api_version >= api_versions.APIVersion('2.40'):
         # If the number of instances used to calculate the usage is greater
-        # than max_limit, the usage will be split across multiple requests
-        # and the responses will need to be merged back together.
-        usages = collections.OrderedDict()
-        _merge_usage_list(usages, usage_list)
+        # than max_limit, the usage will be split across multiple requests.
         marker = _get_usage_list_marker(usage_list)
         while marker:
-            next_usage_list = client.usage.list(start, end, True,
-                                                marker=marker)
-            marker = _get_usage_list_marker(next_usage_list)
+            usage_list = client.usage.list(start, end, True, marker=marker)
+            marker = _get_usage_list_marker(usage_list)
             if marker:
-                _merge_usage_list(usages, next_usage_list)
-        usage_list = usages.values()
-    return [NovaUsage(u) for u in usage_list]
+                yield usage_list
+
+
+def usage_list_pages(request, start, end):
+    """Yields the usages of the projects one page at a time.
+
+    Unlike :func:`usage_list`, the pages are not merged together, so the
+    usage of a project whose instances are split across several pages is
+    yielded once per page. It allows to summarize the usages without
+    keeping the usage of every instance in memory.
+    """
+    for usage_list in _iter_usage_list_pages(request, start, end):
+        yield [NovaUsage(u) for u in usage_list]
+
+
+@profiler.trace
+def usage_list(request, start, end):
+    # The responses need to be merged back together.
+    usages = collections.OrderedDict()
+    for usage_list in _iter_usage_list_pages(request, start, end):
+        _merge_usage_list(usages, usage_list)
+    return [NovaUsage(u) for u in usages.values()]
 
 
 @profiler.trace
@@ -1030,31 +1091,40 @@ def interface_detach(request, server, port_id):
     return novaclient(request).servers.interface_detach(server, port_id)
 
 
-@profiler.trace
-@memoized_with_request(novaclient)
-def list_extensions(nova_api):
-    """List all nova extensions, except the ones in the blacklist."""
+def _discover_extensions(nova_api):
     blacklist = set(getattr(settings,
                             'OPENSTACK_NOVA_EXTENSIONS_BLACKLIST', []))
-    return tuple(
-        extension for extension in
+    # The extensions are shared by all users, so they are detached from
+    # the manager and client of the user who discovered them.
+    return collections.OrderedDict(
+        (extension.name, extension.__class__(None, extension.to_dict(),
+                                             loaded=True))
+        for extension in
         nova_list_extensions.ListExtManager(nova_api).show_all()
         if extension.name not in blacklist
     )
 
 
+@memoized
+def _get_extensions(request):
+    return base.get_extensions('nova', base.url_for(request, 'compute'),
+                               _discover_extensions, novaclient(request))
+
+
+@profiler.trace
+def list_extensions(request):
+    """List all nova extensions, except the ones in the blacklist."""
+    return tuple(_get_extensions(request).values())
+
+
 @profiler.trace
-@memoized_with_request(list_extensions, 1)
-def extension_supported(extension_name, extensions):
+def extension_supported(extension_name, request):
     """Determine if nova supports a given extension name.
 
     Example values for the extension_name include AdminActions, ConsoleOutput,
     etc.
     """
-    for extension in extensions:
-        if extension.name == extension_name:
-            return True
-    return False
+    return extension_name in _get_extensions(request)
 
 
 @profiler.trace
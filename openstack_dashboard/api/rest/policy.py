@@ -48,3 +48,42 @@ class Policy(generic.View):
         result = policy.check(rules, request, policy_target)
 
         return {"allowed": result}
+
+
+@urls.register
+class PolicyBatch(generic.View):
+    '''API for checking several groups of policy rules at once.'''
+
+    url_regex = r'policy/batch/$'
+
+    @rest_utils.ajax(data_required=True)
+    def post(self, request):
+        '''Check several named groups of policy rules.
+
+        The POST application/json object has one key: "checks", an object
+        mapping a name to a group of rules and an optional target, with the
+        same format as the body of a single policy check, e.g.::
+
+            {"checks": {"stop": {"rules": [["compute",
+                                            "os_compute_api:servers:stop"]],
+                                 "target": {"project_id": "1"}},
+                        "index": {"rules": [["compute",
+                                             "os_compute_api:servers:index"]]}}}
+
+        All the groups are checked with the credentials of the same user,
+        and share the cached policy decisions.
+
+        The action returns an object with one key: "allowed", an object
+        mapping each name to the result of its policy check, True or False.
+        '''
+        try:
+            checks = {}
+            for name, check in request.DATA['checks'].items():
+                rules = tuple([tuple(rule) for rule in check['rules']])
+                checks[name] = (rules, check.get('target') or {})
+        except Exception:
+            raise rest_utils.AjaxError(400, 'unexpected parameter format')
+
+        return {"allowed": dict(
+            (name, policy.check(rules, request, policy_target))
+            for name, (rules, policy_target) in checks.items())}
@@ -24,6 +24,8 @@ import swiftclient
 from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
 
+from openstack_auth import utils as auth_utils
+
 from horizon import exceptions
 
 from openstack_dashboard.api import base
@@ -103,11 +105,19 @@ def _metadata_to_header(metadata):
     return headers
 
 
+def _get_requests_session():
+    session = auth_utils.get_requests_session(auth_utils.get_ssl_verify(),
+                                              pool_name='swift')
+    # Like swiftclient, do not send the default headers of requests.
+    session.headers = None
+    return session
+
+
 def swift_api(request):
     endpoint = base.url_for(request, 'object-store')
     cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
     insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
-    return swiftclient.client.Connection(None,
+    conn = swiftclient.client.Connection(None,
                                          request.user.username,
                                          None,
                                          preauthtoken=request.user.token.id,
@@ -115,6 +125,17 @@ def swift_api(request):
                                          cacert=cacert,
                                          insecure=insecure,
                                          auth_version="2.0")
+    http_connection = conn.http_connection
+
+    def pooled_http_connection(url=None):
+        # swiftclient creates a new requests session, and so new TCP and
+        # TLS connections, for every Connection. Use the shared pool instead.
+        parsed, http_conn = http_connection(url)
+        http_conn.request_session = _get_requests_session()
+        return parsed, http_conn
+
+    conn.http_connection = pooled_http_connection
+    return conn
 
 
 @profiler.trace
@@ -37,6 +37,7 @@ class IndexView(tables.MultiTableView):
                      project_tables.AvailabilityZonesTable)
     template_name = constants.AGGREGATES_TEMPLATE_NAME
     page_title = _("Host Aggregates")
+    parallel_load = True
 
     def get_host_aggregates_data(self):
         request = self.request
@@ -123,3 +123,4 @@ class SystemInfoTabs(tabs.TabGroup):
     tabs = (ServicesTab, NovaServicesTab, CinderServicesTab,
             NetworkAgentsTab)
     sticky = True
+    parallel_load = True
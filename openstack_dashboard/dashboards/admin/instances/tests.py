@@ -31,14 +31,13 @@ class InstanceViewTest(test.BaseAdminViewTests):
     @test.create_mocks({
         api.nova: ['flavor_list', 'server_list', 'extension_supported'],
         api.keystone: ['tenant_list'],
-        api.glance: ['image_list_detailed'],
+        api.glance: ['image_get'],
     })
     def test_index(self):
         servers = self.servers.list()
         self.mock_extension_supported.return_value = True
         self.mock_tenant_list.return_value = [self.tenants.list(), False]
-        self.mock_image_list_detailed.return_value = (self.images.list(),
-                                                      False, False)
+        self.mock_image_get.return_value = self.images.first()
         self.mock_flavor_list.return_value = self.flavors.list()
         self.mock_server_list.return_value = [servers, False]
 
@@ -53,8 +52,8 @@ class InstanceViewTest(test.BaseAdminViewTests):
             mock.call('Shelve', test.IsHttpRequest())]*4)
         self.assertEqual(12, self.mock_extension_supported.call_count)
         self.mock_tenant_list.assert_called_once_with(test.IsHttpRequest())
-        self.mock_image_list_detailed.assert_called_once_with(
-            test.IsHttpRequest())
+        self.mock_image_get.assert_called_once_with(
+            test.IsHttpRequest(), self.images.first().id)
         self.mock_flavor_list.assert_called_once_with(test.IsHttpRequest())
         search_opts = {'marker': None, 'paginate': True, 'all_tenants': True}
         self.mock_server_list.assert_called_once_with(
@@ -64,7 +63,7 @@ class InstanceViewTest(test.BaseAdminViewTests):
         api.nova: ['flavor_list', 'flavor_get', 'server_list',
                    'extension_supported'],
         api.keystone: ['tenant_list'],
-        api.glance: ['image_list_detailed'],
+        api.glance: ['image_get'],
     })
     def test_index_flavor_list_exception(self):
         servers = self.servers.list()
@@ -79,8 +78,7 @@ class InstanceViewTest(test.BaseAdminViewTests):
             return full_flavors[id]
         self.mock_flavor_get.side_effect = _get_full_flavor
 
-        self.mock_image_list_detailed.return_value = (self.images.list(),
-                                                      False, False)
+        self.mock_image_get.return_value = self.images.first()
 
         res = self.client.get(INDEX_URL)
 
@@ -98,17 +96,20 @@ class InstanceViewTest(test.BaseAdminViewTests):
         self.assertEqual(12, self.mock_extension_supported.call_count)
         self.mock_flavor_list.assert_called_once_with(test.IsHttpRequest())
         self.mock_tenant_list.assert_called_once_with(test.IsHttpRequest())
+        # Each missing flavor is retrieved once.
+        flavor_ids = OrderedDict.fromkeys(s.flavor['id'] for s in servers)
         self.mock_flavor_get.assert_has_calls(
-            [mock.call(test.IsHttpRequest(), s.flavor['id']) for s in servers])
-        self.assertEqual(len(servers), self.mock_flavor_get.call_count)
-        self.mock_image_list_detailed.assert_called_once_with(
-            test.IsHttpRequest())
+            [mock.call(test.IsHttpRequest(), flavor_id)
+             for flavor_id in flavor_ids], any_order=True)
+        self.assertEqual(len(flavor_ids), self.mock_flavor_get.call_count)
+        self.mock_image_get.assert_called_once_with(
+            test.IsHttpRequest(), self.images.first().id)
 
     @test.create_mocks({
         api.nova: ['flavor_list', 'flavor_get', 'server_list',
                    'extension_supported'],
         api.keystone: ['tenant_list'],
-        api.glance: ['image_list_detailed'],
+        api.glance: ['image_get'],
     })
     def test_index_flavor_get_exception(self):
         servers = self.servers.list()
@@ -117,8 +118,7 @@ class InstanceViewTest(test.BaseAdminViewTests):
         for i, server in enumerate(servers):
             server.flavor['id'] = str(uuid.UUID(int=i))
 
-        self.mock_image_list_detailed.return_value = \
-            (self.images.list(), False, False)
+        self.mock_image_get.return_value = self.images.first()
         self.mock_flavor_list.return_value = self.flavors.list()
         self.mock_server_list.return_value = [servers, False]
         self.mock_extension_supported.return_value = True
@@ -134,8 +134,8 @@ class InstanceViewTest(test.BaseAdminViewTests):
         self.assertMessageCount(res, error=1)
         self.assertItemsEqual(instances, servers)
 
-        self.mock_image_list_detailed.assert_called_once_with(
-            test.IsHttpRequest())
+        self.mock_image_get.assert_called_once_with(
+            test.IsHttpRequest(), self.images.first().id)
         self.mock_flavor_list.assert_called_once_with(test.IsHttpRequest())
         search_opts = {'marker': None, 'paginate': True, 'all_tenants': True}
         self.mock_server_list.assert_called_once_with(
@@ -147,20 +147,18 @@ class InstanceViewTest(test.BaseAdminViewTests):
         self.assertEqual(12, self.mock_extension_supported.call_count)
         self.mock_tenant_list.assert_called_once_with(test.IsHttpRequest())
         self.mock_flavor_get.assert_has_calls(
-            [mock.call(test.IsHttpRequest(), s.flavor['id']) for s in servers])
+            [mock.call(test.IsHttpRequest(), s.flavor['id']) for s in servers],
+            any_order=True)
         self.assertEqual(len(servers), self.mock_flavor_get.call_count)
 
     @test.create_mocks({
         api.nova: ['server_list', 'flavor_list'],
         api.keystone: ['tenant_list'],
-        api.glance: ['image_list_detailed'],
     })
     def test_index_server_list_exception(self):
         self.mock_server_list.side_effect = self.exceptions.nova
         self.mock_flavor_list.return_value = self.flavors.list()
         self.mock_tenant_list.return_value = [self.tenants.list(), False]
-        self.mock_image_list_detailed.return_value = (self.images.list(),
-                                                      False, False)
 
         res = self.client.get(INDEX_URL)
         self.assertTemplateUsed(res, INDEX_TEMPLATE)
@@ -171,9 +169,64 @@ class InstanceViewTest(test.BaseAdminViewTests):
             test.IsHttpRequest(),
             search_opts=search_opts)
         self.mock_tenant_list.assert_called_once_with(test.IsHttpRequest())
+        self.mock_flavor_list.assert_called_once_with(test.IsHttpRequest())
+
+    @test.update_settings(MEMOIZED_CACHE={'enabled': True})
+    @test.create_mocks({
+        api.nova: ['flavor_list', 'server_list', 'extension_supported'],
+        api.keystone: ['tenant_list'],
+        api.glance: ['image_get'],
+    })
+    def test_index_reference_data_cached(self):
+        servers = self.servers.list()
+        self.mock_extension_supported.return_value = True
+        self.mock_tenant_list.return_value = [self.tenants.list(), False]
+        self.mock_image_get.return_value = self.images.first()
+        self.mock_flavor_list.return_value = self.flavors.list()
+        self.mock_server_list.return_value = [servers, False]
+
+        self.client.get(INDEX_URL)
+        res = self.client.get(INDEX_URL)
+
+        self.assertTemplateUsed(res, INDEX_TEMPLATE)
+        self.assertItemsEqual(res.context['table'].data, servers)
+        # The flavors, projects and images are retrieved for the first
+        # request only.
+        self.mock_tenant_list.assert_called_once_with(test.IsHttpRequest())
+        self.mock_image_get.assert_called_once_with(
+            test.IsHttpRequest(), self.images.first().id)
+        self.mock_flavor_list.assert_called_once_with(test.IsHttpRequest())
+        self.assertEqual(2, self.mock_server_list.call_count)
+
+    @test.create_mocks({
+        api.nova: ['flavor_list', 'server_list', 'extension_supported'],
+        api.keystone: ['tenant_list'],
+        api.glance: ['image_list_detailed'],
+    })
+    def test_index_image_name_filter(self):
+        image = self.images.first()
+        servers = self.servers.list()
+        self.mock_extension_supported.return_value = True
+        self.mock_tenant_list.return_value = [self.tenants.list(), False]
+        self.mock_image_list_detailed.return_value = (self.images.list(),
+                                                      False, False)
+        self.mock_flavor_list.return_value = self.flavors.list()
+        self.mock_server_list.return_value = [servers, False]
+
+        self.client.post(INDEX_URL, data={
+            'instances__filter_admin_instances__q_field': 'image_name',
+            'instances__filter_admin_instances__q': image.name.upper()})
+        res = self.client.get(INDEX_URL)
+
+        self.assertTemplateUsed(res, INDEX_TEMPLATE)
+        self.assertItemsEqual(res.context['table'].data, servers)
+        # The image list is only retrieved to look up the filter.
         self.mock_image_list_detailed.assert_called_once_with(
             test.IsHttpRequest())
-        self.mock_flavor_list.assert_called_once_with(test.IsHttpRequest())
+        search_opts = {'marker': None, 'paginate': True, 'all_tenants': True,
+                       'image': image.id}
+        self.mock_server_list.assert_called_with(
+            test.IsHttpRequest(), search_opts=search_opts)
 
     @test.create_mocks({api.nova: ['server_get', 'flavor_get',
                                    'extension_supported'],
@@ -222,12 +275,11 @@ class InstanceViewTest(test.BaseAdminViewTests):
     @test.create_mocks({
         api.nova: ['flavor_list', 'server_list', 'extension_supported'],
         api.keystone: ['tenant_list'],
-        api.glance: ['image_list_detailed'],
+        api.glance: ['image_get'],
     })
     def test_index_options_before_migrate(self):
         self.mock_tenant_list.return_value = [self.tenants.list(), False]
-        self.mock_image_list_detailed.return_value = (self.images.list(),
-                                                      False, False)
+        self.mock_image_get.return_value = self.images.first()
         self.mock_flavor_list.return_value = self.flavors.list()
         self.mock_server_list.return_value = [self.servers.list(), False]
         self.mock_extension_supported.return_value = True
@@ -238,8 +290,8 @@ class InstanceViewTest(test.BaseAdminViewTests):
         self.assertNotContains(res, "instances__revert")
 
         self.mock_tenant_list.assert_called_once_with(test.IsHttpRequest())
-        self.mock_image_list_detailed.assert_called_once_with(
-            test.IsHttpRequest())
+        self.mock_image_get.assert_called_once_with(
+            test.IsHttpRequest(), self.images.first().id)
         self.mock_flavor_list.assert_called_once_with(test.IsHttpRequest())
         search_opts = {'marker': None, 'paginate': True, 'all_tenants': True}
         self.mock_server_list.assert_called_once_with(
@@ -253,7 +305,7 @@ class InstanceViewTest(test.BaseAdminViewTests):
     @test.create_mocks({
         api.nova: ['flavor_list', 'server_list', 'extension_supported'],
         api.keystone: ['tenant_list'],
-        api.glance: ['image_list_detailed'],
+        api.glance: ['image_get'],
     })
     def test_index_options_after_migrate(self):
         servers = self.servers.list()
@@ -262,8 +314,7 @@ class InstanceViewTest(test.BaseAdminViewTests):
         server2 = servers[2]
         server2.status = "VERIFY_RESIZE"
         self.mock_tenant_list.return_value = [self.tenants.list(), False]
-        self.mock_image_list_detailed.return_value = (self.images.list(),
-                                                      False, False)
+        self.mock_image_get.return_value = self.images.first()
         self.mock_flavor_list.return_value = self.flavors.list()
         self.mock_extension_supported.return_value = True
         self.mock_server_list.return_value = [servers, False]
@@ -274,8 +325,8 @@ class InstanceViewTest(test.BaseAdminViewTests):
         self.assertNotContains(res, "instances__migrate")
 
         self.mock_tenant_list.assert_called_once_with(test.IsHttpRequest())
-        self.mock_image_list_detailed.assert_called_once_with(
-            test.IsHttpRequest())
+        self.mock_image_get.assert_called_once_with(
+            test.IsHttpRequest(), self.images.first().id)
         self.mock_flavor_list.assert_called_once_with(test.IsHttpRequest())
         self.mock_extension_supported.assert_has_calls([
             mock.call('AdminActions', test.IsHttpRequest()),
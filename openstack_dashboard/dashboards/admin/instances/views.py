@@ -17,6 +17,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
+
 from django.conf import settings
 from django.urls import reverse
 from django.urls import reverse_lazy
@@ -26,6 +28,7 @@ from horizon import exceptions
 from horizon import forms
 from horizon import tables
 from horizon.utils import memoized
+from horizon.utils.memoized import shared_memoized
 
 from openstack_dashboard import api
 
@@ -70,6 +73,38 @@ class AdminUpdateView(views.UpdateView):
     success_url = reverse_lazy("horizon:admin:instances:index")
 
 
+# Time to live in seconds of the flavors, projects and images used to
+# decorate the instances of the admin panel. 0 disables the cache.
+ADMIN_INSTANCES_REFERENCE_CACHE_TTL = getattr(
+    settings, 'ADMIN_INSTANCES_REFERENCE_CACHE_TTL', 300)
+
+
+def _get_references_key(request, service_type, discover, *key):
+    # The data is shared by the requests of the administrators having the
+    # same project, domain and roles.
+    domain = api.keystone.get_default_domain(request, get_name=False)
+    return (service_type, api.base.url_for(request, service_type),
+            request.user.project_id, domain.get('id'),
+            tuple(sorted(role['name'] for role in request.user.roles))) + key
+
+
+@shared_memoized(ttl=ADMIN_INSTANCES_REFERENCE_CACHE_TTL,
+                 key=_get_references_key)
+def _get_references(request, service_type, discover, *key):
+    """Returns the reference data returned by discover.
+
+    The data is cached by ``key`` for the administrators sharing the same
+    scope. It must consist of plain types since it may be pickled by the
+    cache backend.
+    """
+    return discover()
+
+
+def _to_resources(references):
+    return dict((key, api.base.APIDictWrapper(value))
+                for key, value in references.items())
+
+
 class AdminIndexView(tables.DataTableView):
     table_class = project_tables.AdminInstancesTable
     page_title = _("Instances")
@@ -80,36 +115,85 @@ class AdminIndexView(tables.DataTableView):
     def needs_filter_first(self, table):
         return self._needs_filter_first
 
+    def _list_tenants(self):
+        tenants, __ = api.keystone.tenant_list(self.request)
+        return dict((t.id, {'id': t.id, 'name': t.name}) for t in tenants)
+
     def _get_tenants(self):
         # Gather our tenants to correlate against IDs
         try:
-            tenants, __ = api.keystone.tenant_list(self.request)
-            return dict([(t.id, t) for t in tenants])
+            return _to_resources(_get_references(
+                self.request, 'identity', self._list_tenants, 'tenants'))
         except Exception:
             msg = _('Unable to retrieve instance project information.')
             exceptions.handle(self.request, msg)
             return {}
 
+    def _list_images(self):
+        images, __, __ = api.glance.image_list_detailed(self.request)
+        return dict((image.id, {'id': image.id, 'name': image.name})
+                    for image in images)
+
     def _get_images(self):
-        # Gather our images to correlate againts IDs
+        # Gather all the images to look up the image name filter
         try:
-            images, __, __ = api.glance.image_list_detailed(self.request)
-            return dict([(image.id, image) for image in images])
+            return _to_resources(_get_references(
+                self.request, 'image', self._list_images, 'images'))
         except Exception:
             msg = _("Unable to retrieve image list.")
             exceptions.handle(self.request, msg)
             return {}
 
+    def _fetch_image(self, image_id):
+        try:
+            image = api.glance.image_get(self.request, image_id)
+        except exceptions.NOT_FOUND:
+            # Cache the miss as well, deleted images do not come back.
+            return None
+        return {'id': image.id, 'name': image.name}
+
+    def _get_image(self, image_id):
+        try:
+            image = _get_references(
+                self.request, 'image',
+                functools.partial(self._fetch_image, image_id),
+                'image', image_id)
+        except Exception:
+            msg = _("Unable to retrieve image list.")
+            exceptions.handle(self.request, msg)
+            return None
+        return api.base.APIDictWrapper(image) if image else None
+
+    def _list_flavors(self):
+        flavors = api.nova.flavor_list(self.request)
+        return dict((str(flavor.id), flavor.to_dict()) for flavor in flavors)
+
     def _get_flavors(self):
         # Gather our flavors to correlate against IDs
         try:
-            flavors = api.nova.flavor_list(self.request)
-            return dict([(str(flavor.id), flavor) for flavor in flavors])
+            return _to_resources(_get_references(
+                self.request, 'compute', self._list_flavors, 'flavors'))
         except Exception:
             msg = _("Unable to retrieve flavor list.")
             exceptions.handle(self.request, msg)
             return {}
 
+    def _fetch_flavor(self, flavor_id):
+        return api.nova.flavor_get(self.request, flavor_id).to_dict()
+
+    def _get_flavor(self, flavor_id):
+        # The flavor of an instance may be private or deleted, in which
+        # case it is not returned by the flavor list.
+        try:
+            return api.base.APIDictWrapper(_get_references(
+                self.request, 'compute',
+                functools.partial(self._fetch_flavor, flavor_id),
+                'flavor', flavor_id))
+        except Exception:
+            msg = _('Unable to retrieve instance size information.')
+            exceptions.handle(self.request, msg)
+            return None
+
     def _get_instances(self, search_opts):
         try:
             instances, self._more = api.nova.server_list(
@@ -122,6 +206,38 @@ class AdminIndexView(tables.DataTableView):
                               _('Unable to retrieve instance list.'))
         return instances
 
+    def _get_page_references(self, instances, image_dict, flavor_dict):
+        """Looks up the images and the missing flavors of the instances.
+
+        Only the images of the instances of the page are retrieved, and
+        each image or flavor is retrieved once, concurrently.
+        """
+        image_ids = []
+        flavor_ids = []
+        for inst in instances:
+            image = getattr(inst, 'image', None)
+            if isinstance(image, dict):
+                image_id = image.get('id')
+                if (image_id and image_id not in image_dict and
+                        image_id not in image_ids):
+                    image_ids.append(image_id)
+            flavor_id = inst.flavor["id"]
+            if flavor_id not in flavor_dict and flavor_id not in flavor_ids:
+                flavor_ids.append(flavor_id)
+
+        results = futurist_utils.call_functions_parallel(
+            *([(self._get_image, [i]) for i in image_ids] +
+              [(self._get_flavor, [f]) for f in flavor_ids]))
+        image_dict = dict(image_dict)
+        image_dict.update((i, image) for i, image
+                          in zip(image_ids, results[:len(image_ids)])
+                          if image)
+        flavor_dict = dict(flavor_dict)
+        flavor_dict.update((f, flavor) for f, flavor
+                           in zip(flavor_ids, results[len(image_ids):])
+                           if flavor)
+        return image_dict, flavor_dict
+
     def get_data(self):
         instances = []
 
@@ -145,9 +261,16 @@ class AdminIndexView(tables.DataTableView):
 
         self._needs_filter_first = False
 
-        results = futurist_utils.call_functions_parallel(
-            self._get_images, self._get_flavors, self._get_tenants)
-        image_dict, flavor_dict, tenant_dict = results
+        # The whole image list is only needed to filter by image name,
+        # otherwise the images of the instances of the page are retrieved.
+        if 'image_name' in search_opts:
+            results = futurist_utils.call_functions_parallel(
+                self._get_images, self._get_flavors, self._get_tenants)
+            image_dict, flavor_dict, tenant_dict = results
+        else:
+            flavor_dict, tenant_dict = futurist_utils.call_functions_parallel(
+                self._get_flavors, self._get_tenants)
+            image_dict = {}
 
         non_api_filter_info = (
             ('project', 'tenant_id', tenant_dict.values()),
@@ -159,6 +282,8 @@ class AdminIndexView(tables.DataTableView):
             return []
 
         instances = self._get_instances(search_opts)
+        image_dict, flavor_dict = self._get_page_references(
+            instances, image_dict, flavor_dict)
 
         # Loop through instances to get image, flavor and tenant info.
         for inst in instances:
@@ -173,17 +298,8 @@ class AdminIndexView(tables.DataTableView):
                     inst.image['name'] = _("-")
 
             flavor_id = inst.flavor["id"]
-            try:
-                if flavor_id in flavor_dict:
-                    inst.full_flavor = flavor_dict[flavor_id]
-                else:
-                    # If the flavor_id is not in flavor_dict list,
-                    # gets it via nova api.
-                    inst.full_flavor = api.nova.flavor_get(
-                        self.request, flavor_id)
-            except Exception:
-                msg = _('Unable to retrieve instance size information.')
-                exceptions.handle(self.request, msg)
+            if flavor_id in flavor_dict:
+                inst.full_flavor = flavor_dict[flavor_id]
             tenant = tenant_dict.get(inst.tenant_id, None)
             inst.tenant_name = getattr(tenant, "name", None)
         return instances
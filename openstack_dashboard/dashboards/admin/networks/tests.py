@@ -31,12 +31,7 @@ INDEX_URL = reverse('horizon:admin:networks:index')
 
 
 class NetworkTests(test.BaseAdminViewTests):
-    @test.create_stubs({api.neutron: ('network_list',
-                                      'list_dhcp_agent_hosting_networks',
-                                      'is_extension_supported'),
-                        api.keystone: ('tenant_list',),
-                        usage.quotas: ('tenant_quota_usages',)})
-    def test_index(self):
+    def _stub_index(self, agents_by_network=None, agents_exception=False):
         tenants = self.tenants.list()
         quota_data = self.quota_usages.first()
         api.neutron.network_list(IsA(http.HttpRequest)) \
@@ -46,20 +41,33 @@ class NetworkTests(test.BaseAdminViewTests):
         api.neutron.is_extension_supported(
             IsA(http.HttpRequest),
             'network_availability_zone').AndReturn(True)
+        api.neutron.is_extension_supported(
+            IsA(http.HttpRequest),
+            'dhcp_agent_scheduler').AndReturn(True)
+        if agents_exception:
+            api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)) \
+                .AndRaise(self.exceptions.neutron)
+        else:
+            api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)) \
+                .AndReturn(agents_by_network)
         for network in self.networks.list():
             usage.quotas.tenant_quota_usages(
                 IsA(http.HttpRequest), tenant_id=network.tenant_id,
                 targets=('subnet', )).AndReturn(quota_data)
-            api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                         network.id)\
-                .AndReturn(self.agents.list())
-            api.neutron.is_extension_supported(
-                IsA(http.HttpRequest),
-                'dhcp_agent_scheduler').AndReturn(True)
 
         api.neutron.is_extension_supported(
             IsA(http.HttpRequest),
             'dhcp_agent_scheduler').AndReturn(True)
+
+    @test.create_stubs({api.neutron: ('network_list',
+                                      'dhcp_agents_by_network',
+                                      'is_extension_supported'),
+                        api.keystone: ('tenant_list',),
+                        usage.quotas: ('tenant_quota_usages',)})
+    def test_index(self):
+        network = self.networks.first()
+        agent_ids = [agent.id for agent in self.agents.list()]
+        self._stub_index({network.id: agent_ids})
         self.mox.ReplayAll()
 
         res = self.client.get(INDEX_URL)
@@ -67,6 +75,27 @@ class NetworkTests(test.BaseAdminViewTests):
         self.assertTemplateUsed(res, INDEX_TEMPLATE)
         networks = res.context['networks_table'].data
         self.assertItemsEqual(networks, self.networks.list())
+        num_agents = dict((n.id, n.num_agents) for n in networks)
+        self.assertEqual(len(agent_ids), num_agents.pop(network.id))
+        self.assertEqual(set([0]), set(num_agents.values()))
+
+    @test.create_stubs({api.neutron: ('network_list',
+                                      'dhcp_agents_by_network',
+                                      'is_extension_supported'),
+                        api.keystone: ('tenant_list',),
+                        usage.quotas: ('tenant_quota_usages',)})
+    def test_index_dhcp_agents_exception(self):
+        self._stub_index(agents_exception=True)
+        self.mox.ReplayAll()
+
+        res = self.client.get(INDEX_URL)
+
+        self.assertTemplateUsed(res, INDEX_TEMPLATE)
+        networks = res.context['networks_table'].data
+        self.assertItemsEqual(networks, self.networks.list())
+        self.assertEqual(set(["Unknown"]),
+                         set(n.num_agents for n in networks))
+        self.assertMessageCount(res, error=1)
 
     @test.create_stubs({api.neutron: ('network_list',
                                       'is_extension_supported',)})
@@ -856,15 +885,14 @@ class NetworkTests(test.BaseAdminViewTests):
 
     @test.create_stubs({api.neutron: ('network_list',
                                       'network_delete',
-                                      'list_dhcp_agent_hosting_networks',
+                                      'dhcp_agents_by_network',
                                       'is_extension_supported'),
                         api.keystone: ('tenant_list',)})
     def test_delete_network(self):
         tenants = self.tenants.list()
         network = self.networks.first()
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network.id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)).\
+            AndReturn({network.id: [agent.id for agent in self.agents.list()]})
         api.neutron.is_extension_supported(
             IsA(http.HttpRequest),
             'network_availability_zone').AndReturn(True)
@@ -889,15 +917,14 @@ class NetworkTests(test.BaseAdminViewTests):
 
     @test.create_stubs({api.neutron: ('network_list',
                                       'network_delete',
-                                      'list_dhcp_agent_hosting_networks',
+                                      'dhcp_agents_by_network',
                                       'is_extension_supported'),
                         api.keystone: ('tenant_list',)})
     def test_delete_network_exception(self):
         tenants = self.tenants.list()
         network = self.networks.first()
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network.id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)).\
+            AndReturn({network.id: [agent.id for agent in self.agents.list()]})
         api.neutron.is_extension_supported(
             IsA(http.HttpRequest),
             'network_availability_zone').AndReturn(True)
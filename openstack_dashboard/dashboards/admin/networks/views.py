@@ -63,23 +63,15 @@ class IndexView(tables.DataTableView):
         tenant_dict = OrderedDict([(t.id, t) for t in tenants])
         return tenant_dict
 
-    def _get_agents_data(self, network):
-        agents = []
-        data = _("Unknown")
-
+    def _get_agents_by_network(self):
         try:
             if api.neutron.is_extension_supported(self.request,
                                                   'dhcp_agent_scheduler'):
-                # This method is called for each network. If agent-list cannot
-                # be retrieved, we will see many pop-ups. So the error message
-                # will be popup-ed in get_data() below.
-                agents = api.neutron.list_dhcp_agent_hosting_networks(
-                    self.request, network)
-                data = len(agents)
+                return api.neutron.dhcp_agents_by_network(self.request)
         except Exception:
             msg = _('Unable to list dhcp agents hosting network.')
             exceptions.handle(self.request, msg)
-        return data
+        return None
 
     def needs_filter_first(self, table):
         return getattr(self, "_needs_filter_first", False)
@@ -112,11 +104,15 @@ class IndexView(tables.DataTableView):
         if networks:
             self.exception = False
             tenant_dict = self._get_tenant_list()
+            agents_by_network = self._get_agents_by_network()
             for n in networks:
                 # Set tenant name
                 tenant = tenant_dict.get(n.tenant_id, None)
                 n.tenant_name = getattr(tenant, 'name', None)
-                n.num_agents = self._get_agents_data(n.id)
+                if agents_by_network is None:
+                    n.num_agents = _("Unknown")
+                else:
+                    n.num_agents = len(agents_by_network.get(n.id, ()))
         return networks
 
     def get_filters(self, filters=None, filters_map=None):
@@ -39,7 +39,7 @@ INDEX_URL = reverse('horizon:project:overview:index')
 class UsageViewTests(test.BaseAdminViewTests):
 
     def _stub_api_calls(self, nova_stu_enabled):
-        self.mox.StubOutWithMock(api.nova, 'usage_list')
+        self.mox.StubOutWithMock(api.nova, 'usage_list_pages')
         self.mox.StubOutWithMock(api.nova, 'extension_supported')
         self.mox.StubOutWithMock(api.keystone, 'tenant_list')
 
@@ -85,14 +85,13 @@ class UsageViewTests(test.BaseAdminViewTests):
 
         if nova_stu_enabled:
             start_day, now = self._get_start_end_range(overview_days_range)
-            api.nova.usage_list(IsA(http.HttpRequest),
-                                datetime.datetime(start_day.year,
-                                                  start_day.month,
-                                                  start_day.day, 0, 0, 0, 0),
-                                datetime.datetime(now.year,
-                                                  now.month,
-                                                  now.day, 23, 59, 59, 0)) \
-                .AndReturn(usage_list)
+            api.nova.usage_list_pages(
+                IsA(http.HttpRequest),
+                datetime.datetime(start_day.year, start_day.month,
+                                  start_day.day, 0, 0, 0, 0),
+                datetime.datetime(now.year, now.month,
+                                  now.day, 23, 59, 59, 0)) \
+                .AndReturn(iter([usage_list]))
 
         self.mox.ReplayAll()
         res = self.client.get(reverse('horizon:admin:overview:index'))
@@ -168,29 +167,29 @@ class UsageViewTests(test.BaseAdminViewTests):
                     .AndReturn([self.tenants.list(), False])
         if nova_stu_enabled:
             start_day, now = self._get_start_end_range(overview_days_range)
-            api.nova.usage_list(IsA(http.HttpRequest),
-                                datetime.datetime(start_day.year,
-                                                  start_day.month,
-                                                  start_day.day,
-                                                  0, 0, 0, 0),
-                                datetime.datetime(now.year,
-                                                  now.month,
-                                                  now.day, 23, 59, 59, 0)) \
-                .AndReturn(usage_obj)
+            api.nova.usage_list_pages(
+                IsA(http.HttpRequest),
+                datetime.datetime(start_day.year, start_day.month,
+                                  start_day.day, 0, 0, 0, 0),
+                datetime.datetime(now.year, now.month,
+                                  now.day, 23, 59, 59, 0)) \
+                .AndReturn(iter([usage_obj]))
         self.mox.ReplayAll()
 
         csv_url = reverse('horizon:admin:overview:index') + "?format=csv"
         res = self.client.get(csv_url)
         self.assertTemplateUsed(res, 'admin/overview/usage.csv')
         self.assertIsInstance(res.context['usage'], usage.GlobalUsage)
+        self.assertTrue(res.streaming)
+        content = b''.join(res.streaming_content).decode('utf-8')
+        self.assertNotIn('\x00', content)
         hdr = 'Project Name,VCPUs,RAM (MB),Disk (GB),Usage (Hours)'
-        self.assertContains(res, '%s\r\n' % hdr)
+        self.assertIn('%s\r\n' % hdr, content)
 
         if nova_stu_enabled:
+            project_names = dict((t.id, t.name) for t in self.tenants.list())
             for obj in usage_obj:
-                row = u'{0},{1},{2},{3},{4:.2f}\r\n'.format(obj.project_name,
-                                                            obj.vcpus,
-                                                            obj.memory_mb,
-                                                            obj.disk_gb_hours,
-                                                            obj.vcpu_hours)
-                self.assertContains(res, row)
+                row = u'{0},{1},{2},{3},{4:.2f}\r\n'.format(
+                    project_names[obj.tenant_id], obj.vcpus, obj.memory_mb,
+                    obj.disk_gb_hours, obj.vcpu_hours)
+                self.assertIn(row, content)
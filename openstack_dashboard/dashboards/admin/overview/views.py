@@ -28,7 +28,7 @@ from openstack_dashboard import api
 from openstack_dashboard import usage
 
 
-class GlobalUsageCsvRenderer(csvbase.BaseCsvResponse):
+class GlobalUsageCsvRenderer(csvbase.BaseCsvStreamingResponse):
 
     columns = [_("Project Name"), _("VCPUs"), _("RAM (MB)"),
                _("Disk (GB)"), _("Usage (Hours)")]
@@ -63,12 +63,13 @@ class GlobalOverview(usage.UsageView):
             projects = []
             exceptions.handle(self.request,
                               _('Unable to retrieve project list.'))
+        project_names = dict((t.id, getattr(t, "name", None))
+                             for t in projects)
         for instance in data:
-            project = [t for t in projects if t.id == instance.tenant_id]
             # If we could not get the project name, show the tenant_id with
             # a 'Deleted' identifier instead.
-            if project:
-                instance.project_name = getattr(project[0], "name", None)
+            if instance.tenant_id in project_names:
+                instance.project_name = project_names[instance.tenant_id]
             else:
                 deleted = _("Deleted")
                 instance.project_name = translation.string_concat(
@@ -40,6 +40,7 @@ class VolumeTypesView(tables.MultiTableView, volumes_views.VolumeTableMixIn):
                      volume_types_tables.QosSpecsTable)
     page_title = _("Volume Types")
     template_name = "admin/volume_types/volume_types_tables.html"
+    parallel_load = True
 
     def get_volume_types_data(self):
         try:
@@ -22,6 +22,8 @@ from django.utils.http import urlunquote
 from openstack_dashboard import api
 from openstack_dashboard.dashboards.project.volumes \
     import tables as volume_tables
+from openstack_dashboard.dashboards.project.volumes \
+    import tests as volume_tests
 from openstack_dashboard.test import helpers as test
 
 from openstack_dashboard.dashboards.admin.snapshots import forms
@@ -31,7 +33,8 @@ DETAIL_URL = ('horizon:admin:volumes:detail')
 INDEX_URL = reverse('horizon:admin:volumes:index')
 
 
-class VolumeTests(test.BaseAdminViewTests):
+class VolumeTests(volume_tests.VolumeAttributesTestMixin,
+                  test.BaseAdminViewTests):
     def tearDown(self):
         for volume in self.cinder_volumes.list():
             # VolumeTableMixIn._set_volume_attributes mutates data
@@ -42,7 +45,7 @@ class VolumeTests(test.BaseAdminViewTests):
         super(VolumeTests, self).tearDown()
 
     @test.create_mocks({
-        api.nova: ['server_list'],
+        api.nova: ['server_get'],
         api.cinder: ['volume_snapshot_list', 'volume_list_paged'],
         api.keystone: ['tenant_list']})
     def _test_index(self, instanceless_volumes):
@@ -55,20 +58,17 @@ class VolumeTests(test.BaseAdminViewTests):
         self.mock_volume_snapshot_list.return_value = []
 
         if not instanceless_volumes:
-            self.mock_server_list.return_value = [self.servers.list(), False]
+            self.mock_server_get.return_value = self.servers.first()
 
         self.mock_tenant_list.return_value = [[self.tenants.list(), False]]
 
         res = self.client.get(INDEX_URL)
-        if not instanceless_volumes:
-            self.mock_server_list.assert_called_once_with(
-                test.IsHttpRequest(), search_opts={'all_tenants': True})
 
         self.mock_volume_list_paged.assert_called_once_with(
             test.IsHttpRequest(), sort_dir="desc", marker=None, paginate=True,
             search_opts={'all_tenants': True})
-        self.mock_volume_snapshot_list.assert_called_once_with(
-            test.IsHttpRequest(), search_opts={'all_tenants': True})
+        self._check_volume_attributes_lookups(
+            volumes, search_opts={'all_tenants': True})
         self.mock_tenant_list.assert_called_once()
         self.assertTemplateUsed(res, 'horizon/common/_data_table_view.html')
         volumes = res.context['volumes_table'].data
@@ -81,7 +81,7 @@ class VolumeTests(test.BaseAdminViewTests):
         self._test_index(False)
 
     @test.create_mocks({
-        api.nova: ['server_list'],
+        api.nova: ['server_get'],
         api.cinder: ['volume_snapshot_list', 'volume_list_paged'],
         api.keystone: ['tenant_list']})
     def _test_index_paginated(self, marker, sort_dir, volumes, url,
@@ -91,21 +91,19 @@ class VolumeTests(test.BaseAdminViewTests):
         self.mock_volume_list_paged.return_value = \
             [volumes, has_more, has_prev]
         self.mock_volume_snapshot_list.return_value = vol_snaps
-        self.mock_server_list.return_value = [self.servers.list(), False]
+        self.mock_server_get.return_value = self.servers.first()
         self.mock_tenant_list.return_value = [self.tenants.list(), False]
 
         res = self.client.get(urlunquote(url))
 
-        self.mock_server_list.assert_called_once_with(
-            test.IsHttpRequest(), search_opts={'all_tenants': True})
         self.mock_volume_list_paged.assert_called_once_with(
             test.IsHttpRequest(),
             sort_dir=sort_dir,
             marker=marker, paginate=True,
             search_opts={
                 'all_tenants': True})
-        self.mock_volume_snapshot_list.assert_called_once_with(
-            test.IsHttpRequest(), search_opts={'all_tenants': True})
+        self._check_volume_attributes_lookups(
+            volumes, search_opts={'all_tenants': True})
         self.mock_tenant_list.assert_called_once()
 
         self.assertTemplateUsed(res, 'horizon/common/_data_table_view.html')
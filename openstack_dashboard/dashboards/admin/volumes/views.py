@@ -76,11 +76,9 @@ class VolumesView(tables.PagedTableMixin, volumes_views.VolumeTableMixIn,
         else:
             volumes = self._get_volumes(search_opts=filters)
 
-        attached_instance_ids = self._get_attached_instance_ids(volumes)
-        instances = self._get_instances(search_opts={'all_tenants': True},
-                                        instance_ids=attached_instance_ids)
-        volume_ids_with_snapshots = self._get_volumes_ids_with_snapshots(
-            search_opts={'all_tenants': True})
+        instances, volume_ids_with_snapshots = \
+            self._get_instances_and_snapshots(
+                volumes, search_opts={'all_tenants': True})
         self._set_volume_attributes(
             volumes, instances, volume_ids_with_snapshots)
 
@@ -509,22 +509,14 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                     domain=self.domain.id,
                                     project=self.tenant.id) \
                 .AndReturn(groups)
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group='1',
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
-            api.keystone.remove_group_role(IsA(http.HttpRequest),
-                                           project=self.tenant.id,
-                                           group='1',
-                                           role='1')
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group='2',
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group='3',
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
+            # Group 1 keeps role 2, give groups 2 and 3 roles 1 and 2
+            for group_id in ('2', '3'):
+                for role_id in ('1', '2'):
+                    api.keystone.add_group_role(IsA(http.HttpRequest),
+                                                role=role_id,
+                                                group=group_id,
+                                                project=self.tenant.id) \
+                        .InAnyOrder()
         else:
             api.keystone.user_list(IsA(http.HttpRequest),
                                    project=self.tenant.id) \
@@ -17,6 +17,7 @@
 #    under the License.
 
 import abc
+import collections
 import logging
 
 from django.conf import settings
@@ -49,6 +50,21 @@ PROJECT_GROUP_MEMBER_SLUG = "update_group_members"
 COMMON_HORIZONTAL_TEMPLATE = "identity/projects/_common_horizontal_form.html"
 
 
+def _get_requested_roles(step, data, available_roles):
+    """Returns the role IDs selected in a membership step by member ID."""
+    requested_roles = collections.defaultdict(set)
+    for role in available_roles:
+        field_name = step.get_member_field_name(role.id)
+        for member_id in data[field_name]:
+            requested_roles[member_id].add(role.id)
+    return requested_roles
+
+
+def _count_members(*assignment_lists):
+    return len(set(member_id for assignments in assignment_lists
+                   for member_id, role_id in assignments))
+
+
 class CommonQuotaAction(workflows.Action):
 
     _quota_fields = None
@@ -520,69 +536,58 @@ class CreateProject(workflows.Workflow):
             exceptions.handle(request, ignore=True)
             return
 
+    def _get_members_failure_message(self, users_to_add):
+        if PROJECT_GROUP_ENABLED:
+            group_msg = _(", add project groups")
+        else:
+            group_msg = ""
+        return (_('Failed to add %(users_to_add)s project '
+                  'members%(group_msg)s and set project quotas.')
+                % {'users_to_add': users_to_add,
+                   'group_msg': group_msg})
+
     def _update_project_members(self, request, data, project_id):
         # update project members
         users_to_add = 0
         try:
             available_roles = api.keystone.role_list(request)
             member_step = self.get_step(PROJECT_USER_MEMBER_SLUG)
+            grants, __ = identity.diff_role_assignments(
+                {}, _get_requested_roles(member_step, data, available_roles))
             # count how many users are to be added
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                role_list = data[field_name]
-                users_to_add += len(role_list)
+            users_to_add = _count_members(grants)
             # add new users to project
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                role_list = data[field_name]
-                users_added = 0
-                for user in role_list:
-                    api.keystone.add_tenant_user_role(request,
-                                                      project=project_id,
-                                                      user=user,
-                                                      role=role.id)
-                    users_added += 1
-                users_to_add -= users_added
+            failed_grants, __ = identity.update_role_assignments(
+                request, project_id, grants=grants)
+            users_to_add = _count_members(failed_grants)
         except Exception:
-            if PROJECT_GROUP_ENABLED:
-                group_msg = _(", add project groups")
-            else:
-                group_msg = ""
             exceptions.handle(request,
-                              _('Failed to add %(users_to_add)s project '
-                                'members%(group_msg)s and set project quotas.')
-                              % {'users_to_add': users_to_add,
-                                 'group_msg': group_msg})
+                              self._get_members_failure_message(users_to_add))
+            return
+        if users_to_add:
+            messages.error(request,
+                           self._get_members_failure_message(users_to_add))
 
     def _update_project_groups(self, request, data, project_id):
         # update project groups
         groups_to_add = 0
+        msg = _('Failed to add %s project groups and update project quotas.')
         try:
             available_roles = api.keystone.role_list(request)
             member_step = self.get_step(PROJECT_GROUP_MEMBER_SLUG)
-
+            grants, __ = identity.diff_role_assignments(
+                {}, _get_requested_roles(member_step, data, available_roles))
             # count how many groups are to be added
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                role_list = data[field_name]
-                groups_to_add += len(role_list)
+            groups_to_add = _count_members(grants)
             # add new groups to project
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                role_list = data[field_name]
-                groups_added = 0
-                for group in role_list:
-                    api.keystone.add_group_role(request,
-                                                role=role.id,
-                                                group=group,
-                                                project=project_id)
-                    groups_added += 1
-                groups_to_add -= groups_added
+            failed_grants, __ = identity.update_role_assignments(
+                request, project_id, grants=grants, group=True)
+            groups_to_add = _count_members(failed_grants)
         except Exception:
-            exceptions.handle(request,
-                              _('Failed to add %s project groups '
-                                'and update project quotas.')
-                              % groups_to_add)
+            exceptions.handle(request, msg % groups_to_add)
+            return
+        if groups_to_add:
+            messages.error(request, msg % groups_to_add)
 
     def handle(self, request, data):
         project = self._create_project(request, data)
@@ -677,6 +682,11 @@ class UpdateProject(workflows.Workflow):
     def _get_available_roles(self, request):
         return api.keystone.role_list(request)
 
+    @memoized.memoized_method
+    def _get_project_roles(self, request, project_id):
+        return api.keystone.get_project_users_groups_roles(request,
+                                                           project_id)
+
     def _update_project(self, request, data):
         """Update project info"""
         domain_id = identity.get_domain_id_for_operation(request)
@@ -707,39 +717,6 @@ class UpdateProject(workflows.Workflow):
             exceptions.handle(request, ignore=True)
             return
 
-    def _add_roles_to_users(self, request, data, project_id, user_id,
-                            role_ids, available_roles):
-        member_step = self.get_step(PROJECT_USER_MEMBER_SLUG)
-        current_role_ids = list(role_ids)
-
-        for role in available_roles:
-            field_name = member_step.get_member_field_name(role.id)
-            # Check if the user is in the list of users with this role.
-            if user_id in data[field_name]:
-                # Add it if necessary
-                if role.id not in current_role_ids:
-                    # user role has changed
-                    api.keystone.add_tenant_user_role(
-                        request,
-                        project=project_id,
-                        user=user_id,
-                        role=role.id)
-                else:
-                    # User role is unchanged, so remove it from the
-                    # remaining roles list to avoid removing it later.
-                    index = current_role_ids.index(role.id)
-                    current_role_ids.pop(index)
-        return current_role_ids
-
-    def _remove_roles_from_user(self, request, project_id, user_id,
-                                current_role_ids):
-        for id_to_delete in current_role_ids:
-            api.keystone.remove_tenant_user_role(
-                request,
-                project=project_id,
-                user=user_id,
-                role=id_to_delete)
-
     def _is_removing_self_admin_role(self, request, project_id, user_id,
                                      available_roles, current_role_ids):
         is_current_user = user_id == request.user.id
@@ -772,14 +749,19 @@ class UpdateProject(workflows.Workflow):
         users_to_modify = 0
         # Project-user member step
         member_step = self.get_step(PROJECT_USER_MEMBER_SLUG)
+        if PROJECT_GROUP_ENABLED:
+            group_msg = _(", update project groups")
+        else:
+            group_msg = ""
+        msg = _('Failed to modify %(users_to_modify)s'
+                ' project members%(group_msg)s and '
+                'update project quotas.')
         try:
             # Get our role options
             available_roles = self._get_available_roles(request)
             # Get the users currently associated with this project so we
             # can diff against it.
-            users_roles = api.keystone.get_project_users_roles(
-                request, project=project_id)
-            users_to_modify = len(users_roles)
+            users_roles = self._get_project_roles(request, project_id)[0]
 
             # TODO(bpokorny): The following lines are needed to make sure we
             # only modify roles for users who are in the current domain.
@@ -791,137 +773,73 @@ class UpdateProject(workflows.Workflow):
                                                domain=data['domain_id'])
             users_dict = {user.id: user.name for user in all_users}
 
-            for user_id in users_roles.keys():
-                # Don't remove roles if the user isn't in the domain
-                if user_id not in users_dict:
-                    users_to_modify -= 1
-                    continue
-
-                # Check if there have been any changes in the roles of
-                # Existing project members.
-                current_role_ids = list(users_roles[user_id])
-                modified_role_ids = self._add_roles_to_users(
-                    request, data, project_id, user_id,
-                    current_role_ids, available_roles)
-                # Prevent admins from doing stupid things to themselves.
-                removing_admin = self._is_removing_self_admin_role(
-                    request, project_id, user_id, available_roles,
-                    modified_role_ids)
-                # Otherwise go through and revoke any removed roles.
-                if not removing_admin:
-                    self._remove_roles_from_user(request, project_id, user_id,
-                                                 modified_role_ids)
-                users_to_modify -= 1
-
-            # Grant new roles on the project.
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                # Count how many users may be added for exception handling.
-                users_to_modify += len(data[field_name])
-            for role in available_roles:
-                users_added = 0
-                field_name = member_step.get_member_field_name(role.id)
-                for user_id in data[field_name]:
-                    if user_id not in users_roles:
-                        api.keystone.add_tenant_user_role(request,
-                                                          project=project_id,
-                                                          user=user_id,
-                                                          role=role.id)
-                    users_added += 1
-                users_to_modify -= users_added
-            return True
+            grants, revokes = identity.diff_role_assignments(
+                users_roles,
+                _get_requested_roles(member_step, data, available_roles),
+                managed=users_dict)
+            # Prevent admins from doing stupid things to themselves.
+            self_role_ids = [role_id for user_id, role_id in revokes
+                             if user_id == request.user.id]
+            if self_role_ids and self._is_removing_self_admin_role(
+                    request, project_id, request.user.id, available_roles,
+                    self_role_ids):
+                revokes = [(user_id, role_id) for user_id, role_id in revokes
+                           if user_id != request.user.id]
+            users_to_modify = _count_members(grants, revokes)
+
+            # Grant new roles and revoke removed roles on the project.
+            failed_grants, failed_revokes = identity.update_role_assignments(
+                request, project_id, grants=grants, revokes=revokes)
+            users_to_modify = _count_members(failed_grants, failed_revokes)
         except Exception:
-            if PROJECT_GROUP_ENABLED:
-                group_msg = _(", update project groups")
-            else:
-                group_msg = ""
             exceptions.handle(request,
-                              _('Failed to modify %(users_to_modify)s'
-                                ' project members%(group_msg)s and '
-                                'update project quotas.')
-                              % {'users_to_modify': users_to_modify,
-                                 'group_msg': group_msg})
+                              msg % {'users_to_modify': users_to_modify,
+                                     'group_msg': group_msg})
             return False
+        if users_to_modify:
+            messages.error(request,
+                           msg % {'users_to_modify': users_to_modify,
+                                  'group_msg': group_msg})
+            return False
+        return True
 
     def _update_project_groups(self, request, data, project_id, domain_id):
         # update project groups
         groups_to_modify = 0
         member_step = self.get_step(PROJECT_GROUP_MEMBER_SLUG)
+        msg = _('Failed to modify %s project '
+                'members, update project groups '
+                'and update project quotas.')
         try:
             available_roles = self._get_available_roles(request)
             # Get the groups currently associated with this project so we
-            # can diff against it.
+            # can diff against it. Only the groups of the domain are
+            # modified.
+            groups_roles = self._get_project_roles(request, project_id)[1]
             project_groups = api.keystone.group_list(request,
                                                      domain=domain_id,
                                                      project=project_id)
-            groups_to_modify = len(project_groups)
-            for group in project_groups:
-                # Check if there have been any changes in the roles of
-                # Existing project members.
-                current_roles = api.keystone.roles_for_group(
-                    self.request,
-                    group=group.id,
-                    project=project_id)
-                current_role_ids = [role.id for role in current_roles]
-                for role in available_roles:
-                    # Check if the group is in the list of groups with
-                    # this role.
-                    field_name = member_step.get_member_field_name(role.id)
-                    if group.id in data[field_name]:
-                        # Add it if necessary
-                        if role.id not in current_role_ids:
-                            # group role has changed
-                            api.keystone.add_group_role(
-                                request,
-                                role=role.id,
-                                group=group.id,
-                                project=project_id)
-                        else:
-                            # Group role is unchanged, so remove it from
-                            # the remaining roles list to avoid removing it
-                            # later.
-                            index = current_role_ids.index(role.id)
-                            current_role_ids.pop(index)
-
-                # Revoke any removed roles.
-                for id_to_delete in current_role_ids:
-                    api.keystone.remove_group_role(request,
-                                                   role=id_to_delete,
-                                                   group=group.id,
-                                                   project=project_id)
-                groups_to_modify -= 1
-
-            # Grant new roles on the project.
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                # Count how many groups may be added for error handling.
-                groups_to_modify += len(data[field_name])
-            for role in available_roles:
-                groups_added = 0
-                field_name = member_step.get_member_field_name(role.id)
-                for group_id in data[field_name]:
-                    if not filter(lambda x: group_id == x.id,
-                                  project_groups):
-                        api.keystone.add_group_role(request,
-                                                    role=role.id,
-                                                    group=group_id,
-                                                    project=project_id)
-                    groups_added += 1
-                groups_to_modify -= groups_added
-            return True
+
+            grants, revokes = identity.diff_role_assignments(
+                groups_roles,
+                _get_requested_roles(member_step, data, available_roles),
+                managed=set(group.id for group in project_groups))
+            groups_to_modify = _count_members(grants, revokes)
+
+            # Grant new roles and revoke removed roles on the project.
+            failed_grants, failed_revokes = identity.update_role_assignments(
+                request, project_id, grants=grants, revokes=revokes,
+                group=True)
+            groups_to_modify = _count_members(failed_grants, failed_revokes)
         except Exception:
-            exceptions.handle(request,
-                              _('Failed to modify %s project '
-                                'members, update project groups '
-                                'and update project quotas.')
-                              % groups_to_modify)
+            exceptions.handle(request, msg % groups_to_modify)
             return False
+        if groups_to_modify:
+            messages.error(request, msg % groups_to_modify)
+            return False
+        return True
 
     def handle(self, request, data):
-        # FIXME(gabriel): This should be refactored to use Python's built-in
-        # sets and do this all in a single "roles to add" and "roles to remove"
-        # pass instead of the multi-pass thing happening now.
-
         project = self._update_project(request, data)
         if not project:
             return False
@@ -335,7 +335,7 @@ class FloatingIpViewTests(test.TestCase):
             mock.call(test.IsHttpRequest(), targets=('floatingip', )))
 
     @test.create_mocks({api.neutron: ('floating_ip_pools_list',
-                                      'tenant_floating_ip_list',
+                                      'tenant_resource_count',
                                       'is_extension_supported',
                                       'is_router_enabled',
                                       'tenant_quota_get'),
@@ -348,8 +348,8 @@ class FloatingIpViewTests(test.TestCase):
         self.mock_is_extension_supported.side_effect = [True, True, False]
         self.mock_is_router_enabled.return_value = True
         self.mock_tenant_quota_get.return_value = self.neutron_quotas.first()
-        self.mock_tenant_floating_ip_list.return_value = \
-            self.floating_ips.list()
+        self.mock_tenant_resource_count.return_value = \
+            len(self.floating_ips.list())
         self.mock_floating_ip_pools_list.return_value = self.pools.list()
 
         url = reverse('%s:allocate' % NAMESPACE)
@@ -374,7 +374,7 @@ class FloatingIpViewTests(test.TestCase):
             test.IsHttpRequest())
         self.mock_tenant_quota_get.assert_called_once_with(
             test.IsHttpRequest(), self.tenant.id)
-        self.mock_tenant_floating_ip_list.assert_called_once_with(
-            test.IsHttpRequest())
+        self.mock_tenant_resource_count.assert_called_once_with(
+            test.IsHttpRequest(), 'floatingip', self.tenant.id)
         self.mock_floating_ip_pools_list.assert_called_once_with(
             test.IsHttpRequest())
@@ -112,3 +112,4 @@ class InstanceDetailTabs(tabs.DetailTabsGroup):
     slug = "instance_details"
     tabs = (OverviewTab, LogTab, ConsoleTab, AuditTab)
     sticky = True
+    parallel_load = True
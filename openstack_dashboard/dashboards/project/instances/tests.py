@@ -70,6 +70,20 @@ class InstanceTestHelperMixin(object):
     def _check_extension_supported(self, expected_count):
         self.assertEqual(expected_count, self._feature_call_counts)
 
+    def _mock_network_list(self, owned_networks, shared_networks):
+        # network_list_for_tenant() queries the owned and shared networks
+        # concurrently, so the networks are returned depending on the query
+        # rather than on the order of the calls.
+        owned_networks = iter(owned_networks)
+        shared_networks = iter(shared_networks)
+
+        def fake_network_list(request, **params):
+            if 'tenant_id' in params:
+                return next(owned_networks)
+            return next(shared_networks)
+
+        self.mock_network_list.side_effect = fake_network_list
+
 
 class InstanceTestBase(helpers.ResetImageAPIVersionMixin,
                        InstanceTestHelperMixin,
@@ -106,12 +120,9 @@ class InstanceTableTestMixin(object):
         self.assertEqual(count, self.mock_image_list_detailed.call_count)
 
     def _mock_neutron_network_and_port_list(self):
-        self.mock_network_list.side_effect = [
-            self.networks.list()[:1],
-            self.networks.list()[1:],
-            self.networks.list()[:1],
-            self.networks.list()[1:],
-        ]
+        self._mock_network_list(
+            [self.networks.list()[:1], self.networks.list()[:1]],
+            [self.networks.list()[1:], self.networks.list()[1:]])
         self.mock_port_list_with_trunk_types.return_value = self.ports.list()
 
     def _check_neutron_network_and_port_list(self):
@@ -123,7 +134,7 @@ class InstanceTableTestMixin(object):
             mock.call(helpers.IsHttpRequest(), tenant_id=self.tenant.id,
                       shared=False),
             mock.call(helpers.IsHttpRequest(), shared=True),
-        ])
+        ], any_order=True)
         self.assertEqual(len(self.networks.list()),
                          self.mock_port_list_with_trunk_types.call_count)
         self.mock_port_list_with_trunk_types(
@@ -1995,12 +2006,10 @@ class InstanceLaunchInstanceTests(InstanceTestBase,
         self.mock_volume_list.return_value = []
         self.mock_volume_snapshot_list.return_value = []
         self._mock_glance_image_list_detailed(self.versioned_images.list())
-        self.mock_network_list.side_effect = [
-            self.networks.list()[:1],
-            [] if only_one_network else self.networks.list()[1:],
-            self.networks.list()[:1],
-            self.networks.list()[1:],
-        ]
+        self._mock_network_list(
+            [self.networks.list()[:1], self.networks.list()[:1]],
+            [[] if only_one_network else self.networks.list()[1:],
+             self.networks.list()[1:]])
         self.mock_port_list_with_trunk_types.return_value = self.ports.list()
         self.mock_server_group_list.return_value = self.server_groups.list()
         self.mock_tenant_limit_usages.return_value = self.limits['absolute']
@@ -2125,7 +2134,7 @@ class InstanceLaunchInstanceTests(InstanceTestBase,
             mock.call(helpers.IsHttpRequest(),
                       tenant_id=self.tenant.id, shared=False),
             mock.call(helpers.IsHttpRequest(), shared=True),
-        ])
+        ], any_order=True)
         self.assertEqual(4, self.mock_network_list.call_count)
         self.mock_port_list_with_trunk_types.assert_has_calls(
             [mock.call(helpers.IsHttpRequest(),
@@ -2238,12 +2247,10 @@ class InstanceLaunchInstanceTests(InstanceTestBase,
         self.mock_volume_list.return_value = volumes
         self.mock_volume_snapshot_list.return_value = []
         self._mock_glance_image_list_detailed(self.versioned_images.list())
-        self.mock_network_list.side_effect = [
-            self.networks.list()[:1],
-            [] if only_one_network else self.networks.list()[1:],
-            self.networks.list()[:1],
-            self.networks.list()[1:],
-        ]
+        self._mock_network_list(
+            [self.networks.list()[:1], self.networks.list()[:1]],
+            [[] if only_one_network else self.networks.list()[1:],
+             self.networks.list()[1:]])
         self.mock_port_list_with_trunk_types.return_value = self.ports.list()
         self.mock_server_group_list.return_value = self.server_groups.list()
         self.mock_tenant_limit_usages.return_value = self.limits['absolute']
@@ -2289,7 +2296,7 @@ class InstanceLaunchInstanceTests(InstanceTestBase,
             mock.call(helpers.IsHttpRequest(),
                       tenant_id=self.tenant.id, shared=False),
             mock.call(helpers.IsHttpRequest(), shared=True),
-        ])
+        ], any_order=True)
         self.assertEqual(4, self.mock_network_list.call_count)
         self.mock_port_list_with_trunk_types.assert_has_calls(
             [mock.call(helpers.IsHttpRequest(),
@@ -3538,12 +3545,9 @@ class InstanceLaunchInstanceTests(InstanceTestBase,
             [self.versioned_images.list(), False, False],
             [[], False, False],
         ]
-        self.mock_network_list.side_effect = [
-            self.networks.list()[:1],
-            self.networks.list()[1:],
-            self.networks.list()[:1],
-            self.networks.list()[1:],
-        ]
+        self._mock_network_list(
+            [self.networks.list()[:1], self.networks.list()[:1]],
+            [self.networks.list()[1:], self.networks.list()[1:]])
         self.mock_port_list_with_trunk_types.return_value = self.ports.list()
         volumes = [v for v in self.volumes.list()
                    if (v.status == AVAILABLE and v.bootable == 'true')]
@@ -3625,7 +3629,7 @@ class InstanceLaunchInstanceTests(InstanceTestBase,
             mock.call(
                 helpers.IsHttpRequest(),
                 shared=True),
-        ])
+        ], any_order=True)
         self.assertEqual(len(self.networks.list()),
                          self.mock_port_list_with_trunk_types.call_count)
         self.mock_port_list_with_trunk_types.assert_has_calls(
@@ -99,13 +99,11 @@ class IndexView(tables.DataTableView):
         if not instances:
             return []
 
-        # TODO(future): Explore more efficient logic to sync IP address
-        # and drop the setting OPENSTACK_INSTANCE_RETRIEVE_IP_ADDRESSES.
-        # The situation servers_update_addresses() is needed is only
-        # when IP address of a server is updated via neutron API and
-        # nova network info cache is not synced. Precisely there is no
-        # need to check IP addresses of all servers. It is sufficient to
-        # fetch IP address information for servers recently updated.
+        # servers_update_addresses() is needed when the IP addresses of a
+        # server are updated via neutron API and nova network info cache
+        # is not synced. It caches the addresses and only fetches them
+        # again for the servers whose ports or floating IPs changed (see
+        # the SERVER_ADDRESS_CACHE setting).
         if not getattr(settings,
                        'OPENSTACK_INSTANCE_RETRIEVE_IP_ADDRESSES', True):
             return instances
@@ -189,8 +187,9 @@ def _swap_filter(resources, search_opts, fake_field, real_field):
     if fake_field not in search_opts:
         return True
     filter_string = search_opts[fake_field]
+    # Images may have no name.
     matched = [resource for resource in resources
-               if resource.name.lower() == filter_string.lower()]
+               if (resource.name or '').lower() == filter_string.lower()]
     if not matched:
         return False
     search_opts[real_field] = matched[0].id
@@ -55,6 +55,100 @@ class NetworkTopologyTests(test.TestCase):
     def test_json_view_console_disabled(self):
         self._test_json_view(with_console=False)
 
+    @django.test.utils.override_settings(
+        OPENSTACK_NEUTRON_NETWORK={'enable_router': False})
+    @test.create_mocks({api.nova: ('server_list',),
+                        api.neutron: ('network_list_for_tenant',
+                                      'port_list')})
+    @mock.patch.object(views.policy, 'check', return_value=True)
+    def test_json_view_policy_checked_per_tenant(self, mock_check):
+        tenant_networks = [net for net in self.networks.list()
+                           if not net['router:external']]
+        self.mock_server_list.return_value = [[], False]
+        self.mock_network_list_for_tenant.return_value = tenant_networks
+        self.mock_port_list.return_value = []
+
+        res = self.client.get(JSON_URL)
+
+        data = jsonutils.loads(res.content)
+        self.assertEqual(len(tenant_networks), len(data['networks']))
+        tenant_ids = set(net.tenant_id for net in tenant_networks)
+        self.assertEqual(len(tenant_ids), mock_check.call_count)
+
+    def _mock_topology(self, servers):
+        self.mock_server_list.return_value = [servers, False]
+        self.mock_network_list_for_tenant.return_value = []
+        self.mock_port_list.return_value = []
+
+    @django.test.utils.override_settings(
+        OPENSTACK_NEUTRON_NETWORK={'enable_router': False})
+    @test.create_mocks({api.nova: ('server_list',),
+                        api.neutron: ('network_list_for_tenant',
+                                      'port_list')})
+    @mock.patch.object(views, '_snapshot_cache', None)
+    def test_json_view_not_modified(self):
+        self._mock_topology(self.servers.list())
+
+        res = self.client.get(JSON_URL)
+        self.assertEqual(200, res.status_code)
+        etag = res['ETag']
+
+        res = self.client.get(JSON_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, res.status_code)
+        self.assertEqual(etag, res['ETag'])
+        self.assertFalse(res.content)
+
+        self._mock_topology(self.servers.list()[1:])
+        res = self.client.get(JSON_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, res.status_code)
+        self.assertNotEqual(etag, res['ETag'])
+
+    @django.test.utils.override_settings(
+        OPENSTACK_NEUTRON_NETWORK={'enable_router': False})
+    @test.create_mocks({api.nova: ('server_list',),
+                        api.neutron: ('network_list_for_tenant',
+                                      'port_list')})
+    @mock.patch.object(views, '_snapshot_cache', None)
+    def test_json_view_delta(self):
+        servers = self.servers.list()
+        self._mock_topology(servers[:2])
+        res = self.client.get(JSON_URL)
+        version = res['ETag'].strip('"')
+
+        changed_server = servers[1]
+        changed_server.status = 'SHUTOFF'
+        self._mock_topology([changed_server, servers[2]])
+        res = self.client.get(JSON_URL, {'since': version})
+
+        data = jsonutils.loads(res.content)
+        self.assertTrue(data['delta'])
+        self.assertEqual(version, data['since'])
+        self.assertEqual(res['ETag'].strip('"'), data['version'])
+        self.assertEqual([servers[2].id],
+                         [s['id'] for s in data['servers']['added']])
+        self.assertEqual([(changed_server.id, 'SHUTOFF')],
+                         [(s['id'], s['original_status'])
+                          for s in data['servers']['changed']])
+        self.assertEqual([{'id': servers[0].id}],
+                         data['servers']['removed'])
+        self.assertEqual({'added': [], 'changed': [], 'removed': []},
+                         data['networks'])
+
+    @django.test.utils.override_settings(
+        OPENSTACK_NEUTRON_NETWORK={'enable_router': False})
+    @test.create_mocks({api.nova: ('server_list',),
+                        api.neutron: ('network_list_for_tenant',
+                                      'port_list')})
+    @mock.patch.object(views, '_snapshot_cache', None)
+    def test_json_view_delta_unknown_version(self):
+        self._mock_topology(self.servers.list())
+
+        res = self.client.get(JSON_URL, {'since': 'unknown'})
+
+        data = jsonutils.loads(res.content)
+        self.assertNotIn('delta', data)
+        self.assertEqual(len(self.servers.list()), len(data['servers']))
+
     def _test_json_view(self, router_enable=True, with_console=True):
         self.mock_server_list.return_value = [self.servers.list(), False]
 
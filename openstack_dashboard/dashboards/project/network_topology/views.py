@@ -16,18 +16,24 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import hashlib
 import json
 
 from django.conf import settings
 from django.http import HttpResponse
+from django.http import HttpResponseNotModified
 from django.urls import reverse
 from django.urls import reverse_lazy
+from django.utils.http import parse_etags
+from django.utils.http import quote_etag
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic import View
 
 from horizon import exceptions
 from horizon import tabs
 from horizon.utils.lazy_encoder import LazyTranslationEncoder
+from horizon.utils.memoized import LocalLRUStore
 
 from openstack_dashboard import api
 from openstack_dashboard.dashboards.project.network_topology import forms
@@ -76,6 +82,7 @@ from openstack_dashboard.dashboards.project.routers.tables import \
 from openstack_dashboard.dashboards.project.routers import\
     views as r_views
 from openstack_dashboard import policy
+from openstack_dashboard.utils import futurist_utils
 
 # List of known server statuses that wont connect to the console
 console_invalid_status = {
@@ -83,6 +90,39 @@ console_invalid_status = {
     'revert_resize', 'migrating', 'build', 'shelved',
     'shelved_offloaded'}
 
+# Default configuration of the cache of the topology snapshots. It can be
+# overridden by the TOPOLOGY_SNAPSHOT_CACHE setting.
+TOPOLOGY_SNAPSHOT_CACHE_DEFAULTS = {
+    'ttl': 60,
+    'max_size': 1000,
+}
+
+# The attributes identifying a node of each collection of the topology.
+# Several routers can have a fake gateway port on the same network.
+TOPOLOGY_NODE_KEYS = collections.OrderedDict((
+    ('servers', ('id',)),
+    ('networks', ('id',)),
+    ('ports', ('id', 'device_id')),
+    ('routers', ('id',)),
+))
+
+
+def _get_snapshot_cache_config():
+    config = dict(TOPOLOGY_SNAPSHOT_CACHE_DEFAULTS)
+    config.update(getattr(settings, 'TOPOLOGY_SNAPSHOT_CACHE', {}))
+    return config
+
+
+_snapshot_cache = None
+
+
+def _get_snapshot_cache():
+    global _snapshot_cache
+    if _snapshot_cache is None:
+        _snapshot_cache = LocalLRUStore(
+            max_size=_get_snapshot_cache_config()['max_size'])
+    return _snapshot_cache
+
 
 class TranslationHelper(object):
     """Helper class to provide the translations.
@@ -225,19 +265,52 @@ class JSONView(View):
                 continue
             resource['url'] = reverse(view, None, [str(resource['id'])])
 
-    def _check_router_external_port(self, ports, router_id, network_id):
-        for port in ports:
-            if (port['network_id'] == network_id
-                    and port['device_id'] == router_id):
-                return True
-        return False
-
-    def _get_servers(self, request):
-        # Get nova data
+    def _list_servers(self, request):
         try:
             servers, more = api.nova.server_list(request)
         except Exception:
             servers = []
+        return servers
+
+    def _list_networks(self, request):
+        # if we didn't specify tenant_id, all networks shown as admin user.
+        # so it is need to specify the networks. However there is no need to
+        # specify tenant_id for subnet. The subnet which belongs to the public
+        # network is needed to draw subnet information on public network.
+        try:
+            return api.neutron.network_list_for_tenant(
+                request,
+                request.user.tenant_id)
+        except Exception:
+            return []
+
+    def _list_public_networks(self, request):
+        if not self.is_router_enabled:
+            return []
+        try:
+            return api.neutron.network_list(
+                request,
+                **{'router:external': True})
+        except Exception:
+            return []
+
+    def _list_routers(self, request):
+        if not self.is_router_enabled:
+            return []
+        try:
+            return api.neutron.router_list(
+                request,
+                tenant_id=request.user.tenant_id)
+        except Exception:
+            return []
+
+    def _list_ports(self, request):
+        try:
+            return api.neutron.port_list(request)
+        except Exception:
+            return []
+
+    def _get_servers(self, request, servers):
         data = []
         console_type = getattr(settings, 'CONSOLE_TYPE', 'AUTO')
         # lowercase of the keys will be used at the end of the console URL.
@@ -257,33 +330,26 @@ class JSONView(View):
         self.add_resource_url('horizon:project:instances:detail', data)
         return data
 
-    def _get_networks(self, request):
-        # Get neutron data
-        # if we didn't specify tenant_id, all networks shown as admin user.
-        # so it is need to specify the networks. However there is no need to
-        # specify tenant_id for subnet. The subnet which belongs to the public
-        # network is needed to draw subnet information on public network.
-        try:
-            neutron_networks = api.neutron.network_list_for_tenant(
-                request,
-                request.user.tenant_id)
-        except Exception:
-            neutron_networks = []
+    def _get_networks(self, request, neutron_networks,
+                      neutron_public_networks):
         networks = []
+        # The decision only depends on the owner of the network.
+        allow_delete_subnet = {}
         for network in neutron_networks:
-            allow_delete_subnet = policy.check(
-                (("network", "delete_subnet"),),
-                request,
-                target={'network:tenant_id': getattr(network,
-                                                     'tenant_id', None)}
-            )
+            tenant_id = getattr(network, 'tenant_id', None)
+            if tenant_id not in allow_delete_subnet:
+                allow_delete_subnet[tenant_id] = policy.check(
+                    (("network", "delete_subnet"),),
+                    request,
+                    target={'network:tenant_id': tenant_id}
+                )
             obj = {'name': network.name_or_id,
                    'id': network.id,
                    'subnets': [{'id': subnet.id,
                                 'cidr': subnet.cidr}
                                for subnet in network.subnets],
                    'status': self.trans.network[network.status],
-                   'allow_delete_subnet': allow_delete_subnet,
+                   'allow_delete_subnet': allow_delete_subnet[tenant_id],
                    'original_status': network.status,
                    'router:external': network['router:external']}
             self.add_resource_url('horizon:project:networks:subnets:detail',
@@ -291,32 +357,25 @@ class JSONView(View):
             networks.append(obj)
 
         # Add public networks to the networks list
-        if self.is_router_enabled:
+        my_network_ids = set(net['id'] for net in networks)
+        for publicnet in neutron_public_networks:
+            if publicnet.id in my_network_ids:
+                continue
             try:
-                neutron_public_networks = api.neutron.network_list(
-                    request,
-                    **{'router:external': True})
+                subnets = [{'id': subnet.id,
+                            'cidr': subnet.cidr}
+                           for subnet in publicnet.subnets]
+                self.add_resource_url(
+                    'horizon:project:networks:subnets:detail', subnets)
             except Exception:
-                neutron_public_networks = []
-            my_network_ids = [net['id'] for net in networks]
-            for publicnet in neutron_public_networks:
-                if publicnet.id in my_network_ids:
-                    continue
-                try:
-                    subnets = [{'id': subnet.id,
-                                'cidr': subnet.cidr}
-                               for subnet in publicnet.subnets]
-                    self.add_resource_url(
-                        'horizon:project:networks:subnets:detail', subnets)
-                except Exception:
-                    subnets = []
-                networks.append({
-                    'name': publicnet.name_or_id,
-                    'id': publicnet.id,
-                    'subnets': subnets,
-                    'status': self.trans.network[publicnet.status],
-                    'original_status': publicnet.status,
-                    'router:external': publicnet['router:external']})
+                subnets = []
+            networks.append({
+                'name': publicnet.name_or_id,
+                'id': publicnet.id,
+                'subnets': subnets,
+                'status': self.trans.network[publicnet.status],
+                'original_status': publicnet.status,
+                'router:external': publicnet['router:external']})
 
         self.add_resource_url('horizon:project:networks:detail',
                               networks)
@@ -325,16 +384,7 @@ class JSONView(View):
                       key=lambda x: x.get('router:external'),
                       reverse=True)
 
-    def _get_routers(self, request):
-        if not self.is_router_enabled:
-            return []
-        try:
-            neutron_routers = api.neutron.router_list(
-                request,
-                tenant_id=request.user.tenant_id)
-        except Exception:
-            neutron_routers = []
-
+    def _get_routers(self, request, neutron_routers):
         routers = [{'id': router.id,
                     'name': router.name_or_id,
                     'status': self.trans.router[router.status],
@@ -344,15 +394,10 @@ class JSONView(View):
         self.add_resource_url('horizon:project:routers:detail', routers)
         return routers
 
-    def _get_ports(self, request, networks):
-        try:
-            neutron_ports = api.neutron.port_list(request)
-        except Exception:
-            neutron_ports = []
-
+    def _get_ports(self, request, neutron_ports, networks):
         # we should filter out ports connected to non tenant networks
         # which they have no visibility to
-        tenant_network_ids = [network['id'] for network in networks]
+        tenant_network_ids = set(network['id'] for network in networks)
         ports = [{'id': port.id,
                   'network_id': port.network_id,
                   'device_id': port.device_id,
@@ -370,6 +415,8 @@ class JSONView(View):
     def _prepare_gateway_ports(self, routers, ports):
         # user can't see port on external network. so we are
         # adding fake port based on router information
+        device_network_ids = set((port['device_id'], port['network_id'])
+                                 for port in ports)
         for router in routers:
             external_gateway_info = router.get('external_gateway_info')
             if not external_gateway_info:
@@ -378,9 +425,7 @@ class JSONView(View):
                 'network_id')
             if not external_network:
                 continue
-            if self._check_router_external_port(ports,
-                                                router['id'],
-                                                external_network):
+            if (router['id'], external_network) in device_network_ids:
                 continue
             fake_port = {'id': 'gateway%s' % external_network,
                          'network_id': external_network,
@@ -389,12 +434,92 @@ class JSONView(View):
             ports.append(fake_port)
 
     def get(self, request, *args, **kwargs):
-        networks = self._get_networks(request)
-        data = {'servers': self._get_servers(request),
+        (servers, neutron_networks, neutron_public_networks,
+         neutron_routers, neutron_ports) = \
+            futurist_utils.call_functions_parallel(
+                (self._list_servers, [request]),
+                (self._list_networks, [request]),
+                (self._list_public_networks, [request]),
+                (self._list_routers, [request]),
+                (self._list_ports, [request]))
+        networks = self._get_networks(request, neutron_networks,
+                                      neutron_public_networks)
+        data = {'servers': self._get_servers(request, servers),
                 'networks': networks,
-                'ports': self._get_ports(request, networks),
-                'routers': self._get_routers(request)}
+                'ports': self._get_ports(request, neutron_ports, networks),
+                'routers': self._get_routers(request, neutron_routers)}
         self._prepare_gateway_ports(data['routers'], data['ports'])
-        json_string = json.dumps(data, cls=LazyTranslationEncoder,
-                                 ensure_ascii=False)
-        return HttpResponse(json_string, content_type='text/json')
+
+        snapshot = self._serialize_nodes(data)
+        json_string = self._join_collections(
+            (name, list(nodes.values())) for name, nodes in snapshot.items())
+        version = hashlib.sha1(json_string.encode('utf-8')).hexdigest()
+        etag = quote_etag(version)
+
+        previous = None
+        config = _get_snapshot_cache_config()
+        if config['ttl'] > 0:
+            cache = _get_snapshot_cache()
+            since = request.GET.get('since')
+            if since:
+                try:
+                    previous = cache.get((request.user.tenant_id, since))
+                except KeyError:
+                    # The client gets the whole topology instead.
+                    pass
+            # Polling clients keep the snapshot of their version alive.
+            cache.set((request.user.tenant_id, version), snapshot,
+                      config['ttl'])
+
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        else:
+            if previous is not None:
+                json_string = self._get_delta(previous, snapshot,
+                                              since, version)
+            response = HttpResponse(json_string, content_type='text/json')
+        response['ETag'] = etag
+        return response
+
+    def _serialize_nodes(self, data):
+        # Each node is serialized once, both to build the response and to
+        # be compared with the nodes of a previous snapshot.
+        encoder = LazyTranslationEncoder(ensure_ascii=False)
+        snapshot = collections.OrderedDict()
+        for name, keys in TOPOLOGY_NODE_KEYS.items():
+            nodes = snapshot[name] = collections.OrderedDict()
+            for node in data[name]:
+                key = tuple(node.get(k) for k in keys)
+                nodes[key] = encoder.encode(node)
+        return snapshot
+
+    def _join_collections(self, items):
+        return '{%s}' % ', '.join(
+            '%s: [%s]' % (json.dumps(name), ', '.join(nodes))
+            for name, nodes in items)
+
+    def _get_delta(self, previous, snapshot, since, version):
+        """Returns the nodes added, changed and removed since a snapshot.
+
+        Removed nodes are only described by the attributes identifying
+        them, see ``TOPOLOGY_NODE_KEYS``.
+        """
+        delta = []
+        for name, keys in TOPOLOGY_NODE_KEYS.items():
+            old_nodes = previous[name]
+            new_nodes = snapshot[name]
+            added = [node for key, node in new_nodes.items()
+                     if key not in old_nodes]
+            changed = [node for key, node in new_nodes.items()
+                       if key in old_nodes and old_nodes[key] != node]
+            removed = [json.dumps(dict(zip(keys, key)))
+                       for key in old_nodes if key not in new_nodes]
+            delta.append((name, '{%s}' % ', '.join(
+                '"%s": [%s]' % (kind, ', '.join(nodes))
+                for kind, nodes in (('added', added),
+                                    ('changed', changed),
+                                    ('removed', removed)))))
+        return '{"delta": true, "since": %s, "version": %s, %s}' % (
+            json.dumps(since), json.dumps(version),
+            ', '.join('%s: %s' % (json.dumps(name), nodes)
+                      for name, nodes in delta))
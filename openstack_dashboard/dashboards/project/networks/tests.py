@@ -101,14 +101,20 @@ def _str_host_routes(host_routes):
 class NetworkStubMixin(object):
     def _stub_net_list(self):
         all_networks = self.networks.list()
-        self.mock_network_list.side_effect = [
-            [network for network in all_networks
-             if network['tenant_id'] == self.tenant.id],
-            [network for network in all_networks
-             if network.get('shared')],
-            [network for network in all_networks
-             if network.get('router:external')],
-        ]
+
+        # network_list_for_tenant() runs the queries concurrently, so the
+        # networks are returned depending on the query.
+        def fake_network_list(request, **params):
+            if 'tenant_id' in params:
+                return [network for network in all_networks
+                        if network['tenant_id'] == self.tenant.id]
+            if params.get('router:external'):
+                return [network for network in all_networks
+                        if network.get('router:external')]
+            return [network for network in all_networks
+                    if network.get('shared')]
+
+        self.mock_network_list.side_effect = fake_network_list
 
     def _check_net_list(self):
         self.mock_network_list.assert_has_calls([
@@ -116,7 +122,7 @@ class NetworkStubMixin(object):
                       shared=False),
             mock.call(test.IsHttpRequest(), shared=True),
             mock.call(test.IsHttpRequest(), **{'router:external': True}),
-        ])
+        ], any_order=True)
 
     def _stub_is_extension_supported(self, features):
         self._features = features
@@ -174,9 +180,7 @@ class NetworkTests(test.TestCase, NetworkStubMixin):
         self.assertEqual(len(res.context['networks_table'].data), 0)
         self.assertMessageCount(res, error=1)
 
-        self.mock_network_list.assert_called_once_with(
-            test.IsHttpRequest(), tenant_id=self.tenant.id,
-            shared=False)
+        self._check_net_list()
         self.assert_mock_multiple_calls_with_same_arguments(
             self.mock_tenant_quota_usages, 2,
             mock.call(test.IsHttpRequest(), targets=('network', )))
@@ -82,31 +82,39 @@ class UsageViewTests(test.TestCase):
         self.mock_cinder_tenant_absolute_limits.assert_called_once_with(
             test.IsHttpRequest())
 
-    @test.create_mocks({api.neutron: ('security_group_list',
-                                      'tenant_floating_ip_list',
+    def _tenant_resource_count(self, request, quota_name, tenant_id=None):
+        return len({'floatingip': self.floating_ips,
+                    'security_group': self.security_groups}[quota_name])
+
+    def _check_tenant_resource_count(self, neutron_sg_enabled=True,
+                                     neutron_fip_enabled=True):
+        expected_calls = []
+        if neutron_fip_enabled:
+            expected_calls.append(mock.call(test.IsHttpRequest(),
+                                            'floatingip', self.tenant.id))
+        if neutron_sg_enabled:
+            expected_calls.append(mock.call(test.IsHttpRequest(),
+                                            'security_group', self.tenant.id))
+        self.mock_tenant_resource_count.assert_has_calls(expected_calls,
+                                                         any_order=True)
+        self.assertEqual(len(expected_calls),
+                         self.mock_tenant_resource_count.call_count)
+
+    @test.create_mocks({api.neutron: ('tenant_resource_count',
                                       'floating_ip_supported',
                                       'is_extension_supported')})
     def _stub_neutron_api_calls(self, neutron_sg_enabled=True):
         self.mock_is_extension_supported.return_value = neutron_sg_enabled
         self.mock_floating_ip_supported.return_value = True
-        self.mock_tenant_floating_ip_list.return_value = \
-            self.floating_ips.list()
-        if neutron_sg_enabled:
-            self.mock_security_group_list.return_value = \
-                self.security_groups.list()
+        self.mock_tenant_resource_count.side_effect = \
+            self._tenant_resource_count
 
     def _check_neutron_api_calls(self, neutron_sg_enabled=True):
         self.mock_is_extension_supported.assert_called_once_with(
             test.IsHttpRequest(), 'security-group')
         self.mock_floating_ip_supported.assert_called_once_with(
             test.IsHttpRequest())
-        self.mock_tenant_floating_ip_list.assert_called_once_with(
-            test.IsHttpRequest())
-        if neutron_sg_enabled:
-            self.mock_security_group_list.assert_called_once_with(
-                test.IsHttpRequest())
-        else:
-            self.mock_security_group_list.assert_not_called()
+        self._check_tenant_resource_count(neutron_sg_enabled)
 
     def _nova_stu_enabled(self, exception=False, overview_days_range=1):
         if exception:
@@ -286,8 +294,7 @@ class UsageViewTests(test.TestCase):
     @test.create_mocks({api.neutron: ('tenant_quota_get',
                                       'is_extension_supported',
                                       'floating_ip_supported',
-                                      'tenant_floating_ip_list',
-                                      'security_group_list')})
+                                      'tenant_resource_count')})
     def _test_usage_with_neutron(self,
                                  neutron_sg_enabled=True,
                                  neutron_fip_enabled=True):
@@ -296,12 +303,8 @@ class UsageViewTests(test.TestCase):
         self.mock_is_extension_supported.side_effect = [True,
                                                         neutron_sg_enabled]
         self.mock_floating_ip_supported.return_value = neutron_fip_enabled
-        if neutron_fip_enabled:
-            self.mock_tenant_floating_ip_list.return_value = \
-                self.floating_ips.list()
-        if neutron_sg_enabled:
-            self.mock_security_group_list.return_value = \
-                self.security_groups.list()
+        self.mock_tenant_resource_count.side_effect = \
+            self._tenant_resource_count
         self.mock_tenant_quota_get.return_value = self.neutron_quotas.first()
 
         self._test_usage_with_neutron_check(neutron_sg_enabled,
@@ -314,16 +317,8 @@ class UsageViewTests(test.TestCase):
         self.assertEqual(2, self.mock_is_extension_supported.call_count)
         self.mock_floating_ip_supported.assert_called_once_with(
             test.IsHttpRequest())
-        if neutron_fip_enabled:
-            self.mock_tenant_floating_ip_list.assert_called_once_with(
-                test.IsHttpRequest())
-        else:
-            self.mock_tenant_floating_ip_list.assert_not_called()
-        if neutron_sg_enabled:
-            self.mock_security_group_list.assert_called_once_with(
-                test.IsHttpRequest())
-        else:
-            self.mock_security_group_list.assert_not_called()
+        self._check_tenant_resource_count(neutron_sg_enabled,
+                                          neutron_fip_enabled)
         self.mock_tenant_quota_get.assert_called_once_with(
             test.IsHttpRequest(), self.tenant.id)
 
@@ -840,7 +840,7 @@ class RouterActionTests(test.TestCase):
                       tenant_id=router['tenant_id']),
             mock.call(test.IsHttpRequest(),
                       shared=True),
-        ])
+        ], any_order=True)
 
     @test.create_mocks({api.neutron: ('router_get',
                                       'router_add_interface',
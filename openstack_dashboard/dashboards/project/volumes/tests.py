@@ -15,6 +15,7 @@
 import copy
 
 import mock
+from novaclient import exceptions as nova_exceptions
 import six
 
 from django.conf import settings
@@ -28,6 +29,7 @@ from openstack_dashboard import api
 from openstack_dashboard.api import cinder
 from openstack_dashboard.dashboards.project.volumes \
     import tables as volume_tables
+from openstack_dashboard.dashboards.project.volumes import views
 from openstack_dashboard.test import helpers as test
 from openstack_dashboard.usage import quotas
 
@@ -37,9 +39,33 @@ INDEX_URL = reverse('horizon:project:volumes:index')
 SEARCH_OPTS = dict(status=api.cinder.VOLUME_STATE_AVAILABLE)
 
 
-class VolumeIndexViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
+class VolumeAttributesTestMixin(object):
+    def _check_volume_attributes_lookups(self, volumes, search_opts=None,
+                                         times=1):
+        server_ids = []
+        for volume in volumes:
+            for att in volume.attachments:
+                if att['server_id'] not in server_ids:
+                    server_ids.append(att['server_id'])
+        # The attachments column of the table calls server_get as well
+        # when the returned server does not match the attachment.
+        self.mock_server_get.assert_has_calls(
+            [mock.call(test.IsHttpRequest(), server_id)
+             for server_id in server_ids], any_order=True)
+        self.mock_volume_snapshot_list.assert_has_calls(
+            [mock.call(test.IsHttpRequest(),
+                       search_opts=dict(search_opts or {},
+                                        volume_id=volume.id),
+                       limit=1)
+             for volume in volumes], any_order=True)
+        self.assertEqual(times * len(volumes),
+                         self.mock_volume_snapshot_list.call_count)
+
+
+class VolumeIndexViewTests(VolumeAttributesTestMixin,
+                           test.ResetImageAPIVersionMixin, test.TestCase):
     @test.create_mocks({
-        api.nova: ['server_get', 'server_list'],
+        api.nova: ['server_get'],
         api.cinder: ['volume_backup_list_paged',
                      'volume_backup_supported',
                      'volume_snapshot_list',
@@ -59,20 +85,14 @@ class VolumeIndexViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
         self.mock_volume_list_paged.return_value = [volumes, False, False]
         if with_attachments:
             self.mock_server_get.return_value = server
-
-            self.mock_server_list.return_value = [self.servers.list(), False]
-            self.mock_volume_snapshot_list.return_value = vol_snaps
+        self.mock_volume_snapshot_list.return_value = vol_snaps
 
         self.mock_tenant_absolute_limits.return_value = \
             self.cinder_limits['absolute']
 
         res = self.client.get(INDEX_URL)
 
-        if with_attachments:
-            self.mock_server_list.assert_called_once_with(test.IsHttpRequest(),
-                                                          search_opts=None)
-            self.mock_volume_snapshot_list.assert_called_once()
-
+        self._check_volume_attributes_lookups(volumes)
         self.mock_volume_backup_supported.assert_called_with(
             test.IsHttpRequest())
         self.mock_volume_list_paged.assert_called_once_with(
@@ -89,8 +109,84 @@ class VolumeIndexViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
     def test_index_no_volume_attachments(self):
         self._test_index(False)
 
+    @test.create_mocks({
+        api.nova: ['server_get'],
+        api.cinder: ['volume_backup_supported',
+                     'volume_snapshot_list',
+                     'volume_list_paged',
+                     'tenant_absolute_limits'],
+    })
+    def test_index_attached_instance_not_found(self):
+        volumes = self.cinder_volumes.list()
+
+        self.mock_volume_backup_supported.return_value = False
+        self.mock_volume_list_paged.return_value = [volumes, False, False]
+        self.mock_server_get.side_effect = nova_exceptions.NotFound(404)
+        self.mock_volume_snapshot_list.side_effect = \
+            lambda request, search_opts, limit: [
+                snapshot for snapshot in self.cinder_volume_snapshots.list()
+                if snapshot.volume_id == search_opts['volume_id']]
+        self.mock_tenant_absolute_limits.return_value = \
+            self.cinder_limits['absolute']
+
+        res = self.client.get(INDEX_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn('Unable to retrieve volume/instance attachment '
+                         'information',
+                         [m.message for m in res.context['messages']])
+        snapshot_volume_ids = set(
+            snapshot.volume_id
+            for snapshot in self.cinder_volume_snapshots.list())
+        for volume in res.context['volumes_table'].data:
+            self.assertEqual(volume.id in snapshot_volume_ids,
+                             getattr(volume, 'has_snapshot', False))
+        self._check_volume_attributes_lookups(volumes)
+
+    @mock.patch.object(views.VolumeTableMixIn, 'max_snapshot_lookups', 1)
+    @mock.patch.object(views.VolumeTableMixIn, 'max_instance_lookups', 1)
     @test.create_mocks({
         api.nova: ['server_get', 'server_list'],
+        api.cinder: ['volume_backup_supported',
+                     'volume_snapshot_list',
+                     'volume_list_paged',
+                     'tenant_absolute_limits'],
+    })
+    def test_index_lists_project_instances_and_snapshots(self):
+        volumes = self.cinder_volumes.list()
+        servers = self.servers.list()
+        volumes[2].attachments[0]['server_id'] = servers[0].id
+        volumes[3].attachments[0]['server_id'] = servers[1].id
+
+        self.mock_volume_backup_supported.return_value = False
+        self.mock_volume_list_paged.return_value = [volumes, False, False]
+        self.mock_server_list.return_value = [servers, False]
+        self.mock_volume_snapshot_list.return_value = \
+            self.cinder_volume_snapshots.list()
+        self.mock_tenant_absolute_limits.return_value = \
+            self.cinder_limits['absolute']
+
+        res = self.client.get(INDEX_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.mock_server_list.assert_called_once_with(
+            test.IsHttpRequest(), search_opts={})
+        self.mock_server_get.assert_not_called()
+        self.mock_volume_snapshot_list.assert_called_once_with(
+            test.IsHttpRequest(), search_opts=None)
+        snapshot_volume_ids = set(
+            snapshot.volume_id
+            for snapshot in self.cinder_volume_snapshots.list())
+        for volume in res.context['volumes_table'].data:
+            self.assertEqual(volume.id in snapshot_volume_ids,
+                             getattr(volume, 'has_snapshot', False))
+        self.assertEqual(servers[0],
+                         volumes[2].attachments[0]['instance'])
+        self.assertEqual(servers[1],
+                         volumes[3].attachments[0]['instance'])
+
+    @test.create_mocks({
+        api.nova: ['server_get'],
         cinder: ['tenant_absolute_limits',
                  'volume_list_paged',
                  'volume_backup_supported',
@@ -106,7 +202,6 @@ class VolumeIndexViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
         self.mock_volume_list_paged.return_value = [volumes,
                                                     has_more, has_prev]
         self.mock_volume_snapshot_list.return_value = vol_snaps
-        self.mock_server_list.return_value = [self.servers.list(), False]
         self.mock_server_get.return_value = server
         self.mock_tenant_absolute_limits.return_value = \
             self.cinder_limits['absolute']
@@ -117,12 +212,9 @@ class VolumeIndexViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
         self.mock_volume_list_paged.assert_called_once_with(
             test.IsHttpRequest(), marker=marker, sort_dir=sort_dir,
             search_opts=None, paginate=True)
-        self.mock_volume_snapshot_list.assert_called_once_with(
-            test.IsHttpRequest(), search_opts=None)
+        self._check_volume_attributes_lookups(volumes)
         self.mock_tenant_absolute_limits.assert_called_with(
             test.IsHttpRequest())
-        self.mock_server_list.assert_called_once_with(test.IsHttpRequest(),
-                                                      search_opts=None)
         self.assertEqual(res.status_code, 200)
         self.assertTemplateUsed(res, 'horizon/common/_data_table_view.html')
 
@@ -195,7 +287,8 @@ class VolumeIndexViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
         self.assertItemsEqual(volumes, expected_volumes)
 
 
-class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
+class VolumeViewTests(VolumeAttributesTestMixin,
+                      test.ResetImageAPIVersionMixin, test.TestCase):
     def tearDown(self):
         for volume in self.cinder_volumes.list():
             # VolumeTableMixIn._set_volume_attributes mutates data
@@ -988,7 +1081,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
                                                          'AvailabilityZones')
 
     @test.create_mocks({
-        api.nova: ['server_list'],
+        api.nova: ['server_get'],
         cinder: ['volume_delete',
                  'volume_snapshot_list',
                  'volume_list_paged',
@@ -1002,7 +1095,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
 
         self.mock_volume_list_paged.return_value = [volumes, False, False]
         self.mock_volume_snapshot_list.return_value = []
-        self.mock_server_list.return_value = [self.servers.list(), False]
+        self.mock_server_get.return_value = self.servers.first()
         self.mock_volume_list_paged.return_value = [volumes, False, False]
         self.mock_tenant_absolute_limits.return_value = \
             self.cinder_limits['absolute']
@@ -1017,11 +1110,9 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
             test.IsHttpRequest(), marker=None,
             paginate=True, sort_dir='desc',
             search_opts=None)
-        self.assertEqual(2, self.mock_volume_snapshot_list.call_count)
+        self._check_volume_attributes_lookups(volumes, times=2)
         self.mock_volume_delete.assert_called_once_with(test.IsHttpRequest(),
                                                         volume.id)
-        self.mock_server_list.assert_called_with(test.IsHttpRequest(),
-                                                 search_opts=None)
         self.assertEqual(7, self.mock_tenant_absolute_limits.call_count)
 
     @mock.patch.object(cinder, 'tenant_absolute_limits')
@@ -1214,7 +1305,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
         mock_limits.assert_called_once()
 
     @test.create_mocks({
-        api.nova: ['server_list'],
+        api.nova: ['server_get'],
         cinder: ['volume_backup_supported',
                  'volume_snapshot_list',
                  'volume_list_paged',
@@ -1229,7 +1320,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
         self.mock_volume_backup_supported.return_value = True
         self.mock_volume_list_paged.return_value = [volumes, False, False]
         self.mock_volume_snapshot_list.return_value = []
-        self.mock_server_list.return_value = [self.servers.list(), False]
+        self.mock_server_get.return_value = self.servers.first()
         self.mock_tenant_absolute_limits.return_value = limits
 
         res = self.client.get(INDEX_URL)
@@ -1252,14 +1343,11 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
         self.mock_volume_list_paged.assert_called_once_with(
             test.IsHttpRequest(), sort_dir='desc', marker=None,
             paginate=True, search_opts=None)
-        self.mock_volume_snapshot_list.assert_called_once_with(
-            test.IsHttpRequest(), search_opts=None)
-        self.mock_server_list.assert_called_once_with(test.IsHttpRequest(),
-                                                      search_opts=None)
+        self._check_volume_attributes_lookups(self.cinder_volumes.list())
         self.assertEqual(8, self.mock_tenant_absolute_limits.call_count)
 
     @test.create_mocks({
-        api.nova: ['server_list'],
+        api.nova: ['server_get'],
         cinder: ['volume_backup_supported',
                  'volume_snapshot_list',
                  'volume_list_paged',
@@ -1273,7 +1361,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
         self.mock_volume_backup_supported.return_value = True
         self.mock_volume_list_paged.return_value = [volumes, False, False]
         self.mock_volume_snapshot_list.return_value = []
-        self.mock_server_list.return_value = [self.servers.list(), False]
+        self.mock_server_get.return_value = self.servers.first()
         self.mock_tenant_absolute_limits.return_value = limits
 
         res = self.client.get(INDEX_URL)
@@ -1290,8 +1378,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
             test.IsHttpRequest(), marker=None,
             paginate=True, sort_dir='desc',
             search_opts=None)
-        self.mock_server_list.assert_called_once_with(test.IsHttpRequest(),
-                                                      search_opts=None)
+        self._check_volume_attributes_lookups(volumes)
         self.assertEqual(8, self.mock_tenant_absolute_limits.call_count)
 
     @test.create_mocks({
@@ -1706,7 +1793,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
         self._test_encryption(True)
 
     @test.create_mocks({
-        api.nova: ['server_list'],
+        api.nova: ['server_get'],
         cinder: ['volume_backup_supported',
                  'volume_list_paged',
                  'volume_snapshot_list',
@@ -1723,7 +1810,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
                                                     False, False]
         self.mock_volume_snapshot_list.return_value = \
             self.cinder_volume_snapshots.list()
-        self.mock_server_list.return_value = [self.servers.list(), False]
+        self.mock_server_get.return_value = self.servers.first()
         self.mock_tenant_absolute_limits.return_value = limits
 
         res = self.client.get(INDEX_URL)
@@ -1739,8 +1826,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
             test.IsHttpRequest(), marker=None,
             sort_dir='desc', search_opts=None,
             paginate=True)
-        self.mock_volume_snapshot_list.assert_called_once_with(
-            test.IsHttpRequest(), search_opts=None)
+        self._check_volume_attributes_lookups(volumes)
         self.assertEqual(10, self.mock_tenant_absolute_limits.call_count)
 
     @mock.patch.object(quotas, 'tenant_limit_usages')
@@ -1770,7 +1856,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
         self.assertEqual(2, mock_quotas.call_count)
 
     @test.create_mocks({
-        api.nova: ['server_list'],
+        api.nova: ['server_get'],
         cinder: ['volume_backup_supported',
                  'volume_list_paged',
                  'volume_snapshot_list',
@@ -1783,7 +1869,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
         self.mock_volume_list_paged.return_value = [self.volumes.list(),
                                                     False, False]
         self.mock_volume_snapshot_list.return_value = []
-        self.mock_server_list.return_value = [self.servers.list(), False]
+        self.mock_server_get.return_value = self.servers.first()
         self.mock_tenant_absolute_limits.return_value = limits
 
         res = self.client.get(INDEX_URL)
@@ -1801,10 +1887,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
             test.IsHttpRequest(), marker=None,
             sort_dir='desc', search_opts=None,
             paginate=True)
-        self.mock_volume_snapshot_list.assert_called_once_with(
-            test.IsHttpRequest(), search_opts=None)
-        self.mock_server_list.assert_called_once_with(test.IsHttpRequest(),
-                                                      search_opts=None)
+        self._check_volume_attributes_lookups(self.volumes.list())
         self.assertEqual(10, self.mock_tenant_absolute_limits.call_count)
 
     @mock.patch.object(cinder, 'transfer_get')
@@ -1832,7 +1915,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
                                                   transfer.id)
 
     @test.create_mocks({
-        api.nova: ['server_list'],
+        api.nova: ['server_get'],
         cinder: ['volume_backup_supported',
                  'volume_list_paged',
                  'volume_snapshot_list',
@@ -1856,7 +1939,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
         self.mock_volume_backup_supported.return_value = False
         self.mock_volume_list_paged.return_value = [volumes, False, False]
         self.mock_volume_snapshot_list.return_value = []
-        self.mock_server_list.return_value = [self.servers.list(), False]
+        self.mock_server_get.return_value = self.servers.first()
         self.mock_tenant_absolute_limits.return_value = \
             self.cinder_limits['absolute']
 
@@ -1871,12 +1954,9 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
             test.IsHttpRequest(), marker=None,
             search_opts=None, sort_dir='desc',
             paginate=True)
-        self.mock_volume_snapshot_list.assert_called_once_with(
-            test.IsHttpRequest(), search_opts=None)
+        self._check_volume_attributes_lookups(volumes)
         self.mock_transfer_delete.assert_called_once_with(test.IsHttpRequest(),
                                                           transfer.id)
-        self.mock_server_list.assert_called_once_with(test.IsHttpRequest(),
-                                                      search_opts=None)
         self.assertEqual(7, self.mock_tenant_absolute_limits.call_count)
 
     @test.create_mocks({
@@ -1924,7 +2004,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
                                               transfer.id)
 
     @test.create_mocks({
-        api.nova: ['server_list'],
+        api.nova: ['server_get'],
         cinder: ['volume_backup_supported',
                  'volume_list_paged',
                  'volume_snapshot_list',
@@ -1938,7 +2018,7 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
         self.mock_volume_list_paged.return_value = [self.volumes.list(),
                                                     False, False]
         self.mock_volume_snapshot_list.return_value = []
-        self.mock_server_list.return_value = [self.servers.list(), False]
+        self.mock_server_get.return_value = self.servers.first()
         self.mock_tenant_absolute_limits.return_value = limits
 
         res = self.client.get(INDEX_URL)
@@ -1956,8 +2036,5 @@ class VolumeViewTests(test.ResetImageAPIVersionMixin, test.TestCase):
             test.IsHttpRequest(), marker=None,
             sort_dir='desc', search_opts=None,
             paginate=True)
-        self.mock_volume_snapshot_list.assert_called_once_with(
-            test.IsHttpRequest(), search_opts=None)
-        self.mock_server_list.assert_called_once_with(test.IsHttpRequest(),
-                                                      search_opts=None)
+        self._check_volume_attributes_lookups(self.volumes.list())
         self.assertEqual(8, self.mock_volume_backup_supported.call_count)
@@ -41,6 +41,7 @@ from openstack_dashboard.api import nova
 from openstack_dashboard import exceptions as dashboard_exception
 from openstack_dashboard.usage import quotas
 from openstack_dashboard.utils import filters
+from openstack_dashboard.utils import futurist_utils
 
 from openstack_dashboard.dashboards.project.volumes \
     import forms as volume_forms
@@ -53,6 +54,11 @@ from openstack_dashboard.dashboards.project.volumes \
 class VolumeTableMixIn(object):
     _has_more_data = False
     _has_prev_data = False
+    # Nova and Cinder cannot filter their listings by several ids. Above
+    # these numbers of attached instances or volumes, a single listing of
+    # the project is cheaper than one call per instance or volume.
+    max_instance_lookups = 5
+    max_snapshot_lookups = 5
 
     def _get_volumes(self, search_opts=None):
         try:
@@ -71,34 +77,104 @@ class VolumeTableMixIn(object):
                               _('Unable to retrieve volume list.'))
             return []
 
-    def _get_instances(self, search_opts=None, instance_ids=None):
-        if not instance_ids:
-            return []
+    def _get_instance(self, instance_id):
+        try:
+            return nova.server_get(self.request, instance_id)
+        except dashboard_exception.NOT_FOUND:
+            # The instance has been deleted since the volume was listed or
+            # belongs to another project, there is nothing to show for it.
+            return None
+        except Exception:
+            exceptions.handle(self.request,
+                              _("Unable to retrieve volume/instance "
+                                "attachment information"))
+            return None
+
+    def _get_instances(self, instance_ids, search_opts=None):
         try:
-            # TODO(tsufiev): we should pass attached_instance_ids to
-            # nova.server_list as soon as Nova API allows for this
-            instances, has_more = nova.server_list(self.request,
-                                                   search_opts=search_opts)
-            return instances
+            # server_list() adds the project to the search options.
+            instances, has_more = nova.server_list(
+                self.request, search_opts=dict(search_opts or {}))
         except Exception:
             exceptions.handle(self.request,
                               _("Unable to retrieve volume/instance "
                                 "attachment information"))
             return []
+        instance_ids = set(instance_ids)
+        return [instance for instance in instances
+                if instance.id in instance_ids]
 
-    def _get_volumes_ids_with_snapshots(self, search_opts=None):
+    def _volume_has_snapshots(self, volume_id, search_opts=None):
+        search_opts = dict(search_opts or {}, volume_id=volume_id)
         try:
-            volume_ids = []
-            snapshots = cinder.volume_snapshot_list(
-                self.request, search_opts=search_opts)
-            if snapshots:
-                # extract out the volume ids
-                volume_ids = set([(s.volume_id) for s in snapshots])
+            # A single snapshot is enough to know whether there is any.
+            return bool(cinder.volume_snapshot_list(self.request,
+                                                    search_opts=search_opts,
+                                                    limit=1))
         except Exception:
             exceptions.handle(self.request,
                               _("Unable to retrieve snapshot list."))
+            return False
 
-        return volume_ids
+    def _get_volume_ids_with_snapshots(self, search_opts=None):
+        try:
+            snapshots = cinder.volume_snapshot_list(self.request,
+                                                    search_opts=search_opts)
+        except Exception:
+            exceptions.handle(self.request,
+                              _("Unable to retrieve snapshot list."))
+            return set()
+        return set(snapshot.volume_id for snapshot in snapshots)
+
+    def _get_instances_and_snapshots(self, volumes, search_opts=None):
+        """Looks up the attached instances and snapshots of the volumes.
+
+        Up to ``max_instance_lookups`` attached instances are retrieved one
+        by one, and the snapshots of up to ``max_snapshot_lookups`` volumes
+        are queried per volume, so that the cost of the lookups of a small
+        page does not depend on the size of the project. Above these
+        numbers, the instances or the snapshots of the project are listed
+        once instead. All the lookups run concurrently.
+
+        :returns: a tuple of the attached instances and the set of ids of
+            the volumes having snapshots.
+        """
+        instance_ids = list(OrderedDict.fromkeys(
+            self._get_attached_instance_ids(volumes)))
+        volume_ids = [volume.id for volume in volumes]
+        list_instances = len(instance_ids) > self.max_instance_lookups
+        list_snapshots = len(volume_ids) > self.max_snapshot_lookups
+        if list_instances:
+            instance_calls = [(self._get_instances, [instance_ids],
+                               {'search_opts': search_opts})]
+        else:
+            instance_calls = [(self._get_instance, [instance_id])
+                              for instance_id in instance_ids]
+        if list_snapshots:
+            snapshot_calls = [(self._get_volume_ids_with_snapshots, [],
+                               {'search_opts': search_opts})]
+        else:
+            snapshot_calls = [(self._volume_has_snapshots, [volume_id],
+                               {'search_opts': search_opts})
+                              for volume_id in volume_ids]
+        results = futurist_utils.call_functions_parallel(
+            *(instance_calls + snapshot_calls))
+        instance_results = results[:len(instance_calls)]
+        snapshot_results = results[len(instance_calls):]
+
+        if list_instances:
+            instances = instance_results[0]
+        else:
+            instances = [instance for instance in instance_results
+                         if instance is not None]
+        if list_snapshots:
+            volume_ids_with_snapshots = snapshot_results[0]
+        else:
+            volume_ids_with_snapshots = set(
+                volume_id for volume_id, has_snapshots
+                in zip(volume_ids, snapshot_results)
+                if has_snapshots)
+        return instances, volume_ids_with_snapshots
 
     def _get_attached_instance_ids(self, volumes):
         attached_instance_ids = []
@@ -132,9 +208,8 @@ class VolumesView(tables.PagedTableMixin, VolumeTableMixIn,
 
     def get_data(self):
         volumes = self._get_volumes()
-        attached_instance_ids = self._get_attached_instance_ids(volumes)
-        instances = self._get_instances(instance_ids=attached_instance_ids)
-        volume_ids_with_snapshots = self._get_volumes_ids_with_snapshots()
+        instances, volume_ids_with_snapshots = \
+            self._get_instances_and_snapshots(volumes)
         self._set_volume_attributes(
             volumes, instances, volume_ids_with_snapshots)
         return volumes
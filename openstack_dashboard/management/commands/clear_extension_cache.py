@@ -0,0 +1,45 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from horizon.utils import memoized
+from openstack_dashboard.api import base
+
+
+class Command(BaseCommand):
+    help = ('Forget the cached extensions of the Nova, Neutron and Cinder '
+            'endpoints so that they are discovered again')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--service',
+                            help=("The service of the endpoint, e.g. "
+                                  "'neutron'. Requires --url."))
+        parser.add_argument('--url',
+                            help=("The URL of the endpoint. "
+                                  "Requires --service."))
+
+    def handle(self, *args, **options):
+        service = options['service']
+        url = options['url']
+        if bool(service) != bool(url):
+            raise CommandError('--service and --url must be given together.')
+        config = memoized._get_shared_cache_config()
+        if config['enabled'] and config['backend'] == 'local':
+            # The cache lives in the memory of each web server process.
+            raise CommandError(
+                "The extensions are cached in the memory of each web server "
+                "process (MEMOIZED_CACHE backend 'local'). Restart the web "
+                "server or wait for EXTENSION_CACHE_TTL to expire instead.")
+        base.invalidate_extension_cache(service, url)
+        self.stdout.write('The cached extensions have been cleared.')
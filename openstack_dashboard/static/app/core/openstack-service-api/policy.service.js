@@ -41,6 +41,7 @@
 
     var service = {
       check: memoize(check, memoizeHasher),
+      checkBatch: checkBatch,
       ifAllowed: memoize(ifAllowed, memoizeHasher)
     };
 
@@ -106,6 +107,38 @@
       return deferred.promise;
     }
 
+    /**
+     * @name checkBatch
+     * @param {Object} policyChecks
+     * @description
+     * Check several policy rule lists in a single request. The parameter maps
+     * a name to an object with the same structure as the parameter of check:
+     *
+     *   {
+     *     "checks": {
+     *       "stop": {
+     *         "rules": [ [ "compute", "os_compute_api:servers:stop" ] ],
+     *         "target": { "project_id": "1" }
+     *       },
+     *       "index": {
+     *         "rules": [ [ "compute", "os_compute_api:servers:index" ] ]
+     *       }
+     *     }
+     *   }
+     *
+     * The response maps each name to the result of its check:
+     *   {
+     *     "allowed": { "stop": true, "index": false }
+     *   }
+     * @returns {Object} The result of the API call
+     */
+    function checkBatch(policyChecks) {
+      return apiService.post('/api/policy/batch/', policyChecks)
+        .error(function() {
+          toastService.add('warning', gettext('Policy check failed.'));
+        });
+    }
+
     /**
      * @name ifAllowed
      * @param {Object} policyRules
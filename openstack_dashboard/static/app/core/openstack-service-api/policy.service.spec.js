@@ -51,6 +51,17 @@
           "rules"
         ],
         "messageType": "warning"
+      },
+      {
+        "func": "checkBatch",
+        "method": "post",
+        "path": "/api/policy/batch/",
+        "data": "checks",
+        "error": "Policy check failed.",
+        "testInput": [
+          "checks"
+        ],
+        "messageType": "warning"
       }
     ];
 
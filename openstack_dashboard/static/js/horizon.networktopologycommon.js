@@ -39,21 +39,83 @@ horizon.networktopologyloader = {
     self.update();
   },
 
+  // version of the topology in 'model', as returned by the server
+  version: null,
+  // attributes identifying the nodes of each collection of the 'model'
+  node_keys: {
+    servers: ['id'],
+    networks: ['id'],
+    ports: ['id', 'device_id'],
+    routers: ['id']
+  },
+
   /**
    * makes the data reqeuest and populates the 'model'
+   *
+   * Once the topology is loaded, only the changes since the loaded version
+   * are requested, and nothing is returned when there are none.
    */
   update:function() {
     var self = this;
-    angular.element.getJSON(
-      angular.element('#networktopology').data('networktopology') + '?' + angular.element.now(),
-      function(data) {
-        self.model = data;
-        $('#networktopology').trigger('change');
+    var params = {};
+    var headers = {};
+    if (self.model && self.version) {
+      params.since = self.version;
+      headers['If-None-Match'] = '"' + self.version + '"';
+    }
+    angular.element.ajax({
+      url: angular.element('#networktopology').data('networktopology'),
+      data: params,
+      headers: headers,
+      dataType: 'json',
+      cache: false,
+      success: function(data, textStatus, jqXHR) {
+        if (jqXHR.status !== 304) {
+          var etag = jqXHR.getResponseHeader('ETag');
+          self.version = etag ? etag.replace(/^W\//, '').replace(/"/g, '') : null;
+          self.model = data.delta ? self.apply_delta(self.model, data) : data;
+          $('#networktopology').trigger('change');
+        }
+        clearTimeout(self.update_timer);
         self.update_timer = setTimeout(function(){
           self.update();
         }, self.reload_duration);
       }
-    );
+    });
+  },
+
+  /**
+   * returns the model updated with the nodes added, changed and removed
+   */
+  apply_delta:function(model, delta) {
+    var self = this;
+    var matches = function(keys, node, other) {
+      return keys.every(function(key) {
+        return node[key] === other[key];
+      });
+    };
+    angular.forEach(self.node_keys, function(keys, name) {
+      var changes = delta[name];
+      var nodes = model[name].filter(function(node) {
+        return !changes.removed.some(function(removed) {
+          return matches(keys, node, removed);
+        });
+      });
+      nodes = nodes.map(function(node) {
+        var changed = changes.changed.filter(function(other) {
+          return matches(keys, node, other);
+        });
+        return changed.length ? changed[0] : node;
+      });
+      model[name] = nodes.concat(changes.added);
+    });
+    // external networks are listed first
+    model.networks = model.networks.filter(function(network) {
+      return network['router:external'];
+    }).concat(model.networks.filter(function(network) {
+      return !network['router:external'];
+    }));
+    return model;
   },
 
   /**
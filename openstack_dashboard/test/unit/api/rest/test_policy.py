@@ -70,6 +70,32 @@ class PolicyRestTestCase(test.TestCase):
             {"rules": [["compute", "non-existing"]]})
         self._test_policy(body, expected=True)
 
+    @override_settings(POLICY_CHECK_FUNCTION='openstack_auth.policy.check')
+    def test_policy_batch(self):
+        body = json.dumps({"checks": {
+            "index": {"rules": [["compute",
+                                 "os_compute_api:servers:index"]]},
+            "stop": {"rules": [["compute", "os_compute_api:servers:stop"],
+                               ["compute", "os_compute_api:servers:start"]],
+                     "target": {"project_id": "1"}},
+            "all_tenants": {"rules": [
+                ["compute", "os_compute_api:servers:index:get_all_tenants"]]},
+        }})
+        request = self.mock_rest_request(body=body)
+        response = policy.PolicyBatch().post(request)
+        self.assertStatusCode(response, 200)
+        self.assertEqual({"allowed": {"index": True,
+                                      "stop": True,
+                                      "all_tenants": False}},
+                         response.json)
+
+    @override_settings(POLICY_CHECK_FUNCTION='openstack_auth.policy.check')
+    def test_policy_batch_error(self):
+        request = self.mock_rest_request(
+            body=json.dumps({"checks": {"index": ["compute"]}}))
+        response = policy.PolicyBatch().post(request)
+        self.assertStatusCode(response, 400)
+
     @override_settings(POLICY_CHECK_FUNCTION='openstack_auth.policy.check')
     def test_policy_error(self):
         request = self.mock_rest_request(
@@ -18,7 +18,11 @@
 
 from __future__ import absolute_import
 
+import gc
+import weakref
+
 from django.conf import settings
+import mock
 
 from horizon import exceptions
 
@@ -346,3 +350,57 @@ class QuotaSetTests(test.TestCase):
     def test_quotaset_add_with_wrong_type(self):
         quota_set = api_base.QuotaSet({'foo': 1, 'bar': 10})
         self.assertRaises(ValueError, quota_set.add, {'test': 7})
+
+
+@test.update_settings(MEMOIZED_CACHE={'enabled': True})
+class ExtensionCacheTests(test.TestCase):
+
+    def test_get_extensions_cached_by_endpoint(self):
+        discover = mock.Mock(return_value={'quotas': {'alias': 'quotas'}})
+        other_discover = mock.Mock(return_value={})
+
+        self.assertIn('quotas', api_base.get_extensions(
+            'neutron', 'http://neutron', discover, 'client'))
+        # Another user of the same endpoint doesn't discover them again.
+        self.assertIn('quotas', api_base.get_extensions(
+            'neutron', 'http://neutron', other_discover, 'other_client'))
+        discover.assert_called_once_with('client')
+        self.assertFalse(other_discover.called)
+
+        self.assertEqual({}, api_base.get_extensions(
+            'nova', 'http://neutron', other_discover, 'other_client'))
+        other_discover.assert_called_once_with('other_client')
+
+    def test_invalidate_extension_cache(self):
+        discover = mock.Mock(return_value={})
+
+        def get_extensions(service):
+            return api_base.get_extensions(service, 'http://%s' % service,
+                                           discover)
+
+        get_extensions('nova')
+        get_extensions('neutron')
+        self.assertEqual(2, discover.call_count)
+
+        api_base.invalidate_extension_cache('nova', 'http://nova')
+        get_extensions('nova')
+        get_extensions('neutron')
+        self.assertEqual(3, discover.call_count)
+
+        api_base.invalidate_extension_cache()
+        get_extensions('nova')
+        get_extensions('neutron')
+        self.assertEqual(5, discover.call_count)
+
+    def test_get_extensions_does_not_keep_client(self):
+        class Client(object):
+            pass
+
+        client = Client()
+        client_ref = weakref.ref(client)
+        self.assertIn('quotas', api_base.get_extensions(
+            'nova', 'http://nova', lambda client: {'quotas': {}}, client))
+        del client
+        gc.collect()
+        # The cache must not keep the client of the first user.
+        self.assertIsNone(client_ref())
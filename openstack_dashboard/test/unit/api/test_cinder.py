@@ -16,6 +16,7 @@ from django.conf import settings
 from django.test.utils import override_settings
 
 import cinderclient as cinder_client
+import mock
 
 from openstack_dashboard import api
 from openstack_dashboard.test import helpers as test
@@ -252,6 +253,20 @@ class CinderApiTests(test.APIMockTestCase):
         api.cinder.volume_snapshot_list(self.request, search_opts=search_opts)
         snapshots_mock.assert_called_once_with(search_opts=search_opts)
 
+    def test_volume_snapshot_list_with_limit(self):
+        search_opts = {'volume_id': 'volume'}
+        cinderclient = self.stub_cinderclient()
+
+        snapshots_mock = cinderclient.volume_snapshots.list
+        snapshots_mock.return_value = self.cinder_volume_snapshots.list()[:1]
+
+        snapshots = api.cinder.volume_snapshot_list(
+            self.request, search_opts=search_opts, limit=1)
+
+        self.assertEqual(1, len(snapshots))
+        snapshots_mock.assert_called_once_with(search_opts=search_opts,
+                                               limit=1)
+
     def test_volume_snapshot_list_no_volume_configured(self):
         # remove volume from service catalog
         catalog = self.service_catalog
@@ -327,6 +342,42 @@ class CinderApiTests(test.APIMockTestCase):
         qos_associations_mock.assert_called_once_with(qos_specs_only_one[0].id)
         self.assertEqual(associate_spec, qos_specs_only_one[0].name)
 
+    @test.update_settings(MEMOIZED_CACHE={'enabled': True})
+    def test_volume_type_qos_associations_cached(self):
+        volume_types = self.cinder_volume_types.list()[:2]
+        qos_specs = self.cinder_qos_specs.list()[:2]
+        associations = {qos_specs[0].id: [volume_types[0]],
+                        qos_specs[1].id: [volume_types[1]]}
+
+        cinderclient = self.stub_cinderclient()
+        cinderclient.volume_types.list.return_value = volume_types
+        cinderclient.volume_types.get.return_value = volume_types[1]
+        cinderclient.qos_specs.list.return_value = qos_specs
+        qos_associations_mock = cinderclient.qos_specs.get_associations
+        qos_associations_mock.side_effect = associations.get
+
+        vol_types = api.cinder.volume_type_list_with_qos_associations(
+            self.request)
+        vol_type = api.cinder.volume_type_get_with_qos_association(
+            self.request, volume_types[1].id)
+
+        self.assertEqual([qos_specs[0].name, qos_specs[1].name],
+                         [t.associated_qos_spec for t in vol_types])
+        self.assertEqual(qos_specs[1].name, vol_type.associated_qos_spec)
+        cinderclient.qos_specs.list.assert_called_once_with()
+        self.assertEqual(2, qos_associations_mock.call_count)
+
+        api.cinder.qos_spec_disassociate(self.request, qos_specs[1],
+                                         volume_types[1].id)
+        associations[qos_specs[1].id] = []
+        vol_type = api.cinder.volume_type_get_with_qos_association(
+            self.request, volume_types[1].id)
+
+        self.assertEqual("", vol_type.associated_qos_spec)
+        self.assertEqual(4, qos_associations_mock.call_count)
+        cinderclient.qos_specs.disassociate.assert_called_once_with(
+            qos_specs[1], volume_types[1].id)
+
     def test_absolute_limits_with_negative_values(self):
         values = {"maxTotalVolumes": -1, "totalVolumesUsed": -1}
         expected_results = {"maxTotalVolumes": float("inf"),
@@ -374,6 +425,18 @@ class CinderApiTests(test.APIMockTestCase):
         self.assertEqual(default_volume_type, volume_type)
         cinderclient.volume_types.default.assert_called_once()
 
+    @mock.patch.object(api.base, 'invalidate_quota_usages')
+    def test_transfer_accept(self, mock_invalidate):
+        cinderclient = self.stub_cinderclient()
+
+        api.cinder.transfer_accept(self.request, 'transfer', 'key')
+
+        cinderclient.transfers.accept.assert_called_once_with('transfer',
+                                                              'key')
+        # The accepted volume counts against the quotas of the project.
+        mock_invalidate.assert_called_once_with(
+            self.request.user.project_id, self.request.user.services_region)
+
     def test_cgroup_list(self):
         cgroups = self.cinder_consistencygroups.list()
         cinderclient = self.stub_cinderclient()
@@ -16,6 +16,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
+
 from django.conf import settings
 from django.test.utils import override_settings
 import mock
@@ -311,6 +313,45 @@ class GlanceApiTests(test.APIMockTestCase):
         self.assertEqual(1, len(defs))
         self.assertEqual('namespace_4', defs[0].namespace)
 
+    @test.update_settings(MEMOIZED_CACHE={'enabled': True})
+    def test_metadefs_namespace_full_list(self):
+        metadata_defs = self.metadata_defs.list()
+        limit = getattr(settings, 'API_RESULT_LIMIT', 1000)
+        resource_type = 'OS::Nova::Flavor'
+
+        glanceclient = self.stub_glanceclient()
+        mock_metadefs_list = glanceclient.metadefs_namespace.list
+        mock_metadefs_list.return_value = metadata_defs
+        mock_metadefs_get = glanceclient.metadefs_namespace.get
+        mock_metadefs_get.side_effect = (
+            lambda namespace, resource_type: {'namespace': namespace,
+                                              'resource_type': resource_type})
+
+        # The namespaces are cached across requests.
+        for request in (self.request, copy.copy(self.request)):
+            defs, more, prev = api.glance.metadefs_namespace_full_list(
+                request, resource_type)
+
+        self.assertEqual([{'namespace': d.namespace,
+                           'resource_type': resource_type}
+                          for d in metadata_defs], defs)
+        self.assertFalse(more)
+        self.assertFalse(prev)
+        mock_metadefs_list.assert_called_once_with(
+            page_size=limit, limit=limit,
+            filters={'resource_types': [resource_type]},
+            sort_dir='asc', sort_key='namespace')
+        self.assertEqual(len(metadata_defs), mock_metadefs_get.call_count)
+
+        api.glance.metadefs_namespace_update(
+            self.request, metadata_defs[0].namespace, description='new')
+        api.glance.metadefs_namespace_full_list(copy.copy(self.request),
+                                                resource_type)
+
+        self.assertEqual(2, mock_metadefs_list.call_count)
+        self.assertEqual(2 * len(metadata_defs),
+                         mock_metadefs_get.call_count)
+
     @mock.patch.object(api.glance, 'get_version', return_value=1)
     def test_metadefs_namespace_list_v1(self, mock_version):
         defs, more, prev = api.glance.metadefs_namespace_list(self.request)
@@ -10,11 +10,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import gc
 import unittest
+import weakref
 
 import mock
 
 from openstack_dashboard.api import microversions
+from openstack_dashboard.test import helpers as test
 
 
 class _VersionWrapper(object):
@@ -106,3 +109,45 @@ class MicroversionsTests(unittest.TestCase):
     def test_get_microversion_undefined_service(self):
         ret = self._test_get_microversion('2.1', '2.5', service='notfound')
         self.assertIsNone(ret)
+
+
+class VersionCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        super(VersionCacheTests, self).setUp()
+        microversions.get_server_version_range.cache_clear()
+
+    @test.update_settings(MEMOIZED_CACHE={'enabled': True})
+    def test_get_server_version_range_cached_by_endpoint(self):
+        discover = mock.Mock(return_value=('2.1', '2.60'))
+        other_discover = mock.Mock(return_value=('2.1', '2.53'))
+
+        self.assertEqual(('2.1', '2.60'),
+                         microversions.get_server_version_range(
+                             'nova', 'http://nova', discover, 'client'))
+        # Another user of the same endpoint doesn't discover it again.
+        self.assertEqual(('2.1', '2.60'),
+                         microversions.get_server_version_range(
+                             'nova', 'http://nova', other_discover))
+        discover.assert_called_once_with('client')
+        self.assertFalse(other_discover.called)
+
+        self.assertEqual(('2.1', '2.53'),
+                         microversions.get_server_version_range(
+                             'nova', 'http://nova2', other_discover))
+        other_discover.assert_called_once_with()
+
+    def test_get_server_version_range_does_not_keep_client(self):
+        class Client(object):
+            pass
+
+        client = Client()
+        client_ref = weakref.ref(client)
+        self.assertEqual(('2.1', '2.60'),
+                         microversions.get_server_version_range(
+                             'nova', 'http://nova',
+                             lambda client: ('2.1', '2.60'), client))
+        del client
+        gc.collect()
+        # The cache must not keep the client of the first user.
+        self.assertIsNone(client_ref())
@@ -13,6 +13,7 @@
 #    under the License.
 
 import collections
+import copy
 
 import mock
 import netaddr
@@ -77,7 +78,11 @@ class NetworkApiNeutronTests(test.APIMockTestCase):
         server_network_ids = [p['network_id'] for p in server_ports]
         server_networks = [net for net in self.api_networks.list()
                            if net['id'] in server_network_ids]
+        server_subnet_ids = [subnet_id for net in server_networks
+                             for subnet_id in net['subnets']]
 
+        self.qclient.list_extensions.return_value = {
+            'extensions': self.api_extensions.list()}
         list_ports_retvals = [{'ports': server_ports}]
         self.qclient.list_ports.side_effect = list_ports_retvals
         if router_enabled:
@@ -132,7 +137,8 @@ class NetworkApiNeutronTests(test.APIMockTestCase):
         self.qclient.list_ports.assert_has_calls(expected_list_ports)
         self.qclient.list_networks.assert_called_once_with(
             id=frozenset(server_network_ids))
-        self.qclient.list_subnets.assert_called_once_with()
+        self.qclient.list_subnets.assert_called_once_with(
+            id=tuple(server_subnet_ids))
 
     @override_settings(OPENSTACK_NEUTRON_NETWORK={'enable_router': True})
     def test_servers_update_addresses(self):
@@ -141,3 +147,89 @@ class NetworkApiNeutronTests(test.APIMockTestCase):
     @override_settings(OPENSTACK_NEUTRON_NETWORK={'enable_router': False})
     def test_servers_update_addresses_router_disabled(self):
         self._test_servers_update_addresses(router_enabled=False)
+
+    @override_settings(OPENSTACK_NEUTRON_NETWORK={'enable_router': False})
+    def test_servers_update_addresses_incremental(self):
+        api.neutron._get_server_address_cache().clear()
+        extensions = self.api_extensions.list() + [
+            {'alias': 'standard-attr-timestamp'}]
+        self.qclient.list_extensions.return_value = {'extensions': extensions}
+        servers = self.servers.list()
+        server_ids = tuple([server.id for server in servers])
+        server_ports = [p for p in self.api_ports.list()
+                        if p['device_id'] in server_ids]
+        changed_ports = [p for p in server_ports
+                         if p['device_id'] == servers[0].id]
+        self.qclient.list_ports.side_effect = [
+            {'ports': server_ports},
+            # Nothing changed since the first refresh.
+            {'ports': []},
+            {'ports': []},
+            # The ports of the first server changed.
+            {'ports': changed_ports},
+            {'ports': changed_ports},
+            {'ports': changed_ports},
+        ]
+        self.qclient.list_networks.return_value = {
+            'networks': self.api_networks.list()}
+        self.qclient.list_subnets.return_value = {
+            'subnets': self.api_subnets.list()}
+
+        api.network.servers_update_addresses(self.request, servers)
+        expected = [server.addresses for server in servers]
+        for server in servers:
+            server.addresses = {}
+
+        api.network.servers_update_addresses(self.request, servers)
+        self.assertEqual(expected, [server.addresses for server in servers])
+        self.assertEqual(1, self.qclient.list_networks.call_count)
+
+        # Another request, the listings of the previous one are memoized.
+        request = copy.copy(self.request)
+        api.network.servers_update_addresses(request, servers)
+        self.assertEqual(expected, [server.addresses for server in servers])
+        self.assertEqual(2, self.qclient.list_networks.call_count)
+
+        list_ports_calls = self.qclient.list_ports.call_args_list
+        self.assertEqual(mock.call(device_id=server_ids),
+                         list_ports_calls[0])
+        self.assertEqual(server_ids, list_ports_calls[1][1]['device_id'])
+        self.assertIn('changed_since', list_ports_calls[1][1])
+        self.assertEqual(tuple(sorted(p['id'] for p in server_ports)),
+                         list_ports_calls[2][1]['id'])
+        self.assertIn('changed_since', list_ports_calls[2][1])
+        # Only the server whose ports changed is refreshed.
+        self.assertEqual(mock.call(device_id=(servers[0].id,)),
+                         list_ports_calls[5])
+
+    @override_settings(OPENSTACK_NEUTRON_NETWORK={'enable_router': False})
+    def test_servers_update_addresses_incremental_detached_port(self):
+        api.neutron._get_server_address_cache().clear()
+        extensions = self.api_extensions.list() + [
+            {'alias': 'standard-attr-timestamp'}]
+        self.qclient.list_extensions.return_value = {'extensions': extensions}
+        servers = self.servers.list()
+        server_ids = tuple([server.id for server in servers])
+        server_ports = [p for p in self.api_ports.list()
+                        if p['device_id'] in server_ids]
+        detached_port = dict(server_ports[0], device_id='', device_owner='')
+        self.qclient.list_ports.side_effect = [
+            {'ports': server_ports},
+            # The port is not listed by device_id anymore.
+            {'ports': []},
+            {'ports': [detached_port]},
+            {'ports': server_ports[1:]},
+        ]
+        self.qclient.list_networks.return_value = {
+            'networks': self.api_networks.list()}
+        self.qclient.list_subnets.return_value = {
+            'subnets': self.api_subnets.list()}
+
+        api.network.servers_update_addresses(self.request, servers)
+        api.network.servers_update_addresses(copy.copy(self.request),
+                                             servers)
+
+        # The server the port was detached from is refreshed.
+        self.assertEqual(
+            mock.call(device_id=(server_ports[0]['device_id'],)),
+            self.qclient.list_ports.call_args_list[3])
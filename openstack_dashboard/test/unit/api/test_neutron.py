@@ -35,11 +35,27 @@ class NeutronApiTests(test.APIMockTestCase):
         neutronclient.list_networks.return_value = networks
         neutronclient.list_subnets.return_value = subnets
 
+        subnet_ids = [s for n in self.api_networks.list()
+                      for s in n['subnets']]
+
         ret_val = api.neutron.network_list(self.request)
         for n in ret_val:
             self.assertIsInstance(n, api.neutron.Network)
         neutronclient.list_networks.assert_called_once_with()
-        neutronclient.list_subnets.assert_called_once_with()
+        neutronclient.list_subnets.assert_called_once_with(
+            id=tuple(subnet_ids))
+
+    def test_network_list_without_subnets(self):
+        networks = [dict(n, subnets=[]) for n in self.api_networks.list()]
+
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_networks.return_value = {'networks': networks}
+
+        ret_val = api.neutron.network_list(self.request)
+
+        self.assertEqual(len(networks), len(ret_val))
+        neutronclient.list_networks.assert_called_once_with()
+        neutronclient.list_subnets.assert_not_called()
 
     @test.create_mocks({api.neutron: ('network_list',
                                       'subnet_list')})
@@ -57,39 +73,35 @@ class NeutronApiTests(test.APIMockTestCase):
         filter_params = filter_params or {}
         all_networks = self.networks.list()
         tenant_id = '1'
-        return_values = []
+        # The queries run concurrently, so the networks are returned
+        # depending on the parameters rather than on the order of the calls.
+        return_values = {}
         expected_calls = []
+
+        def add_call(networks, **params):
+            key = tuple(sorted(params.items()))
+            return_values.setdefault(key, []).extend(networks)
+            expected_calls.append(mock.call(test.IsHttpRequest(), **params))
+
         if 'non_shared' in should_called:
             params = filter_params.copy()
             params['shared'] = False
-            return_values.append([
-                network for network in all_networks
-                if network['tenant_id'] == tenant_id
-            ])
-            expected_calls.append(
-                mock.call(test.IsHttpRequest(), tenant_id=tenant_id, **params),
-            )
+            add_call([network for network in all_networks
+                      if network['tenant_id'] == tenant_id],
+                     tenant_id=tenant_id, **params)
         if 'shared' in should_called:
             params = filter_params.copy()
             params['shared'] = True
-            return_values.append([
-                network for network in all_networks
-                if network.get('shared')
-            ])
-            expected_calls.append(
-                mock.call(test.IsHttpRequest(), **params),
-            )
+            add_call([network for network in all_networks
+                      if network.get('shared')], **params)
         if 'external' in should_called:
             params = filter_params.copy()
             params['router:external'] = True
-            return_values.append([
-                network for network in all_networks
-                if network.get('router:external')
-            ])
-            expected_calls.append(
-                mock.call(test.IsHttpRequest(), **params),
-            )
-        self.mock_network_list.side_effect = return_values
+            add_call([network for network in all_networks
+                      if network.get('router:external')], **params)
+        self.mock_network_list.side_effect = (
+            lambda request, **params: return_values[
+                tuple(sorted(params.items()))])
 
         ret_val = api.neutron.network_list_for_tenant(
             self.request, tenant_id,
@@ -104,7 +116,11 @@ class NeutronApiTests(test.APIMockTestCase):
                          include_external and n['router:external']))]
         self.assertEqual(set(n.id for n in expected),
                          set(n.id for n in ret_val))
-        self.mock_network_list.assert_has_calls(expected_calls)
+        self.assertEqual(len(set(n.id for n in ret_val)), len(ret_val))
+        self.mock_network_list.assert_has_calls(expected_calls,
+                                                any_order=True)
+        self.assertEqual(len(expected_calls),
+                         self.mock_network_list.call_count)
 
     def test_network_list_for_tenant(self):
         self._test_network_list_for_tenant(
@@ -773,19 +789,85 @@ class NeutronApiTests(test.APIMockTestCase):
         neutronclient.remove_interface_router.assert_called_once_with(
             router_id, {'port_id': fake_port})
 
-    # stub_neutronclient does not work because api.neutron.list_extensions
-    # is decorated with memoized_with_request, so we need to mock
-    # neutronclient.v2_0.client directly.
-    @mock.patch('neutronclient.v2_0.client.Client.list_extensions')
-    def test_is_extension_supported(self, mock_list_extensions):
+    def test_is_extension_supported(self):
         extensions = self.api_extensions.list()
-        mock_list_extensions.return_value = {'extensions': extensions}
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_extensions.return_value = {'extensions': extensions}
         self.assertTrue(
             api.neutron.is_extension_supported(self.request, 'quotas'))
         self.assertFalse(
             api.neutron.is_extension_supported(self.request, 'doesntexist'))
+        # The extensions are cached per endpoint, not per token.
+        self.request.user.token.id = 'another-token'
+        self.assertTrue(
+            api.neutron.is_extension_supported(self.request, 'quotas'))
 
-        mock_list_extensions.assert_called_once_with()
+        neutronclient.list_extensions.assert_called_once_with()
+
+    def test_tenant_resource_count(self):
+        ports = [{'id': port['id']} for port in self.api_ports.list()]
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_ports.return_value = {'ports': ports}
+
+        ret_val = api.neutron.tenant_resource_count(self.request, 'port')
+
+        self.assertEqual(len(ports), ret_val)
+        neutronclient.list_ports.assert_called_once_with(
+            tenant_id=self.request.user.tenant_id, fields='id')
+
+    def _stub_dhcp_agents(self):
+        agents = [dict(agent, id=agent_id) for agent, agent_id in
+                  zip(self.api_agents.list()[1:] * 2, ('agent1', 'agent2'))]
+        networks = self.api_networks.list()
+        hosted_networks = {
+            'agent1': [{'id': networks[0]['id']}],
+            'agent2': [{'id': networks[0]['id']}, {'id': networks[1]['id']}],
+        }
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_agents.return_value = {'agents': agents}
+        neutronclient.list_networks_on_dhcp_agent.side_effect = (
+            lambda agent_id, **params: {'networks': hosted_networks[agent_id]})
+        return neutronclient, networks
+
+    def test_dhcp_agents_by_network(self):
+        neutronclient, networks = self._stub_dhcp_agents()
+
+        ret_val = api.neutron.dhcp_agents_by_network(self.request)
+
+        self.assertEqual({networks[0]['id']: ['agent1', 'agent2'],
+                          networks[1]['id']: ['agent2']}, ret_val)
+        neutronclient.list_agents.assert_called_once_with(
+            agent_type='DHCP agent')
+        neutronclient.list_networks_on_dhcp_agent.assert_has_calls(
+            [mock.call('agent1', fields='id'),
+             mock.call('agent2', fields='id')], any_order=True)
+        self.assertEqual(
+            2, neutronclient.list_networks_on_dhcp_agent.call_count)
+
+    @test.update_settings(MEMOIZED_CACHE={'enabled': True})
+    def test_dhcp_agents_by_network_cached(self):
+        neutronclient, networks = self._stub_dhcp_agents()
+
+        api.neutron.dhcp_agents_by_network(self.request)
+        ret_val = api.neutron.dhcp_agents_by_network(self.request)
+        self.assertEqual(['agent2'], ret_val[networks[1]['id']])
+        neutronclient.list_agents.assert_called_once_with(
+            agent_type='DHCP agent')
+
+        # Scheduling a network on an agent invalidates the cache.
+        api.neutron.add_network_to_dhcp_agent(self.request, 'agent1',
+                                              networks[1]['id'])
+        api.neutron.dhcp_agents_by_network(self.request)
+        self.assertEqual(2, neutronclient.list_agents.call_count)
+
+    @test.update_settings(MEMOIZED_CACHE={'enabled': False})
+    def test_dhcp_agents_by_network_not_cached(self):
+        neutronclient, networks = self._stub_dhcp_agents()
+
+        api.neutron.dhcp_agents_by_network(self.request)
+        api.neutron.dhcp_agents_by_network(self.request)
+
+        self.assertEqual(2, neutronclient.list_agents.call_count)
 
     def test_router_static_route_list(self):
         router = {'router': self.api_routers_with_routes.first()}
@@ -1453,7 +1535,8 @@ class NeutronApiFloatingIpTests(test.APIMockTestCase):
             mock.call(shared=True),
         ])
         self.qclient.list_routers.assert_called_once_with()
-        self.qclient.list_subnets.assert_called_once_with()
+        self.qclient.list_subnets.assert_called_once_with(
+            id=tuple(shared_subnet_ids))
 
     def _test_target_floating_ip_port_by_instance(self, server, ports,
                                                   candidates):
@@ -1501,7 +1584,8 @@ class NeutronApiFloatingIpTests(test.APIMockTestCase):
             mock.call(shared=True),
         ])
         self.qclient.list_routers.assert_called_once_with()
-        self.qclient.list_subnets.assert_called_once_with()
+        self.qclient.list_subnets.assert_called_once_with(
+            id=tuple(shared_subnet_ids))
         novaclient.versions.get_current.assert_called_once_with()
         novaclient.servers.get.assert_called_once_with(server.id)
 
@@ -99,6 +99,22 @@ class ComputeApiTests(test.APIMockTestCase):
         novaclient.servers.reboot.assert_called_once_with(
             server.id, HARDNESS)
 
+    @mock.patch.object(api.base, 'invalidate_quota_usages')
+    def test_server_resize(self, mock_invalidate):
+        server = self.servers.first()
+        flavor = self.flavors.first()
+
+        novaclient = self.stub_novaclient()
+        novaclient.servers.resize.return_value = None
+
+        api.nova.server_resize(self.request, server.id, flavor.id)
+
+        novaclient.servers.resize.assert_called_once_with(
+            server.id, flavor.id, None)
+        # The usages of the project change with the flavor.
+        mock_invalidate.assert_called_once_with(
+            self.request.user.project_id, self.request.user.services_region)
+
     def test_server_vnc_console(self):
         server = self.servers.first()
         console = self.servers.vnc_console_data
@@ -290,6 +306,32 @@ class ComputeApiTests(test.APIMockTestCase):
                       marker=u'063cf7f3-ded1-4297-bc4c-31eae876cc93'),
         ])
 
+    def test_usage_list_pages(self):
+        usages = self.usages.list()
+
+        novaclient = self.stub_novaclient()
+        self._mock_current_version(novaclient, '2.40')
+        novaclient.usage.list.side_effect = [
+            usages[:1],
+            usages[1:],
+            [],
+        ]
+
+        pages = list(api.nova.usage_list_pages(self.request, 'start', 'end'))
+
+        self.assertEqual([[usages[0].tenant_id], [usages[1].tenant_id]],
+                         [[u.tenant_id for u in page] for page in pages])
+        for page in pages:
+            for usage in page:
+                self.assertIsInstance(usage, api.nova.NovaUsage)
+        novaclient.usage.list.assert_has_calls([
+            mock.call('start', 'end', True),
+            mock.call('start', 'end', True,
+                      marker=u'063cf7f3-ded1-4297-bc4c-31eae876cc93'),
+            mock.call('start', 'end', True,
+                      marker=u'063cf7f3-ded1-4297-bc4c-31eae876cc93'),
+        ])
+
     def test_server_get(self):
         server = self.servers.first()
 
@@ -481,6 +523,44 @@ class ComputeApiTests(test.APIMockTestCase):
         self.assertEqual(api_flavor.id, flavor.id)
         novaclient.flavors.get.assert_called_once_with(flavor.id)
 
+    @test.update_settings(MEMOIZED_CACHE={'enabled': True})
+    def test_flavor_list_with_extras(self):
+        flavors = self.flavors.list()
+        for flavor in flavors:
+            flavor.get_keys = mock.Mock(return_value={'id': flavor.id})
+        novaclient = self.stub_novaclient()
+        novaclient.flavors.list.return_value = flavors
+
+        api_flavors = api.nova.flavor_list(self.request, get_extras=True)
+
+        self.assertEqual([{'id': flavor.id} for flavor in flavors],
+                         [flavor.extras for flavor in api_flavors])
+        # The extra specs are cached across requests.
+        self.assertEqual({'id': flavors[0].id},
+                         api.nova.flavor_get_extras(self.request,
+                                                    flavors[0].id,
+                                                    raw=True,
+                                                    flavor=flavors[0]))
+        for flavor in flavors:
+            flavor.get_keys.assert_called_once_with()
+        novaclient.flavors.list.assert_called_once_with(is_public=True)
+
+    def test_flavor_extra_set_invalidates_extras(self):
+        flavor = self.flavors.first()
+        flavor.get_keys = mock.Mock(side_effect=[{}, {'k1': 'v1'}])
+        flavor.set_keys = mock.Mock()
+        novaclient = self.stub_novaclient()
+        novaclient.flavors.get.return_value = flavor
+
+        self.assertEqual({}, api.nova.flavor_get_extras(
+            self.request, flavor.id, raw=True))
+        api.nova.flavor_extra_set(self.request, flavor.id, {'k1': 'v1'})
+
+        self.assertEqual({'k1': 'v1'}, api.nova.flavor_get_extras(
+            self.request, flavor.id, raw=True))
+        self.assertEqual(2, flavor.get_keys.call_count)
+        flavor.set_keys.assert_called_once_with({'k1': 'v1'})
+
     def _test_flavor_list_paged(self, reversed_order=False, paginate=True):
         page_size = getattr(settings, 'API_RESULT_PAGE_SIZE', 20)
         flavors = self.flavors.list()
@@ -0,0 +1,50 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from django.core.management import call_command
+from django.core.management import CommandError
+from django.test import TestCase
+from django.test.utils import override_settings
+import mock
+
+from openstack_dashboard.api import base
+
+
+class CommandsTestCase(TestCase):
+
+    @override_settings(MEMOIZED_CACHE={'backend': 'django'})
+    @mock.patch.object(base, 'invalidate_extension_cache')
+    def test_clear_extension_cache(self, mock_invalidate):
+        call_command('clear_extension_cache', stdout=mock.Mock())
+        mock_invalidate.assert_called_once_with(None, None)
+
+    @override_settings(MEMOIZED_CACHE={'backend': 'django'})
+    @mock.patch.object(base, 'invalidate_extension_cache')
+    def test_clear_extension_cache_endpoint(self, mock_invalidate):
+        call_command('clear_extension_cache', service='neutron',
+                     url='http://neutron', stdout=mock.Mock())
+        mock_invalidate.assert_called_once_with('neutron', 'http://neutron')
+
+    @override_settings(MEMOIZED_CACHE={'backend': 'django'})
+    @mock.patch.object(base, 'invalidate_extension_cache')
+    def test_clear_extension_cache_service_without_url(self,
+                                                       mock_invalidate):
+        self.assertRaises(CommandError, call_command,
+                          'clear_extension_cache', service='neutron')
+        self.assertFalse(mock_invalidate.called)
+
+    @override_settings(MEMOIZED_CACHE={'enabled': True, 'backend': 'local'})
+    @mock.patch.object(base, 'invalidate_extension_cache')
+    def test_clear_extension_cache_local_backend(self, mock_invalidate):
+        self.assertRaises(CommandError, call_command,
+                          'clear_extension_cache')
+        self.assertFalse(mock_invalidate.called)
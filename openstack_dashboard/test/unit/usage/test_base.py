@@ -0,0 +1,57 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+
+import mock
+
+from openstack_dashboard import api
+from openstack_dashboard.test import helpers as test
+from openstack_dashboard import usage
+
+
+class GlobalUsageTests(test.APITestCase):
+
+    use_mox = False
+
+    def _split_usage(self, nova_usage):
+        # Simulate the usage of a project split across two pages of Nova.
+        first = copy.deepcopy(nova_usage._info)
+        second = copy.deepcopy(nova_usage._info)
+        first['server_usages'] = first['server_usages'][:1]
+        second['server_usages'] = second['server_usages'][1:]
+        for key in ('total_memory_mb_usage', 'total_vcpus_usage',
+                    'total_local_gb_usage', 'total_hours'):
+            second[key] = 1
+        return (api.nova.NovaUsage(type(nova_usage)(None, first)),
+                api.nova.NovaUsage(type(nova_usage)(None, second)))
+
+    @mock.patch.object(api.nova, 'usage_list_pages')
+    def test_get_usage_list_accumulates_pages(self, mock_usage_list_pages):
+        project_usage, other_usage = self.usages.list()
+        first, second = self._split_usage(project_usage)
+        other = api.nova.NovaUsage(other_usage)
+        mock_usage_list_pages.return_value = iter([[first], [second, other]])
+
+        global_usage = usage.GlobalUsage(self.request)
+        usage_list = global_usage.get_usage_list('start', 'end')
+
+        mock_usage_list_pages.assert_called_once_with(self.request,
+                                                      'start', 'end')
+        self.assertEqual([project_usage.tenant_id, other_usage.tenant_id],
+                         [u.tenant_id for u in usage_list])
+        expected = first.get_summary()
+        for key, value in second.get_summary().items():
+            expected[key] += value
+        self.assertEqual(expected, usage_list[0].get_summary())
+        self.assertEqual(other.get_summary(), usage_list[1].get_summary())
+        self.assertFalse(hasattr(usage_list[0], 'server_usages'))
@@ -20,6 +20,7 @@
 from __future__ import absolute_import
 
 import collections
+import threading
 
 from django.test.utils import override_settings
 from django.utils.translation import ugettext_lazy as _
@@ -452,6 +453,75 @@ class QuotaTests(test.APITestCase):
         else:
             self.mock_cinder_tenant_absolute_limits.assert_not_called()
 
+    @test.update_settings(MEMOIZED_CACHE={'enabled': True})
+    @test.create_mocks({
+        api.nova: (('tenant_absolute_limits', 'nova_tenant_absolute_limits'),
+                   'novaclient'),
+        api.base: ('is_service_enabled',),
+        cinder: (('tenant_absolute_limits', 'cinder_tenant_absolute_limits'),
+                 'is_volume_service_enabled')})
+    def test_tenant_quota_usages_cached(self):
+        targets = ('instances', 'volumes')
+        self._mock_service_enabled()
+        self.mock_nova_tenant_absolute_limits.return_value = \
+            self.limits['absolute']
+        self.mock_cinder_tenant_absolute_limits.return_value = \
+            self.cinder_limits['absolute']
+
+        quota_usages = quotas.tenant_quota_usages(self.request,
+                                                  targets=targets)
+        # The usages returned to a request can be tallied by the caller.
+        quota_usages.tally('instances', 1)
+
+        # Another request for the same project and quotas hits the cache.
+        request = self.factory.get('/')
+        quota_usages = quotas.tenant_quota_usages(request,
+                                                  targets=targets[::-1])
+        expected = self.get_usages_from_limits()
+        self.assertAvailableQuotasEqual(
+            dict((k, v) for k, v in expected.items() if k in targets),
+            quota_usages.usages)
+        self.assertEqual(1,
+                         self.mock_nova_tenant_absolute_limits.call_count)
+        self.assertEqual(1,
+                         self.mock_cinder_tenant_absolute_limits.call_count)
+
+        # Deleting a resource of the project invalidates the cache, and
+        # the usages are not cached again while the deletion may still be
+        # in progress.
+        api.nova.server_delete(request, self.servers.first().id)
+        quotas.tenant_quota_usages(self.factory.get('/'), targets=targets)
+        quotas.tenant_quota_usages(self.factory.get('/'), targets=targets)
+        self.assertEqual(3,
+                         self.mock_nova_tenant_absolute_limits.call_count)
+        self.assertEqual(3,
+                         self.mock_cinder_tenant_absolute_limits.call_count)
+
+    @test.update_settings(MEMOIZED_CACHE={'enabled': False})
+    @test.create_mocks({
+        api.nova: (('tenant_absolute_limits', 'nova_tenant_absolute_limits'),),
+        api.base: ('is_service_enabled',),
+        cinder: ('is_volume_service_enabled',)})
+    def test_tenant_quota_usages_not_cached(self):
+        self._mock_service_enabled(volume_enabled=False)
+        self.mock_nova_tenant_absolute_limits.return_value = \
+            self.limits['absolute']
+
+        quotas.tenant_quota_usages(self.request, targets=('instances',))
+        quotas.tenant_quota_usages(self.factory.get('/'),
+                                   targets=('instances',))
+
+        self.assertEqual(2,
+                         self.mock_nova_tenant_absolute_limits.call_count)
+
+    def test_quota_usage_tallied_before_quota_added(self):
+        usages = quotas.QuotaUsage()
+        usages.tally('port', 3)
+        usages.add_quota(api.base.Quota('port', 10))
+
+        self.assertEqual({'quota': 10, 'used': 3, 'available': 7},
+                         usages['port'])
+
     def test_tenant_quota_usages_neutron_with_target_network_resources(self):
         self._test_tenant_quota_usages_neutron_with_target(
             targets=('network', 'subnet', 'router', ))
@@ -467,15 +537,11 @@ class QuotaTests(test.APITestCase):
     @test.create_mocks({api.base: ('is_service_enabled',),
                         cinder: ('is_volume_service_enabled',),
                         api.neutron: ('floating_ip_supported',
-                                      'tenant_floating_ip_list',
-                                      'security_group_list',
+                                      'tenant_resource_count',
                                       'is_extension_supported',
                                       'is_router_enabled',
                                       'is_quotas_extension_supported',
-                                      'tenant_quota_get',
-                                      'network_list',
-                                      'subnet_list',
-                                      'router_list')})
+                                      'tenant_quota_get')})
     def _test_tenant_quota_usages_neutron_with_target(self, targets):
         self._mock_service_enabled(network_enabled=True)
         self.mock_is_extension_supported.side_effect = [
@@ -486,21 +552,31 @@ class QuotaTests(test.APITestCase):
         self.mock_is_quotas_extension_supported.return_value = True
         self.mock_tenant_quota_get.return_value = self.neutron_quotas.first()
 
-        if 'network' in targets:
-            self.mock_network_list.return_value = self.networks.list()
-        if 'subnet' in targets:
-            self.mock_subnet_list.return_value = self.subnets.list()
-        if 'router' in targets:
-            self.mock_router_list.return_value = self.routers.list()
-        if 'floatingip' in targets:
-            self.mock_tenant_floating_ip_list.return_value = \
-                self.floating_ips.list()
-        if 'security_group' in targets:
-            self.mock_security_group_list.return_value = \
-                self.security_groups.list()
+        resources = {
+            'network': self.networks.list(),
+            'subnet': self.subnets.list(),
+            'router': self.routers.list(),
+            'floatingip': self.floating_ips.list(),
+            'security_group': self.security_groups.list(),
+        }
+        self.mock_tenant_resource_count.side_effect = \
+            lambda request, quota_name, tenant_id: len(resources[quota_name])
+        tally = quotas.QuotaUsage.tally
+        tally_threads = []
 
-        quota_usages = quotas.tenant_quota_usages(self.request,
-                                                  targets=targets)
+        def record_tally_thread(usages, name, value):
+            tally_threads.append(threading.current_thread())
+            return tally(usages, name, value)
+
+        with mock.patch.object(quotas.QuotaUsage, 'tally', autospec=True,
+                               side_effect=record_tally_thread):
+            quota_usages = quotas.tenant_quota_usages(self.request,
+                                                      targets=targets)
+
+        # The counts are tallied by the calling thread, not concurrently
+        # with the addition of the quotas in the workers.
+        self.assertEqual([threading.current_thread()] * len(targets),
+                         tally_threads)
 
         network_used = len(self.networks.list())
         subnet_used = len(self.subnets.list())
@@ -538,31 +614,38 @@ class QuotaTests(test.APITestCase):
             test.IsHttpRequest())
         self.mock_tenant_quota_get.assert_called_once_with(
             test.IsHttpRequest(), '1')
-        if 'network' in targets:
-            self.mock_network_list.assert_called_once_with(
-                test.IsHttpRequest(),
-                tenant_id=self.request.user.tenant_id)
-        else:
-            self.mock_network_list.assert_not_called()
-        if 'subnet' in targets:
-            self.mock_subnet_list.assert_called_once_with(
-                test.IsHttpRequest(),
-                tenant_id=self.request.user.tenant_id)
-        else:
-            self.mock_subnet_list.assert_not_called()
-        if 'router' in targets:
-            self.mock_router_list.assert_called_once_with(
-                test.IsHttpRequest(),
-                tenant_id=self.request.user.tenant_id)
-        else:
-            self.mock_router_list.assert_not_called()
-        if 'floatingip' in targets:
-            self.mock_tenant_floating_ip_list.assert_called_once_with(
-                test.IsHttpRequest())
-        else:
-            self.mock_tenant_floating_ip_list.assert_not_called()
-        if 'security_group' in targets:
-            self.mock_security_group_list.assert_called_once_with(
-                test.IsHttpRequest())
-        else:
-            self.mock_security_group_list.assert_not_called()
+        self.mock_tenant_resource_count.assert_has_calls(
+            [mock.call(test.IsHttpRequest(), quota_name,
+                       self.request.user.tenant_id)
+             for quota_name in targets], any_order=True)
+        self.assertEqual(len(targets),
+                         self.mock_tenant_resource_count.call_count)
+
+    @test.update_settings(MEMOIZED_CACHE={'enabled': True})
+    @test.create_mocks({api.base: ('is_service_enabled',),
+                        cinder: ('is_volume_service_enabled',),
+                        api.neutron: ('floating_ip_supported',
+                                      'tenant_resource_count',
+                                      'is_extension_supported',
+                                      'is_router_enabled',
+                                      'is_quotas_extension_supported',
+                                      'tenant_quota_get')})
+    def test_tenant_quota_usages_incomplete_not_cached(self):
+        self._mock_service_enabled(network_enabled=True)
+        self.mock_is_extension_supported.return_value = False
+        self.mock_is_router_enabled.return_value = True
+        self.mock_is_quotas_extension_supported.return_value = True
+        self.mock_tenant_quota_get.return_value = self.neutron_quotas.first()
+        self.mock_tenant_resource_count.side_effect = [
+            Exception('expected'), len(self.networks.list())]
+
+        quota_usages = quotas.tenant_quota_usages(self.request,
+                                                  targets=('network',))
+        self.assertEqual(0, quota_usages['network']['used'])
+
+        # The failed count is not shared with the next request.
+        quota_usages = quotas.tenant_quota_usages(self.factory.get('/'),
+                                                  targets=('network',))
+        self.assertEqual(len(self.networks.list()),
+                         quota_usages['network']['used'])
+        self.assertEqual(2, self.mock_tenant_resource_count.call_count)
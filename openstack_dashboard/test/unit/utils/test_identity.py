@@ -0,0 +1,96 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import unittest
+
+import mock
+
+from openstack_dashboard import api
+from openstack_dashboard.utils import identity
+
+
+class DiffRoleAssignmentsTests(unittest.TestCase):
+
+    def test_diff_role_assignments(self):
+        current = {'1': {'a'}, '2': {'a', 'b'}, '3': {'b'}}
+        requested = {'1': {'a', 'b'}, '2': {'b'}, '4': {'c'}}
+
+        grants, revokes = identity.diff_role_assignments(current, requested)
+
+        self.assertEqual([('1', 'b'), ('4', 'c')], grants)
+        self.assertEqual([('2', 'a'), ('3', 'b')], revokes)
+
+    def test_diff_role_assignments_unchanged(self):
+        current = {'1': {'a'}, '2': {'b'}}
+
+        grants, revokes = identity.diff_role_assignments(current,
+                                                         dict(current))
+
+        self.assertEqual([], grants)
+        self.assertEqual([], revokes)
+
+    def test_diff_role_assignments_managed(self):
+        current = {'1': {'a'}, '2': {'a'}}
+        requested = {'1': {'b'}, '3': {'a'}}
+
+        grants, revokes = identity.diff_role_assignments(current, requested,
+                                                         managed={'1', '3'})
+
+        # The roles of user 2 are left alone since it is not managed.
+        self.assertEqual([('1', 'b'), ('3', 'a')], grants)
+        self.assertEqual([('1', 'a')], revokes)
+
+
+class UpdateRoleAssignmentsTests(unittest.TestCase):
+
+    @mock.patch.object(api.keystone, 'remove_tenant_user_role')
+    @mock.patch.object(api.keystone, 'add_tenant_user_role')
+    def test_update_role_assignments(self, mock_add, mock_remove):
+        request = mock.Mock()
+
+        failed = identity.update_role_assignments(
+            request, 'project', grants=[('1', 'a'), ('2', 'b')],
+            revokes=[('3', 'c')])
+
+        self.assertEqual(([], []), failed)
+        mock_add.assert_has_calls([
+            mock.call(request, project='project', user='1', role='a'),
+            mock.call(request, project='project', user='2', role='b'),
+        ], any_order=True)
+        self.assertEqual(2, mock_add.call_count)
+        mock_remove.assert_called_once_with(request, project='project',
+                                            user='3', role='c')
+
+    @mock.patch.object(api.keystone, 'remove_group_role')
+    @mock.patch.object(api.keystone, 'add_group_role')
+    def test_update_role_assignments_failures(self, mock_add, mock_remove):
+        request = mock.Mock()
+
+        def add_group_role(request, role, group, project):
+            if group == '1':
+                raise Exception('expected')
+        mock_add.side_effect = add_group_role
+        mock_remove.side_effect = Exception('expected')
+
+        failed = identity.update_role_assignments(
+            request, 'project', grants=[('1', 'a'), ('2', 'b')],
+            revokes=[('3', 'c')], group=True)
+
+        # The failures do not prevent the other changes.
+        self.assertEqual(([('1', 'a')], [('3', 'c')]), failed)
+        mock_add.assert_has_calls([
+            mock.call(request, role='a', group='1', project='project'),
+            mock.call(request, role='b', group='2', project='project'),
+        ], any_order=True)
+        self.assertEqual(2, mock_add.call_count)
+        mock_remove.assert_called_once_with(request, role='c', group='3',
+                                            project='project')
@@ -12,6 +12,7 @@
 
 from __future__ import division
 
+import collections
 import datetime
 
 from django.conf import settings
@@ -23,6 +24,7 @@ from horizon import forms
 from horizon import messages
 
 from openstack_dashboard import api
+from openstack_dashboard.utils import futurist_utils
 
 
 class BaseUsage(object):
@@ -152,11 +154,56 @@ class BaseUsage(object):
                                                 data['end'])
 
 
+class ProjectUsageSummary(object):
+    """Usage of a project accumulated from the pages of the usage list.
+
+    It provides the summary attributes of :class:`api.nova.NovaUsage`
+    without keeping the usage of every instance of the project.
+    """
+
+    def __init__(self, tenant_id):
+        self.tenant_id = tenant_id
+        self.total_active_instances = 0
+        self.vcpus = 0
+        self.vcpu_hours = 0
+        self.local_gb = 0
+        self.memory_mb = 0
+        self.disk_gb_hours = 0
+        self.memory_mb_hours = 0
+
+    def add(self, usage):
+        self.total_active_instances += usage.total_active_instances
+        self.vcpus += usage.vcpus
+        self.vcpu_hours += usage.vcpu_hours
+        self.local_gb += usage.local_gb
+        self.memory_mb += usage.memory_mb
+        self.disk_gb_hours += usage.disk_gb_hours
+        self.memory_mb_hours += usage.memory_mb_hours
+
+    def get_summary(self):
+        return {'instances': self.total_active_instances,
+                'memory_mb': self.memory_mb,
+                'vcpus': self.vcpus,
+                'vcpu_hours': self.vcpu_hours,
+                'local_gb': self.local_gb,
+                'disk_gb_hours': self.disk_gb_hours,
+                'memory_mb_hours': self.memory_mb_hours}
+
+
 class GlobalUsage(BaseUsage):
     show_deleted = True
 
     def get_usage_list(self, start, end):
-        return api.nova.usage_list(self.request, start, end)
+        # Only the summary of each project is kept, the usage of the
+        # instances is dropped once a page has been accumulated.
+        usages = collections.OrderedDict()
+        for page in api.nova.usage_list_pages(self.request, start, end):
+            for usage in page:
+                if usage.tenant_id not in usages:
+                    usages[usage.tenant_id] = ProjectUsageSummary(
+                        usage.tenant_id)
+                usages[usage.tenant_id].add(usage)
+        return list(usages.values())
 
 
 class ProjectUsage(BaseUsage):
@@ -203,12 +250,10 @@ class ProjectUsage(BaseUsage):
     def _get_neutron_usage(self, limits, resource_name):
         resource_map = {
             'floatingip': {
-                'api': api.neutron.tenant_floating_ip_list,
                 'limit_name': 'totalFloatingIpsUsed',
                 'message': _('Unable to retrieve floating IP addresses.')
             },
             'security_group': {
-                'api': api.neutron.security_group_list,
                 'limit_name': 'totalSecurityGroupsUsed',
                 'message': _('Unable to retrieve security groups.')
             }
@@ -216,8 +261,8 @@ class ProjectUsage(BaseUsage):
 
         resource = resource_map[resource_name]
         try:
-            method = resource['api']
-            current_used = len(method(self.request))
+            current_used = api.neutron.tenant_resource_count(
+                self.request, resource_name, self.project_id)
         except Exception:
             current_used = 0
             msg = resource['message']
@@ -249,10 +294,14 @@ class ProjectUsage(BaseUsage):
             neutron_sg_used = (
                 api.neutron.is_extension_supported(self.request,
                                                    'security-group'))
+            resource_names = []
             if api.neutron.floating_ip_supported(self.request):
-                self._get_neutron_usage(self.limits, 'floatingip')
+                resource_names.append('floatingip')
             if neutron_sg_used:
-                self._get_neutron_usage(self.limits, 'security_group')
+                resource_names.append('security_group')
+            futurist_utils.call_functions_parallel(
+                *[(self._get_neutron_usage, [self.limits, resource_name])
+                  for resource_name in resource_names])
             # Quotas are an optional extension in Neutron. If it isn't
             # enabled, assume the floating IP limit is infinite.
             if neutron_quotas_supported:
@@ -18,6 +18,7 @@ from django.utils.translation import ugettext_lazy as _
 
 from horizon import exceptions
 from horizon.utils.memoized import memoized
+from horizon.utils.memoized import shared_memoized
 
 from openstack_dashboard.api import base
 from openstack_dashboard.api import cinder
@@ -144,6 +145,9 @@ class QuotaUsage(dict):
             self.usages[quota.name]['available'] = float("inf")
         else:
             self.usages[quota.name]['quota'] = int(quota.limit)
+            # The usage may have been tallied first.
+            if 'used' in self.usages[quota.name]:
+                self.update_available(quota.name)
 
     def tally(self, name, value):
         """Adds to the "used" metric for the given quota."""
@@ -313,21 +317,13 @@ def _get_tenant_compute_usages(request, usages, disabled_quotas, tenant_id):
 
 @profiler.trace
 def _get_tenant_network_usages(request, usages, disabled_quotas, tenant_id):
-    enabled_quotas = NEUTRON_QUOTA_FIELDS - disabled_quotas
-    if not enabled_quotas:
-        return
-
-    if neutron.is_extension_supported(request, 'quota_details'):
-        details = neutron.tenant_quota_detail_get(request, tenant_id)
-        for quota_name in NEUTRON_QUOTA_FIELDS:
-            if quota_name in disabled_quotas:
-                continue
-            detail = details[quota_name]
-            usages.add_quota(base.Quota(quota_name, detail['limit']))
-            usages.tally(quota_name, detail['used'] + detail['reserved'])
-    else:
-        _get_tenant_network_usages_legacy(
-            request, usages, disabled_quotas, tenant_id)
+    details = neutron.tenant_quota_detail_get(request, tenant_id)
+    for quota_name in NEUTRON_QUOTA_FIELDS:
+        if quota_name in disabled_quotas:
+            continue
+        detail = details[quota_name]
+        usages.add_quota(base.Quota(quota_name, detail['limit']))
+        usages.tally(quota_name, detail['used'] + detail['reserved'])
 
 
 def _get_neutron_quota_data(request, qs, disabled_quotas, tenant_id):
@@ -342,32 +338,49 @@ def _get_neutron_quota_data(request, qs, disabled_quotas, tenant_id):
     return qs
 
 
-def _get_tenant_network_usages_legacy(request, usages, disabled_quotas,
+def _get_tenant_network_quotas_legacy(request, usages, disabled_quotas,
                                       tenant_id):
     qs = base.QuotaSet()
     _get_neutron_quota_data(request, qs, disabled_quotas, tenant_id)
     for quota in qs:
         usages.add_quota(quota)
 
+
+def _count_network_resources_legacy(request, quota_name, tenant_id):
+    try:
+        count = neutron.tenant_resource_count(request, quota_name, tenant_id)
+    except Exception:
+        # The resources are shown as unused, but the usages are not cached.
+        count = None
+    return quota_name, count
+
+
+def _get_tenant_network_usage_calls(request, usages, disabled_quotas,
+                                    tenant_id):
+    """Returns the calls retrieving the network quotas and usages.
+
+    Without the quota_details extension, each kind of resource is counted
+    by its own call, so that they run concurrently with the other calls
+    of tenant_quota_usages(). Since the quotas of the same resources are
+    added concurrently, the counting calls do not tally the usages but
+    return a ``(quota_name, count)`` tuple for the caller to tally once
+    all the calls have returned.
+    """
+    enabled_quotas = NEUTRON_QUOTA_FIELDS - disabled_quotas
+    if not enabled_quotas:
+        return []
+
+    args = [request, usages, disabled_quotas, tenant_id]
+    if neutron.is_extension_supported(request, 'quota_details'):
+        return [(_get_tenant_network_usages, args)]
+
+    calls = [(_get_tenant_network_quotas_legacy, args)]
     # TODO(amotoki): Add security_group_rule?
-    resource_lister = {
-        'network': (neutron.network_list, {'tenant_id': tenant_id}),
-        'subnet': (neutron.subnet_list, {'tenant_id': tenant_id}),
-        'port': (neutron.port_list, {'tenant_id': tenant_id}),
-        'router': (neutron.router_list, {'tenant_id': tenant_id}),
-        'floatingip': (neutron.tenant_floating_ip_list, {}),
-        'security_group': (neutron.security_group_list, {}),
-    }
-
-    for quota_name, lister_info in resource_lister.items():
-        if quota_name not in disabled_quotas:
-            lister = lister_info[0]
-            kwargs = lister_info[1]
-            try:
-                resources = lister(request, **kwargs)
-            except Exception:
-                resources = []
-            usages.tally(quota_name, len(resources))
+    calls.extend((_count_network_resources_legacy,
+                  [request, quota_name, tenant_id])
+                 for quota_name in sorted(enabled_quotas)
+                 if quota_name != 'security_group_rule')
+    return calls
 
 
 @profiler.trace
@@ -392,11 +405,69 @@ def _get_tenant_volume_usages(request, usages, disabled_quotas, tenant_id):
 # TODO(amotoki): Merge tenant_quota_usages and tenant_limit_usages.
 # These two functions are similar. There seems no reason to have both.
 
+def _get_tenant_quota_usages_key(request, tenant_id, targets):
+    # The usages are cached under the generation of the project, which
+    # changes when the usages of the project are invalidated.
+    region = request.user.services_region
+    generation, pending = base.get_quota_usages_generation(tenant_id, region)
+    if pending:
+        return None
+    return tenant_id, region, generation, targets
+
+
+class _IncompleteUsages(Exception):
+    """Carries the usages of a project which could not all be retrieved.
+
+    It is raised instead of returning them, so that they are not cached
+    for the other requests.
+    """
+
+    def __init__(self, usages):
+        super(_IncompleteUsages, self).__init__()
+        self.usages = usages
+
+
+@shared_memoized(ttl=base.QUOTA_USAGES_CACHE_TTL,
+                 key=_get_tenant_quota_usages_key)
+def _get_tenant_quota_usages(request, tenant_id, targets):
+    disabled_quotas = get_disabled_quotas(request)
+    usages = QuotaUsage()
+
+    if targets:
+        enabled_quotas = set(QUOTA_FIELDS) - disabled_quotas
+        enabled_quotas &= set(targets)
+        disabled_quotas = set(QUOTA_FIELDS) - enabled_quotas
+
+    args = [request, usages, disabled_quotas, tenant_id]
+    results = futurist_utils.call_functions_parallel(
+        (_get_tenant_compute_usages, args),
+        (_get_tenant_volume_usages, args),
+        *_get_tenant_network_usage_calls(*args))
+    complete = True
+    for result in results:
+        if result:
+            quota_name, count = result
+            complete = complete and count is not None
+            usages.tally(quota_name, count)
+
+    # The usages are cached as plain dicts, since they may be pickled.
+    data = dict((name, dict(usage)) for name, usage in usages.usages.items())
+    if not complete:
+        raise _IncompleteUsages(data)
+    return data
+
+
 @profiler.trace
 @memoized
 def tenant_quota_usages(request, tenant_id=None, targets=None):
     """Get our quotas and construct our usage object.
 
+    The usages are shared by the requests for the same project, region
+    and quotas for ``QUOTA_USAGES_CACHE_TTL`` seconds, until a resource of
+    the project is created or deleted through the API wrappers. They are
+    not shared when some of them could not be retrieved, nor during the
+    ``QUOTA_USAGES_CACHE_TTL`` seconds following such a change.
+
     :param tenant_id: Target tenant ID. If no tenant_id is provided,
         a the request.user.project_id is assumed to be used.
     :param targets: A tuple of quota names to be retrieved.
@@ -405,25 +476,20 @@ def tenant_quota_usages(request, tenant_id=None, targets=None):
     if not tenant_id:
         tenant_id = request.user.project_id
 
-    disabled_quotas = get_disabled_quotas(request)
-    usages = QuotaUsage()
-
     if targets:
         if set(targets) - QUOTA_FIELDS:
             raise ValueError('Unknown quota field names are included: %s'
                              % set(targets) - QUOTA_FIELDS)
-        enabled_quotas = set(QUOTA_FIELDS) - disabled_quotas
-        enabled_quotas &= set(targets)
-        disabled_quotas = set(QUOTA_FIELDS) - enabled_quotas
+        targets = tuple(sorted(set(targets)))
 
-    futurist_utils.call_functions_parallel(
-        (_get_tenant_compute_usages,
-         [request, usages, disabled_quotas, tenant_id]),
-        (_get_tenant_network_usages,
-         [request, usages, disabled_quotas, tenant_id]),
-        (_get_tenant_volume_usages,
-         [request, usages, disabled_quotas, tenant_id]))
+    try:
+        data = _get_tenant_quota_usages(request, tenant_id, targets)
+    except _IncompleteUsages as e:
+        data = e.usages
 
+    usages = QuotaUsage()
+    for name, usage in data.items():
+        usages.usages[name].update(usage)
     return usages
 
 
@@ -12,7 +12,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import logging
+
 from openstack_dashboard import api
+from openstack_dashboard.utils import futurist_utils
+
+LOG = logging.getLogger(__name__)
 
 
 def get_domain_id_for_operation(request):
@@ -26,3 +31,80 @@ def get_domain_id_for_operation(request):
     if domain_context:
         return domain_context
     return api.keystone.get_effective_domain_id(request)
+
+
+def diff_role_assignments(current, requested, managed=None):
+    """Compute the minimal changes turning the current roles into requested.
+
+    :param current: a dict of the role IDs currently assigned on a project,
+        keyed by user or group ID
+    :param requested: a dict of the role IDs to be assigned, keyed likewise
+    :param managed: the IDs of the users or groups whose current roles may
+        be changed. The roles of the other users or groups having roles on
+        the project are left unchanged. By default, all may be changed.
+    :returns: a tuple of the lists of the (user or group ID, role ID) pairs
+        to be granted and to be revoked
+    """
+    grants = []
+    revokes = []
+    for actor_id in sorted(set(current) | set(requested)):
+        current_roles = set(current.get(actor_id, ()))
+        if (current_roles and managed is not None and
+                actor_id not in managed):
+            continue
+        requested_roles = set(requested.get(actor_id, ()))
+        grants.extend((actor_id, role_id)
+                      for role_id in sorted(requested_roles - current_roles))
+        revokes.extend((actor_id, role_id)
+                       for role_id in sorted(current_roles - requested_roles))
+    return grants, revokes
+
+
+def _change_role_assignment(request, change, project_id, actor_id, role_id,
+                            group):
+    try:
+        if group:
+            change(request, role=role_id, group=actor_id, project=project_id)
+        else:
+            change(request, project=project_id, user=actor_id, role=role_id)
+    except Exception as e:
+        LOG.warning("Unable to change the role %(role)s of %(actor)s on "
+                    "project %(project)s: %(error)s",
+                    {'role': role_id, 'actor': actor_id,
+                     'project': project_id, 'error': e})
+        return False
+    return True
+
+
+def update_role_assignments(request, project_id, grants=(), revokes=(),
+                            group=False):
+    """Grant and revoke roles of users or groups on a project.
+
+    The grants and revokes are applied concurrently, with the concurrency
+    bounded by the ``PARALLEL_EXECUTOR`` setting. A failure does not stop
+    the other changes.
+
+    :param grants: the (user or group ID, role ID) pairs to be granted
+    :param revokes: the (user or group ID, role ID) pairs to be revoked
+    :param group: whether the IDs are group IDs rather than user IDs
+    :returns: a tuple of the lists of the grants and of the revokes which
+        failed
+    """
+    if group:
+        grant = api.keystone.add_group_role
+        revoke = api.keystone.remove_group_role
+    else:
+        grant = api.keystone.add_tenant_user_role
+        revoke = api.keystone.remove_tenant_user_role
+    grants = list(grants)
+    revokes = list(revokes)
+    results = futurist_utils.call_functions_parallel(
+        *[(_change_role_assignment,
+           [request, change, project_id, actor_id, role_id, group])
+          for change, assignments in ((grant, grants), (revoke, revokes))
+          for actor_id, role_id in assignments])
+    failed_grants = [assignment for assignment, succeeded
+                     in zip(grants, results[:len(grants)]) if not succeeded]
+    failed_revokes = [assignment for assignment, succeeded
+                      in zip(revokes, results[len(grants):]) if not succeeded]
+    return failed_grants, failed_revokes